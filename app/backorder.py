@@ -6,11 +6,13 @@ backorder.py – Eksik satır & sevkiyat kayıtları
       dbo.backorders       –  eksik (missing) satırlar
       dbo.shipment_lines   –  gönderilen (shipped) satırlar
  • insert_backorder      → eksik satır ekle / güncelle
+ • insert_backorders_bulk → aynısı, çok satır tek gönderimde
  • add_shipment          → sevk satırı ekle / güncelle
  • create_tables() ilk import’ta otomatik çalışır
 """
 
 from __future__ import annotations
+from contextlib import nullcontext
 from typing import Optional, List, Dict, Any
 import logging, os
 
@@ -143,20 +145,82 @@ def insert_backorder(order_no:str, line_id:int, warehouse_id:int,
             cn.execute(sql_ins,
                        order_no,line_id,warehouse_id,item_code,qty_missing,eta_date)
 
+_BACKORDER_UPSERT_SQL = f"""
+    MERGE {SCHEMA}.backorders AS tgt
+    USING (SELECT ? AS order_no, ? AS line_id, ? AS warehouse_id,
+                  ? AS item_code, ? AS qty_missing, ? AS eta_date) src
+      ON  tgt.fulfilled = 0
+      AND tgt.order_no  = src.order_no
+      AND tgt.item_code = src.item_code
+    WHEN MATCHED THEN
+        UPDATE SET qty_missing = src.qty_missing, last_update = GETDATE()
+    WHEN NOT MATCHED THEN
+        INSERT (order_no, line_id, warehouse_id, item_code, qty_missing, eta_date)
+        VALUES (src.order_no, src.line_id, src.warehouse_id,
+                src.item_code, src.qty_missing, src.eta_date);
+"""
+
+
+def insert_backorders_bulk(rows: List[tuple], conn=None) -> None:
+    """
+    `insert_backorder`'ın toplu hali: her satır (order_no, line_id,
+    warehouse_id, item_code, qty_missing[, eta_date]).
+
+    Aynı idempotent kural (açık kayıt varsa qty_missing set edilir, yoksa
+    eklenir) tek MERGE ile; fast_executemany tüm satırları tek parametre
+    dizisi olarak gönderir. conn verilirse çağıranın transaction'ında çalışır.
+    """
+    params = [tuple(r) + (None,) * (6 - len(r)) for r in rows]
+    if not params:
+        return
+
+    ensure_tables()
+
+    def _run(cn):
+        cur = cn.cursor()
+        try:
+            cur.fast_executemany = True
+            cur.executemany(_BACKORDER_UPSERT_SQL, params)
+        finally:
+            cur.close()
+
+    if conn is not None:
+        _run(conn)
+        return
+    with get_conn() as cn:
+        try:
+            _run(cn)
+            cn.commit()
+        except Exception:
+            cn.rollback()
+            raise
+
+
 def add_shipment(order_no: str,          # sipariş / fatura kökü
                  trip_date: str,         # YYYY-MM-DD  → gün anahtarı
                  item_code: str,
                  warehouse_id: int,
                  invoiced_qty: float,    # Logo’daki fatura adedi
-                 qty_delta: float):      # bu sevk-tamamlama ile gönderilen
+                 qty_delta: float,       # bu sevk-tamamlama ile gönderilen
+                 conn=None):
 
     """
     • Aynı (trip_date + order_no + item_code) satırı varsa
       qty_sent (eski adı qty_shipped) alanını artırır.
     • Yoksa yeni satır açar.
+    • conn verilirse çağıranın bağlantısında (transaction'ında) çalışır.
     """
 
-    sql = f"""
+    if conn is not None:
+        _merge_shipment(conn, order_no, trip_date, item_code,
+                        warehouse_id, invoiced_qty, qty_delta)
+        return
+    with get_conn(autocommit=True) as cn:
+        _merge_shipment(cn, order_no, trip_date, item_code,
+                        warehouse_id, invoiced_qty, qty_delta)
+
+
+_SHIPMENT_MERGE_SQL = f"""
     MERGE {SCHEMA}.shipment_lines AS tgt
     USING (SELECT
               ? AS trip_date,
@@ -176,19 +240,30 @@ def add_shipment(order_no: str,          # sipariş / fatura kökü
         VALUES (?,?,?,?,?,?,0,GETDATE());
     """
 
-    with get_conn(autocommit=True) as cn:
-        cn.execute(sql,
-                   trip_date, order_no, item_code,      # src
-                   qty_delta,                           # UPDATE
-                   trip_date, order_no, item_code,      # INSERT
-                   warehouse_id, invoiced_qty, qty_delta)
+
+def _merge_shipment(cn, order_no, trip_date, item_code,
+                    warehouse_id, invoiced_qty, qty_delta) -> None:
+    """shipment_lines MERGE'ünü verilen bağlantıda çalıştırır (transaction çağırana ait)."""
+    cn.execute(_SHIPMENT_MERGE_SQL,
+               trip_date, order_no, item_code,      # src
+               qty_delta,                           # UPDATE
+               trip_date, order_no, item_code,      # INSERT
+               warehouse_id, invoiced_qty, qty_delta)
 
 
 # -------------------------------------------------------------------- #
 #  YARDIMCI LİSTELER                                                   #
 # -------------------------------------------------------------------- #
-def list_pending() -> List[Dict[str,Any]]:
-    """Bekleyen backorder'ları müşteri ve ürün bilgileriyle birlikte getirir"""
+def _use_conn(cn=None):
+    """Verilen bağlantıyı (kapatmadan) ya da yeni bir get_conn() bağlamını döndürür."""
+    return nullcontext(cn) if cn is not None else get_conn()
+
+
+def list_pending(cn=None) -> List[Dict[str,Any]]:
+    """
+    Bekleyen backorder'ları müşteri ve ürün bilgileriyle birlikte getirir.
+    cn verilirse o bağlantı kullanılır (worker turu tek bağlantıyla çalışır).
+    """
     # Tabloların oluşturulduğundan emin ol
     ensure_tables()
 
@@ -210,7 +285,7 @@ def list_pending() -> List[Dict[str,Any]]:
         WHERE b.fulfilled = 0
         ORDER BY b.order_no, b.item_code
         """
-        with get_conn() as cn:
+        with _use_conn(cn) as cn:
             cur = cn.execute(sql)
             cols = [c[0].lower() for c in cur.description]
             rows = cur.fetchall()
@@ -226,6 +301,53 @@ def list_pending() -> List[Dict[str,Any]]:
         # Hata durumunda boş liste döndür (None değil!)
         return []
 
+
+def list_pending_grouped(cn=None) -> List[Dict[str, Any]]:
+    """
+    Bekleyen backorder'ları (sipariş, stok, depo) bazında gruplu getirir.
+
+    Her satır: order_no, item_code, warehouse_id, need (SUM qty_missing),
+    ids (gruptaki backorder id listesi). Gruplama sunucuda yapılır; STRING_AGG
+    olmayan (SQL Server < 2017) sunucularda `list_pending` Python'da gruplanır.
+    cn verilirse sorgular o bağlantıda çalışır.
+    """
+    ensure_tables()
+
+    sql = f"""
+    SELECT order_no, item_code, warehouse_id,
+           SUM(qty_missing) AS need,
+           STRING_AGG(CAST(id AS VARCHAR(MAX)), ',') AS ids
+      FROM {SCHEMA}.backorders
+     WHERE fulfilled = 0
+     GROUP BY order_no, item_code, warehouse_id
+     ORDER BY order_no, item_code
+    """
+    try:
+        with _use_conn(cn) as c:
+            return [
+                {
+                    "order_no": order_no,
+                    "item_code": item_code,
+                    "warehouse_id": warehouse_id,
+                    "need": need or 0.0,
+                    "ids": [int(i) for i in ids.split(",")],
+                }
+                for order_no, item_code, warehouse_id, need, ids in c.execute(sql).fetchall()
+            ]
+    except Exception as e:
+        _log.debug(f"list_pending_grouped SQL gruplama kullanılamadı: {e}")
+
+    groups: Dict[tuple, Dict[str, Any]] = {}
+    for rec in list_pending(cn):
+        key = (rec["order_no"], rec["item_code"], rec["warehouse_id"])
+        g = groups.setdefault(key, {
+            "order_no": key[0], "item_code": key[1], "warehouse_id": key[2],
+            "need": 0.0, "ids": [],
+        })
+        g["need"] += rec["qty_missing"] or 0.0
+        g["ids"].append(rec["id"])
+    return list(groups.values())
+
 def mark_fulfilled(back_id:int, qty_scanned:float=None, scanned_by:str=None):
     """
     Backorder'ı fulfilled olarak işaretle ve okutma bilgilerini güncelle.
@@ -291,17 +413,86 @@ def mark_fulfilled(back_id:int, qty_scanned:float=None, scanned_by:str=None):
         raise  # Hatayı yukarı fırlat, kullanıcı görsün
 
 
+# mark_fulfilled_bulk: IN (...) parça boyu (SQL Server limiti 2100 parametre)
+FULFILL_CHUNK = 1000
+
+
+def mark_fulfilled_bulk(ids: List[int], scanned_by: str = None, cn=None) -> int:
+    """
+    Birden çok backorder'ı tek transaction'da fulfilled yapar.
+    • UPDATE ... WHERE id IN (?,?,...) – parça başına tek round-trip
+    • OUTPUT ile dönen satırlar için shipment_lines MERGE aynı bağlantıda
+    • qty_scanned = qty_missing (mark_fulfilled varsayılanı ile aynı)
+    cn verilirse (autocommit kapalı) o bağlantıda commit/rollback yapılır.
+    Dönüş: güncellenen satır sayısı
+    """
+    import getpass
+    from datetime import datetime
+
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return 0
+
+    ensure_tables()
+
+    if scanned_by is None:
+        try:
+            scanned_by = getpass.getuser()
+        except Exception:
+            scanned_by = 'SYSTEM'
+
+    trip_date = datetime.now().strftime('%Y-%m-%d')
+    updated = 0
+    try:
+        with _use_conn(cn) as cn:
+            try:
+                for start in range(0, len(ids), FULFILL_CHUNK):
+                    chunk = ids[start:start + FULFILL_CHUNK]
+                    marks = ",".join("?" * len(chunk))
+                    rows = cn.execute(
+                        f"""UPDATE {SCHEMA}.backorders
+                               SET fulfilled=1,
+                                   fulfilled_at=GETDATE(),
+                                   qty_scanned=qty_missing,
+                                   scanned_by=?,
+                                   scanned_at=GETDATE()
+                            OUTPUT INSERTED.order_no, INSERTED.item_code,
+                                   INSERTED.warehouse_id, INSERTED.qty_missing
+                             WHERE fulfilled = 0 AND id IN ({marks})""",
+                        scanned_by, *chunk
+                    ).fetchall()
+                    updated += len(rows)
+
+                    for r in rows:
+                        if r.order_no and r.item_code:
+                            _merge_shipment(cn, r.order_no, trip_date, r.item_code,
+                                            r.warehouse_id or 0, r.qty_missing,
+                                            r.qty_missing)
+                cn.commit()
+            except Exception:
+                cn.rollback()
+                raise
+        return updated
+
+    except Exception as e:
+        _log.error(f"mark_fulfilled_bulk hatası ({len(ids)} kayıt): {e}")
+        raise
+
+
 # --------------------------------------------------------------------
 #  Tamamlanmış eksikler – listele
 # --------------------------------------------------------------------
-def list_fulfilled(on_date: Optional[str] = None) -> List[Dict[str, Any]]:
+def list_fulfilled(on_date: Optional[str] = None,
+                   order_no: Optional[str] = None) -> List[Dict[str, Any]]:
     sql = f"SELECT * FROM {SCHEMA}.backorders WHERE fulfilled = 1"
+    params = []
     if on_date:
         # güvenlik / performans için parametreli ver
         sql += " AND CAST(fulfilled_at AS DATE) = ?"
-        params = (on_date,)
-    else:
-        params = ()
+        params.append(on_date)
+    if order_no:
+        sql += " AND order_no = ?"
+        params.append(order_no)
     with get_conn() as cn:
         cur = cn.execute(sql, *params)
         cols = [c[0].lower() for c in cur.description]
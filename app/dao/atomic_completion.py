@@ -168,6 +168,7 @@ def atomic_complete_order(
                 raise Exception(f"Package sync failed: {sync_result['message']}")
             
             # Step 7: Process backorders and shipment lines
+            backorder_rows = []
             for line_data in lines_data:
                 code = line_data["item_code"]
                 wh = line_data["warehouse_id"]
@@ -185,11 +186,13 @@ def atomic_complete_order(
                     )
                 
                 if missing > 0:
-                    bo.insert_backorder(
-                        order_no, line_data["line_id"], wh, code, missing,
-                        conn=conn
+                    backorder_rows.append(
+                        (order_no, line_data["line_id"], wh, code, missing)
                     )
             
+            # All missing lines in one bulk send
+            bo.insert_backorders_bulk(backorder_rows, conn=conn)
+            
             # Step 8: Update order status to completed (STATUS = 4)
             genexp5_text = f"TAMAMLANDI: {username} / {date.today().strftime('%d.%m.%Y')}"
             
@@ -15,9 +15,10 @@ from __future__ import annotations
 import logging
 import threading
 import time
-from contextlib import contextmanager
+from contextlib import ExitStack, contextmanager
+from collections import OrderedDict
 from queue import Queue, Empty, Full
-from typing import Optional
+from typing import Dict, Optional
 import pyodbc
 import os
 
@@ -32,7 +33,10 @@ class ConnectionPool:
         min_connections: int = 2,
         max_connections: int = 10,
         connection_timeout: int = 10,
-        pool_timeout: int = 30
+        pool_timeout: int = 30,
+        ping_interval: int = 300,
+        statement_cache_size: int = 64,
+        max_lifetime: int = 1800
     ):
         """
         Initialize connection pool.
@@ -43,12 +47,18 @@ class ConnectionPool:
             max_connections: Maximum connections allowed
             connection_timeout: Timeout for individual connections (seconds)
             pool_timeout: Timeout to wait for available connection (seconds)
+            ping_interval: Idle connection keep-alive interval (seconds, 0 = off)
+            statement_cache_size: Prepared cursors kept per connection
+            max_lifetime: Recycle connections older than this (seconds, 0 = never)
         """
         self.connection_string = connection_string
         self.min_connections = min_connections
         self.max_connections = max_connections
         self.connection_timeout = connection_timeout
         self.pool_timeout = pool_timeout
+        self.ping_interval = ping_interval
+        self.statement_cache_size = statement_cache_size
+        self.max_lifetime = max_lifetime
         
         # Thread-safe queue for available connections
         self._pool = Queue(maxsize=max_connections)
@@ -56,13 +66,25 @@ class ConnectionPool:
         self._lock = threading.RLock()
         self._initialized = False
         
+        # Per-connection prepared statement cache: id(conn) -> {sql: cursor}
+        self._stmt_cache: Dict[int, OrderedDict] = {}
+        
+        # id(conn) -> time.monotonic() at creation, for max_lifetime recycling
+        self._created_at: Dict[int, float] = {}
+        
+        # Keep-alive thread for idle connections
+        self._ping_stop = threading.Event()
+        self._ping_thread: Optional[threading.Thread] = None
+        
         # Statistics
         self._stats = {
             'total_created': 0,
             'total_borrowed': 0,
             'total_returned': 0,
             'current_active': 0,
-            'current_idle': 0
+            'current_idle': 0,
+            'stmt_cache_hits': 0,
+            'stmt_cache_misses': 0
         }
     
     def _create_connection(self) -> Optional[pyodbc.Connection]:
@@ -81,6 +103,7 @@ class ConnectionPool:
             
             with self._lock:
                 self._stats['total_created'] += 1
+                self._created_at[id(conn)] = time.monotonic()
                 
             logger.debug("New database connection created")
             return conn
@@ -89,6 +112,54 @@ class ConnectionPool:
             logger.error(f"Failed to create database connection: {e}")
             return None
     
+    def _close(self, conn: pyodbc.Connection):
+        """Close a connection and forget its cached statements."""
+        with self._lock:
+            self._stmt_cache.pop(id(conn), None)
+            self._created_at.pop(id(conn), None)
+        conn.close()
+    
+    def _is_expired(self, conn: pyodbc.Connection) -> bool:
+        """True if the connection has outlived max_lifetime."""
+        if self.max_lifetime <= 0:
+            return False
+        created = self._created_at.get(id(conn))
+        return created is not None and time.monotonic() - created > self.max_lifetime
+    
+    def cursor_for(self, conn: pyodbc.Connection, sql: str) -> pyodbc.Cursor:
+        """
+        Return a cursor dedicated to `sql` on this connection.
+        
+        pyodbc skips SQLPrepare when a cursor re-executes the same SQL text,
+        so keeping one cursor per statement lets repeated queries reuse the
+        server-side prepared handle instead of re-parsing every call.
+        """
+        with self._lock:
+            # Only pool-owned connections are cached; a fallback direct
+            # connection would never be evicted from the cache on close
+            if id(conn) not in self._created_at:
+                return conn.cursor()
+            
+            statements = self._stmt_cache.setdefault(id(conn), OrderedDict())
+            cursor = statements.get(sql)
+            if cursor is not None and cursor.connection is conn:
+                statements.move_to_end(sql)
+                self._stats['stmt_cache_hits'] += 1
+                return cursor
+            
+            self._stats['stmt_cache_misses'] += 1
+            
+            if len(statements) >= self.statement_cache_size:
+                _, old = statements.popitem(last=False)
+                try:
+                    old.close()
+                except pyodbc.Error:
+                    pass
+            
+            cursor = conn.cursor()
+            statements[sql] = cursor
+            return cursor
+    
     def _initialize_pool(self) -> bool:
         """Initialize the connection pool with minimum connections."""
         if self._initialized:
@@ -106,13 +177,14 @@ class ConnectionPool:
                     with self._lock:
                         self._active_connections += 1
                 except Full:
-                    conn.close()
+                    self._close(conn)
                     break
             else:
                 logger.warning(f"Failed to create initial connection {i+1}/{self.min_connections}")
         
         if success_count > 0:
             self._initialized = True
+            self._start_pinger()
             logger.info(f"Connection pool initialized with {success_count} connections")
             return True
         else:
@@ -129,6 +201,51 @@ class ConnectionPool:
         except (pyodbc.Error, Exception):
             return False
     
+    def _start_pinger(self):
+        """Start the background keep-alive thread (once)."""
+        if self.ping_interval <= 0 or (self._ping_thread and self._ping_thread.is_alive()):
+            return
+        
+        self._ping_stop.clear()
+        self._ping_thread = threading.Thread(
+            target=self._ping_loop, name="db-pool-pinger", daemon=True
+        )
+        self._ping_thread.start()
+    
+    def _ping_loop(self):
+        """
+        Periodically run `SELECT 1` on idle connections.
+        
+        Keeps idle connections from being dropped by the server/firewall so
+        that borrowers get a live connection instead of paying for a reconnect.
+        """
+        while not self._ping_stop.wait(self.ping_interval):
+            for _ in range(self._pool.qsize()):
+                try:
+                    conn = self._pool.get_nowait()
+                except Empty:
+                    break
+                
+                if not self._is_expired(conn) and self._is_connection_valid(conn):
+                    try:
+                        conn.rollback()
+                        self._pool.put_nowait(conn)
+                        continue
+                    except (pyodbc.Error, Full):
+                        pass
+                
+                # Dead, expired or surplus connection: drop it
+                try:
+                    self._close(conn)
+                except:
+                    pass
+                with self._lock:
+                    self._active_connections -= 1
+                logger.debug("Idle connection dropped by keep-alive check")
+            
+            with self._lock:
+                self._stats['current_idle'] = self._pool.qsize()
+    
     @contextmanager
     def get_connection(self, *, autocommit: bool = False):
         """
@@ -172,11 +289,11 @@ class ConnectionPool:
                     else:
                         raise RuntimeError(f"Connection pool exhausted (max: {self.max_connections})")
             
-            # Validate connection
-            if conn and not self._is_connection_valid(conn):
-                logger.warning("Invalid connection detected, creating new one")
+            # Validate connection (recycle old ones as well)
+            if conn and (self._is_expired(conn) or not self._is_connection_valid(conn)):
+                logger.debug("Stale or invalid connection detected, creating new one")
                 try:
-                    conn.close()
+                    self._close(conn)
                 except:
                     pass
                 conn = self._create_connection()
@@ -194,7 +311,7 @@ class ConnectionPool:
             logger.error(f"Error in get_connection: {e}")
             if conn:
                 try:
-                    conn.close()
+                    self._close(conn)
                 except:
                     pass
                 with self._lock:
@@ -209,14 +326,17 @@ class ConnectionPool:
                     if conn.autocommit != False:
                         conn.autocommit = False
                     
-                    # Rollback any uncommitted transactions
+                    # Rollback any uncommitted transactions; a failing rollback
+                    # means a dead connection, so no extra SELECT 1 is needed here
+                    # (borrowers and the keep-alive thread validate idle ones)
                     try:
                         conn.rollback()
-                    except:
-                        pass
+                        reusable = not self._is_expired(conn)
+                    except pyodbc.Error:
+                        reusable = False
                     
                     # Return to pool if still valid
-                    if self._is_connection_valid(conn):
+                    if reusable:
                         try:
                             self._pool.put_nowait(conn)
                             with self._lock:
@@ -226,25 +346,25 @@ class ConnectionPool:
                             logger.debug("Connection returned to pool")
                         except Full:
                             # Pool is full, close connection
-                            conn.close()
+                            self._close(conn)
                             with self._lock:
                                 self._active_connections -= 1
                                 self._stats['current_active'] -= 1
                     else:
                         # Connection is invalid, close and decrease count
                         try:
-                            conn.close()
+                            self._close(conn)
                         except:
                             pass
                         with self._lock:
                             self._active_connections -= 1
                             self._stats['current_active'] -= 1
-                        logger.warning("Invalid connection discarded")
+                        logger.debug("Stale or invalid connection discarded")
                         
                 except Exception as e:
                     logger.error(f"Error returning connection to pool: {e}")
                     try:
-                        conn.close()
+                        self._close(conn)
                     except:
                         pass
                     with self._lock:
@@ -267,15 +387,23 @@ class ConnectionPool:
         """Close all connections in the pool."""
         logger.info("Closing all connections in pool")
         
+        # Stop keep-alive thread
+        self._ping_stop.set()
+        if self._ping_thread and self._ping_thread.is_alive():
+            self._ping_thread.join(timeout=5)
+        self._ping_thread = None
+        
         # Close all connections in queue
         while not self._pool.empty():
             try:
                 conn = self._pool.get_nowait()
-                conn.close()
+                self._close(conn)
             except (Empty, Exception) as e:
                 logger.error(f"Error closing pooled connection: {e}")
         
         with self._lock:
+            self._stmt_cache.clear()
+            self._created_at.clear()
             self._active_connections = 0
             self._initialized = False
             self._stats = {
@@ -283,7 +411,9 @@ class ConnectionPool:
                 'total_borrowed': 0,
                 'total_returned': 0,
                 'current_active': 0,
-                'current_idle': 0
+                'current_idle': 0,
+                'stmt_cache_hits': 0,
+                'stmt_cache_misses': 0
             }
         
         logger.info("Connection pool closed")
@@ -337,11 +467,19 @@ def initialize_global_pool(
         
         logger.info(f"Using database connection: Server={SERVER}, Database={DATABASE}, User={USER}")
     
-    # Get configuration from environment variables
+    # Pool size: DB_POOL_MIN/MAX_CONNECTIONS if set, else the db.pool_min /
+    # db.pool_max settings (editable on the settings page); keep-alive interval
+    # from DB_POOL_PING_INTERVAL, else db.pool_ping_interval (not the UI's
+    # db.heartbeat, which is seconds-scale)
+    from app.settings_manager import get_manager
+    manager = get_manager()
     if min_connections is None:
-        min_connections = int(os.getenv('DB_POOL_MIN_CONNECTIONS', '2'))
+        min_connections = int(os.getenv('DB_POOL_MIN_CONNECTIONS') or manager.get("db.pool_min", 2))
     if max_connections is None:
-        max_connections = int(os.getenv('DB_POOL_MAX_CONNECTIONS', '10'))
+        max_connections = int(os.getenv('DB_POOL_MAX_CONNECTIONS') or manager.get("db.pool_max", 10))
+    kwargs.setdefault('ping_interval', int(os.getenv('DB_POOL_PING_INTERVAL')
+                                           or manager.get("db.pool_ping_interval", 300)))
+    kwargs.setdefault('max_lifetime', int(os.getenv('DB_POOL_MAX_LIFETIME', '1800')))
     
     with _pool_lock:
         if _global_pool:
@@ -377,14 +515,17 @@ def get_pooled_connection(*, autocommit: bool = False):
     """
     global _global_pool
     
-    # Check if pool is available
+    # Check if pool is available. Only acquiring the connection falls back;
+    # errors raised by the caller's block propagate unchanged.
     if _global_pool and _global_pool._initialized:
-        try:
-            with _global_pool.get_connection(autocommit=autocommit) as conn:
+        with ExitStack() as stack:
+            try:
+                conn = stack.enter_context(_global_pool.get_connection(autocommit=autocommit))
+            except Exception as e:
+                logger.warning(f"Pool connection failed, falling back to direct connection: {e}")
+            else:
                 yield conn
-            return
-        except Exception as e:
-            logger.warning(f"Pool connection failed, falling back to direct connection: {e}")
+                return
     
     # Fallback to direct connection (without importing logo.py to avoid circular import)
     logger.debug("Using direct database connection (pool not available)")
@@ -429,6 +570,16 @@ def get_pooled_connection(*, autocommit: bool = False):
                 pass
 
 
+def get_cached_cursor(conn: pyodbc.Connection, sql: str) -> pyodbc.Cursor:
+    """
+    Get the prepared cursor for `sql` on a pooled connection.
+    Direct (non-pooled) connections just get a fresh cursor.
+    """
+    if _global_pool and _global_pool._initialized:
+        return _global_pool.cursor_for(conn, sql)
+    return conn.cursor()
+
+
 def get_pool_stats() -> Optional[dict]:
     """Get statistics from the global connection pool."""
     global _global_pool
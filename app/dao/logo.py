@@ -26,10 +26,11 @@ from __future__ import annotations
 import os
 import time
 import logging
-from contextlib import contextmanager
-from typing import Any, Dict, List
+from contextlib import ExitStack, contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List
 import uuid
 import pyodbc
+from app.dao.connection_pool import get_cached_cursor
 
 MAX_RETRY = 3
 RETRY_WAIT = 2  # saniye
@@ -69,6 +70,7 @@ CONN_STR = (
 )
 
 QUEUE_TABLE = "WMS_PICKQUEUE"  # kalıcı kuyruk tablosu
+FETCH_BATCH_SIZE = 500         # fetch_iter için fetchmany parça boyu
 
 # ---------------------------------------------------------------------------
 # Connection Pool Configuration
@@ -107,20 +109,16 @@ def _initialize_pool_if_needed():
             # Now initialize pool with working connection
             from app.dao.connection_pool import initialize_global_pool
             
-            # Pool configuration from environment variables
-            min_conn = int(os.getenv("DB_POOL_MIN_CONNECTIONS", "2"))
-            max_conn = int(os.getenv("DB_POOL_MAX_CONNECTIONS", "8"))
-            
+            # Pool size is resolved by initialize_global_pool
+            # (DB_POOL_MIN/MAX_CONNECTIONS, else db.pool_min / db.pool_max)
             success = initialize_global_pool(
                 connection_string=working_conn_str,
-                min_connections=min_conn,
-                max_connections=max_conn,
                 connection_timeout=CONN_TIMEOUT
             )
             
             if success:
                 _connection_pool_initialized = True
-                logger.info(f"Connection pool enabled with {description} (min:{min_conn}, max:{max_conn})")
+                logger.info(f"Connection pool enabled with {description}")
             else:
                 logger.warning("Connection pool initialization failed, falling back to direct connections")
         else:
@@ -158,40 +156,41 @@ def get_conn(*, autocommit: bool = False):
     Raises:
         pyodbc.Error: Database connection error after retries
     """
-    # Try connection pool first if enabled
-    if USE_CONNECTION_POOL:
-        _initialize_pool_if_needed()
-        
-        if _connection_pool_initialized:
-            try:
-                from app.dao.connection_pool import get_pooled_connection
-                logger.debug("Using pooled connection")
-                with get_pooled_connection(autocommit=autocommit) as conn:
-                    yield conn
-                return
-            except Exception as e:
-                logger.warning(f"Pool connection failed, falling back to direct: {e}")
-    
-    # Fallback to direct connection (original implementation)
-    last_exc = None
-    for attempt in range(1, MAX_RETRY + 1):
-        try:
-            conn = pyodbc.connect(CONN_STR, timeout=CONN_TIMEOUT, autocommit=autocommit)
-            break                      # ➜ başarılı çıkış
-        except pyodbc.Error as exc:
-            last_exc = exc
-            logger.warning(
-                "DB bağlantı hatası (deneme %d/%d): %s",
-                attempt, MAX_RETRY, exc)
-            if attempt < MAX_RETRY:  # Don't sleep after last attempt
-                time.sleep(RETRY_WAIT)
-    else:                              # for-else 👉 3 deneme de başarısız
-        raise last_exc                 # ↑ main window yakalayacak
+    with ExitStack() as stack:
+        conn = None
+
+        # Try connection pool first if enabled. Only acquiring the connection
+        # falls back; errors raised by the caller's block propagate unchanged.
+        if USE_CONNECTION_POOL:
+            _initialize_pool_if_needed()
+
+            if _connection_pool_initialized:
+                try:
+                    from app.dao.connection_pool import get_pooled_connection
+                    logger.debug("Using pooled connection")
+                    conn = stack.enter_context(get_pooled_connection(autocommit=autocommit))
+                except Exception as e:
+                    logger.warning(f"Pool connection failed, falling back to direct: {e}")
+
+        if conn is None:
+            # Fallback to direct connection (original implementation)
+            last_exc = None
+            for attempt in range(1, MAX_RETRY + 1):
+                try:
+                    conn = pyodbc.connect(CONN_STR, timeout=CONN_TIMEOUT, autocommit=autocommit)
+                    break                      # ➜ başarılı çıkış
+                except pyodbc.Error as exc:
+                    last_exc = exc
+                    logger.warning(
+                        "DB bağlantı hatası (deneme %d/%d): %s",
+                        attempt, MAX_RETRY, exc)
+                    if attempt < MAX_RETRY:  # Don't sleep after last attempt
+                        time.sleep(RETRY_WAIT)
+            else:                              # for-else 👉 3 deneme de başarısız
+                raise last_exc                 # ↑ main window yakalayacak
+            stack.callback(conn.close)
 
-    try:
         yield conn
-    finally:
-        conn.close()
 
 # ---------------------------------------------------------------------------
 # Yardımcı – tablo adı üretici
@@ -213,19 +212,72 @@ def exec_sql(sql: str, *params):
 
 def fetch_all(sql: str, *params) -> List[Dict[str, Any]]:
     with get_conn() as cn:
-        cur = cn.execute(sql, *params)
+        cur = get_cached_cursor(cn, sql)
+        cur.execute(sql, *params)
         cols = [c[0].lower() for c in cur.description]
         return [dict(zip(cols, row)) for row in cur.fetchall()]
 
-def fetch_one(sql: str, *params) -> Dict[str, Any] | None:
-    """Tek bir satır döndürür, yoksa None."""
+def fetch_iter(sql: str, *params, batch_size: int = FETCH_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    `fetch_all` gibi, ama satırları `fetchmany` ile parça parça üretir;
+    bellek `batch_size` ile sınırlı kalır. Bağlantı generator tükenene
+    (ya da kapatılana) kadar tutulur.
+    """
     with get_conn() as cn:
-        cur = cn.execute(sql, *params)
+        cur = cn.cursor()
+        try:
+            cur.arraysize = batch_size
+            cur.execute(sql, *params)
+            cols = [c[0].lower() for c in cur.description]
+            while rows := cur.fetchmany(batch_size):
+                for row in rows:
+                    yield dict(zip(cols, row))
+        finally:
+            cur.close()
+
+def fetch_one(sql: str, *params, cn=None) -> Dict[str, Any] | None:
+    """
+    Tek bir satır döndürür, yoksa None.
+    cn verilirse o bağlantının hazırlanmış cursor'u kullanılır (döngülerde
+    aynı bağlantı + aynı SQL metni → sunucuda tek derleme).
+    """
+    with (nullcontext(cn) if cn is not None else get_conn()) as cn:
+        cur = get_cached_cursor(cn, sql)
+        cur.execute(sql, *params)
         row = cur.fetchone()
+        cols = [c[0].lower() for c in cur.description]
+        cur.nextset()   # kalan satırları bırak, bağlantı meşgul kalmasın
         if not row:
             return None
-        cols = [c[0].lower() for c in cur.description]
         return dict(zip(cols, row))
+
+def fetch_one_as(cls, sql: str, *params):
+    """
+    Tek satırı `cls._make(row)` ile döndürür (ör. `typing.NamedTuple`),
+    yoksa None. SELECT kolon sırası `cls` alan sırasıyla aynı olmalıdır.
+    """
+    with get_conn() as cn:
+        cur = get_cached_cursor(cn, sql)
+        cur.execute(sql, *params)
+        row = cur.fetchone()
+        cur.nextset()
+        return cls._make(row) if row else None
+
+def fetch_iter_as(cls, sql: str, *params, batch_size: int = FETCH_BATCH_SIZE) -> Iterator[Any]:
+    """
+    `fetch_iter` gibi, ama satır başına dict kurmadan `cls._make(row)` üretir.
+    SELECT kolon sırası `cls` alan sırasıyla aynı olmalıdır.
+    """
+    with get_conn() as cn:
+        cur = cn.cursor()
+        try:
+            cur.arraysize = batch_size
+            cur.execute(sql, *params)
+            make = cls._make
+            while rows := cur.fetchmany(batch_size):
+                yield from map(make, rows)
+        finally:
+            cur.close()
 # ---------------------------------------------------------------------------
 # DAO Fonksiyonları
 # ---------------------------------------------------------------------------
@@ -241,7 +293,7 @@ def execute_query(sql: str, params: Optional[List] = None) -> int:
         Number of affected rows
     """
     with get_conn() as conn:
-        cursor = conn.cursor()
+        cursor = get_cached_cursor(conn, sql)
         if params:
             cursor.execute(sql, params)
         else:
@@ -277,7 +329,24 @@ def fetch_draft_orders(*, limit: int = 100) -> List[Dict[str, Any]]:
         cur.execute(sql, limit)
         cols = [c[0].lower() for c in cur.description]
         return [dict(zip(cols, row)) for row in cur.fetchall()]
-    
+
+
+# Taslak kümesinin ucuz "imzası": küme değişmedikçe (yeni/çıkan sipariş)
+# aynı kalır; watcher ağır listeyi yalnızca imza değişince çeker
+_DRAFT_SIGNATURE_SQL = f"""
+    SELECT COUNT_BIG(*), MAX(LOGICALREF), CHECKSUM_AGG(LOGICALREF)
+    FROM {_t('ORFICHE')}
+    WHERE STATUS = 1 AND CANCELLED = 0;"""
+
+
+def fetch_draft_signature(cn=None) -> tuple:
+    """(adet, en büyük LOGICALREF, LOGICALREF checksum) – taslak kümesinin imzası."""
+    with (nullcontext(cn) if cn is not None else get_conn()) as cn:
+        cur = get_cached_cursor(cn, _DRAFT_SIGNATURE_SQL)
+        row = cur.execute(_DRAFT_SIGNATURE_SQL).fetchone()
+        cur.nextset()
+        return tuple(row)
+
 
 def fetch_picking_orders(limit: int = 100) -> List[Dict[str, Any]]:
     """
@@ -285,7 +354,12 @@ def fetch_picking_orders(limit: int = 100) -> List[Dict[str, Any]]:
     
     DEPRECATED: Use fetch_picking_orders_paginated() for better performance.
     """
-    sql = f"""
+    return list(iter_picking_orders(limit))
+
+
+# Firma/dönem (_t) açılışta sabit → SQL metni modül yüklenirken bir kez kurulur;
+# her çağrıda aynı metin, sürücü/sunucu plan önbelleğinde de aynı kayıt
+_PICKING_ORDERS_SQL = f"""
     SELECT TOP (?) 
         F.LOGICALREF  AS order_id,
         F.FICHENO     AS order_no,
@@ -296,23 +370,21 @@ def fetch_picking_orders(limit: int = 100) -> List[Dict[str, Any]]:
         F.GENEXP4     AS genexp4,
         C.CODE        AS customer_code,
         C.DEFINITION_ AS customer_name
-    FROM { _t('ORFICHE') } F
-    JOIN { _t('CLCARD', period_dependent=False) } C
+    FROM {_t('ORFICHE')} F
+    JOIN {_t('CLCARD', period_dependent=False)} C
           ON C.LOGICALREF = F.CLIENTREF
     WHERE F.STATUS = 2           -- picking
       AND F.CANCELLED = 0
     ORDER BY F.LOGICALREF DESC;
     """
-    with get_conn() as cn:
-        cur = cn.cursor()
-        cur.execute(sql, limit)
-        cols = [c[0].lower() for c in cur.description]
-        return [dict(zip(cols, row)) for row in cur.fetchall()]
 
 
-def fetch_order_lines(order_id: int) -> List[Dict[str, Any]]:
-    """Belirtilen satış siparişinin satırlarını getirir (ORFLINE)."""
-    sql = f"""
+def iter_picking_orders(limit: int = 100) -> Iterator[Dict[str, Any]]:
+    """`fetch_picking_orders` satırlarını `fetchmany` parçalarıyla üretir."""
+    yield from fetch_iter(_PICKING_ORDERS_SQL, limit)
+
+
+_ORDER_LINES_SQL = f"""
     SELECT
         L.LOGICALREF AS line_id,
         L.STOCKREF   AS item_ref,
@@ -328,13 +400,63 @@ def fetch_order_lines(order_id: int) -> List[Dict[str, Any]]:
     WHERE L.ORDFICHEREF = ?
       AND L.CANCELLED   = 0
     ORDER BY L.LINENO_;"""
-    with get_conn() as cn:
-        cur = cn.cursor()
-        cur.execute(sql, order_id)
+
+
+def fetch_order_lines(order_id: int, cn=None) -> List[Dict[str, Any]]:
+    """Belirtilen satış siparişinin satırlarını getirir (ORFLINE)."""
+    with (nullcontext(cn) if cn is not None else get_conn()) as cn:
+        cur = get_cached_cursor(cn, _ORDER_LINES_SQL)
+        cur.execute(_ORDER_LINES_SQL, order_id)
         cols = [c[0].lower() for c in cur.description]
         return [dict(zip(cols, row)) for row in cur.fetchall()]
 
 
+# IN (...) listelerinin parça boyu (SQL Server limiti 2100 parametre)
+IN_CHUNK = 1000
+
+# fetch_order_lines ile aynı kolonlar + sipariş anahtarı; {marks} → ?,?,...
+_ORDER_LINES_BULK_SQL = f"""
+    SELECT
+        L.ORDFICHEREF AS order_id,
+        L.LOGICALREF AS line_id,
+        L.STOCKREF   AS item_ref,
+        I.CODE       AS item_code,
+        I.NAME       AS item_name,
+        I.SPECODE    AS shelf_loc,
+        L.AMOUNT     AS qty_ordered,
+        L.PRICE      AS price,
+        L.SOURCEINDEX AS warehouse_id,
+        L.STATUS     AS line_status
+    FROM {_t('ORFLINE')} L
+    JOIN {_t('ITEMS', period_dependent=False)} I ON I.LOGICALREF = L.STOCKREF
+    WHERE L.ORDFICHEREF IN ({{marks}})
+      AND L.CANCELLED   = 0
+    ORDER BY L.ORDFICHEREF, L.LINENO_;"""
+
+
+def fetch_order_lines_bulk(order_ids: List[int], cn=None) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Birden çok siparişin satırlarını tek sorguda getirir (parça başına bir
+    round-trip). Dönüş: {order_id: [satır, ...]} – satır sırası ve kolonlar
+    `fetch_order_lines` ile aynıdır; satırı olmayan siparişler boş listedir.
+    """
+    ids = list(dict.fromkeys(order_ids))
+    result: Dict[int, List[Dict[str, Any]]] = {oid: [] for oid in ids}
+    if not ids:
+        return result
+
+    with (nullcontext(cn) if cn is not None else get_conn()) as cn:
+        for start in range(0, len(ids), IN_CHUNK):
+            chunk = ids[start:start + IN_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            cur = cn.execute(_ORDER_LINES_BULK_SQL.format(marks=marks), *chunk)
+            cols = [c[0].lower() for c in cur.description]
+            for row in cur.fetchall():
+                line = dict(zip(cols, row))
+                result[line.pop("order_id")].append(line)
+    return result
+
+
 # ---- Order lines by FICHENO (order_no) -------------------------------
 def fetch_order_lines_by_no(order_no: str) -> List[Dict[str, Any]]:
     sql = f"""
@@ -359,17 +481,38 @@ def fetch_order_lines_by_no(order_no: str) -> List[Dict[str, Any]]:
 
 
 
-def update_order_status(order_id: int, new_status: int) -> None:
-    """Sipariş fişinin `STATUS` alanını günceller."""
+def update_order_status(order_id: int, new_status: int, cn=None) -> None:
+    """
+    Sipariş fişinin `STATUS` alanını günceller.
+    cn verilirse o bağlantı kullanılır; commit çağırana aittir.
+    """
     sql = f"""
     UPDATE {_t('ORFICHE')}
         SET STATUS = ?
      WHERE LOGICALREF = ?;
     """
-    with get_conn(autocommit=True) as cn:
+    with (nullcontext(cn) if cn is not None else get_conn(autocommit=True)) as cn:
         cn.execute(sql, new_status, order_id)
 
 
+def update_orders_status_bulk(order_ids: List[int], new_status: int, cn=None) -> None:
+    """
+    Birden çok sipariş fişinin `STATUS` alanını tek UPDATE ile günceller
+    (parça başına bir round-trip). cn verilirse commit çağırana aittir.
+    """
+    ids = list(dict.fromkeys(order_ids))
+    if not ids:
+        return
+    with (nullcontext(cn) if cn is not None else get_conn(autocommit=True)) as cn:
+        for start in range(0, len(ids), IN_CHUNK):
+            chunk = ids[start:start + IN_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            cn.execute(
+                f"UPDATE {_t('ORFICHE')} SET STATUS = ? WHERE LOGICALREF IN ({marks});",
+                new_status, *chunk
+            )
+
+
 def mark_line_backorder(line_id: int, missing_qty: float, eta_date: str) -> None:
     """Eksik miktarı (`missing_qty`) ve tahmini varış tarihini (`eta_date`) satıra yazar."""
     sql = f"""
@@ -516,14 +659,7 @@ def db_ping() -> bool:
 # Sipariş başlığı ayrıntıları
 # ---------------------------------------------------------------------------
 
-def fetch_order_header(order_no: str) -> dict | None:
-    """
-    FICHENO (sipariş no) ile başlık alanlarını döndürür.
-    GENEXP2  → Bölge 1
-    GENEXP3  → Bölge 2
-    GENEXP4  → 'PAKET SAYISI : N'
-    """
-    sql = f"""
+_ORDER_HEADER_SQL = f"""
     SELECT TOP 1
            F.LOGICALREF,
            F.FICHENO,
@@ -539,21 +675,28 @@ def fetch_order_header(order_no: str) -> dict | None:
          ON C.LOGICALREF = F.CLIENTREF
     WHERE F.FICHENO = ?;
     """
-    with get_conn() as cn:
-        cur = cn.execute(sql, order_no)
-        row = cur.fetchone()
-        if not row:
-            return None
-        cols = [c[0].lower() for c in cur.description]   # ✅ doğru cursor
-        return dict(zip(cols, row))
+
+
+def fetch_order_header(order_no: str, cn=None) -> dict | None:
+    """
+    FICHENO (sipariş no) ile başlık alanlarını döndürür.
+    GENEXP2  → Bölge 1
+    GENEXP3  → Bölge 2
+    GENEXP4  → 'PAKET SAYISI : N'
+    cn verilirse (döngüde çok sipariş) aynı bağlantı ve cursor kullanılır.
+    """
+    return fetch_one(_ORDER_HEADER_SQL, order_no, cn=cn)
 
 
 
 # WMS_PICKQUEUE  –  Kalıcı barkod kuyruğu fonksiyonları
 # ---------------------------------------------------------------------------
 
-def queue_insert(order_id: int):
-    """Sipariş satırlarını WMS_PICKQUEUE'ye ekler (varsa ignor)."""
+def queue_insert(order_id: int, cn=None):
+    """
+    Sipariş satırlarını WMS_PICKQUEUE'ye ekler (varsa ignor).
+    cn verilirse o bağlantı kullanılır; commit çağırana aittir.
+    """
     sql = f"""
     INSERT INTO {QUEUE_TABLE} (order_id, item_code, qty_ordered, qty_sent)
     SELECT L.ORDFICHEREF, I.CODE, L.AMOUNT, 0
@@ -565,7 +708,10 @@ def queue_insert(order_id: int):
                        WHERE  q.order_id  = L.ORDFICHEREF
                          AND  q.item_code = I.CODE);
     """
-    exec_sql(sql, order_id)
+    if cn is None:
+        exec_sql(sql, order_id)
+    else:
+        cn.execute(sql, order_id)
 
 
 def queue_fetch(order_id: int) -> List[Dict[str, Any]]:
@@ -595,12 +741,7 @@ def queue_delete(order_id: int):
 
 _PREFIX_BY_WH = {0: "D1-", 1: "D3-", 2: "D4-", 3: "D5-"}   # depo → stok kodu ön eki
 
-def resolve_barcode_prefix(barcode: str, warehouse_id: int) -> str | None:
-    prefix = _PREFIX_BY_WH.get(warehouse_id)
-    if not prefix:
-        return None
-
-    sql = f'''
+_BARCODE_PREFIX_SQL = f'''
         SELECT TOP 1 I.CODE
         FROM   {_t("UNITBARCODE", period_dependent=False)} UB   -- ★ düzeltildi
         JOIN   {_t("ITMUNITA",    period_dependent=False)} IU   -- ★ düzeltildi
@@ -611,7 +752,14 @@ def resolve_barcode_prefix(barcode: str, warehouse_id: int) -> str | None:
           AND  IU.LINENR  = 1
           AND  I.CODE LIKE ?
     '''
-    row = fetch_one(sql, barcode, prefix + '%')
+
+
+def resolve_barcode_prefix(barcode: str, warehouse_id: int) -> str | None:
+    prefix = _PREFIX_BY_WH.get(warehouse_id)
+    if not prefix:
+        return None
+
+    row = fetch_one(_BARCODE_PREFIX_SQL, barcode, prefix + '%')
     return row['code'] if row else None
 
 
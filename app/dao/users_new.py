@@ -4,14 +4,524 @@ User Data Access Object - Yeni Tablo Yapısı
 Türkçe tablo adları ile kullanıcı veritabanı işlemleri.
 """
 
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterator, List, NamedTuple, Tuple
 from datetime import datetime, timedelta
+import asyncio
+import atexit
+import base64
+import hashlib
+import hmac
 import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import bcrypt
-from app.dao.logo import fetch_one, fetch_all, execute_query, get_conn
+try:
+    from argon2 import PasswordHasher
+    _ARGON2 = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=1)
+except ImportError:   # argon2-cffi kurulu değilse yeni hash'ler bcrypt kalır
+    _ARGON2 = None
+from app.dao.logo import fetch_one, fetch_one_as, fetch_iter_as, execute_query, get_conn
+from app.dao.connection_pool import get_cached_cursor
+from app.utils.thread_safe_cache import get_cache
+from app.utils.wms_paths import get_resource_path
 
 logger = logging.getLogger(__name__)
 
+# Oturum/yetki kontrollerinde sık okunan kullanıcı kayıtları için TTL cache.
+# id → UserProfileRow (değişmez, kopyalamaya gerek yok); kullanıcı adı → id
+# (kayıt id cache'inden okunur, böylece invalidation tek anahtar silmekle yapılır).
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+_user_cache = get_cache("users_by_id", max_size=4096, ttl_seconds=USER_CACHE_TTL)
+_user_id_by_name = get_cache("users_by_name", max_size=4096, ttl_seconds=USER_CACHE_TTL)
+
+def _calibrate_bcrypt_cost(target_ms: float = 100.0, floor: int = 10) -> int:
+    """
+    Bu makinede tek hash'i ~target_ms süren bcrypt maliyetini bul.
+    
+    Maliyet +1 süreyi ikiye katladığından düşük maliyetli tek ölçümden
+    hesaplanır; sonuç `floor` altına inmez.
+    """
+    probe = 6
+    start = time.perf_counter()
+    bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds=probe))
+    elapsed_ms = max((time.perf_counter() - start) * 1000, 0.01)
+    cost = probe + round(math.log2(target_ms / elapsed_ms))
+    return max(floor, min(cost, 16))
+
+
+# bcrypt maliyet faktörü (argon2-cffi yoksa yeni hash'ler için). Her +1
+# doğrulama süresini ikiye katlar; 10, login başına ~60 ms civarında kalır.
+# "auto" verilirse başlangıçta ~100 ms'ye göre kalibre edilir. Mevcut hash'ler
+# kendi maliyetleriyle doğrulanır.
+_bcrypt_cost_env = os.getenv("BCRYPT_COST", "10").strip().lower()
+BCRYPT_COST = _calibrate_bcrypt_cost() if _bcrypt_cost_env == "auto" else int(_bcrypt_cost_env)
+
+# bcrypt/argon2'nin C çekirdeği GIL'i bırakır. Senkron DAO hash'i doğrudan
+# çağıran thread'de hesaplar; bu havuz AsyncUserDAO (event loop'u
+# bloklamamak için) ve toplu kullanıcı oluşturma (paralel hash) içindir.
+_BCRYPT_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 2,
+                                  thread_name_prefix="bcrypt")
+
+
+
+# bcrypt girdisi 72 byte'ta kesilir. Yeni bcrypt hash'leri şifrenin
+# SHA-256 özetinin base64'ü (sabit 44 byte) üzerinden üretilir ve bu önekle
+# saklanır; öneksiz `$2b$...` hash'ler eski (ham şifre) formattır.
+_BCRYPT_SHA256_PREFIX = '$bcrypt-sha256$'
+
+
+def _prehash(password: str) -> bytes:
+    """bcrypt girdisi: base64(sha256(şifre)), uzunluktan bağımsız 44 byte."""
+    return base64.b64encode(hashlib.sha256(password.encode('utf-8')).digest())
+
+
+def hash_password(password: str) -> str:
+    """
+    Yeni şifre hash'i üret: argon2id (argon2-cffi varsa), yoksa bcrypt-sha256.
+    
+    Her format SIFRE_HASH kolonunda kendini tanımlayan string olarak
+    saklanır (`$argon2id$...` / `$bcrypt-sha256$$2b$...` / eski `$2b$...`);
+    doğrulama öneke göre yapılır.
+    """
+    if _ARGON2 is not None:
+        return _ARGON2.hash(password)
+    salt = bcrypt.gensalt(rounds=BCRYPT_COST)
+    return _BCRYPT_SHA256_PREFIX + bcrypt.hashpw(_prehash(password), salt).decode('utf-8')
+
+
+def _needs_rehash(hashed: str) -> bool:
+    """Eski formatlı ya da güncel olmayan parametreli hash'ler True."""
+    if _ARGON2 is None:
+        return not hashed.startswith(_BCRYPT_SHA256_PREFIX)
+    if not hashed.startswith('$argon2'):
+        return True
+    return _ARGON2.check_needs_rehash(hashed)
+
+
+# Başarılı şifre doğrulamaları kısa süre hatırlanır; aynı kullanıcının art arda
+# girişlerinde (oturum yenileme vb.) bcrypt/argon2 maliyeti tekrar ödenmez.
+# Anahtar süreç başına rastgele pepper ile HMAC'tir, düz şifre tutulmaz;
+# hash değişince anahtar da değiştiği için ayrıca invalidation gerekmez.
+VERIFY_CACHE_TTL = int(os.getenv("VERIFY_CACHE_TTL", "120"))
+_VERIFY_PEPPER = os.urandom(32)
+_verify_cache = get_cache("password_verify", max_size=1024, ttl_seconds=VERIFY_CACHE_TTL)
+
+
+# Kullanıcı bulunamadığında da bir şifre doğrulaması yapılır; yanıt süresi
+# kullanıcının var olup olmadığını ele vermez. Hash import sırasında bir kez üretilir.
+_DUMMY_HASH = hash_password("wms-dummy-password")
+
+
+# Aktivite kayıtları tek tek INSERT yerine tamponlanıp toplu yazılır.
+ACTIVITY_FLUSH_INTERVAL = 1.0   # saniye
+ACTIVITY_BATCH_SIZE = 256       # bu kadar satır birikince beklemeden yaz
+ACTIVITY_BUFFER_MAX = 10000     # DB erişilemezse bellekte tutulacak üst sınır
+
+_ACTIVITY_INSERT_SQL = """
+    INSERT INTO WMS_KULLANICI_AKTIVITELERI 
+    (KULLANICI_REF, AKTIVITE, MODUL, DETAY, IP_ADRESI)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+class _ActivityBuffer:
+    """
+    `log_activity` satırlarını biriktirip arka plan thread'inde
+    `fast_executemany` ile tek seferde yazan tampon.
+    """
+    
+    def __init__(self):
+        self._rows = deque(maxlen=ACTIVITY_BUFFER_MAX)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._dropped = 0
+    
+    def add(self, row: tuple) -> None:
+        with self._lock:
+            if len(self._rows) == ACTIVITY_BUFFER_MAX:
+                self._dropped += 1   # deque en eski satırı atar
+            self._rows.append(row)
+            pending = len(self._rows)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="activity-flusher", daemon=True
+                )
+                self._thread.start()
+        if pending >= ACTIVITY_BATCH_SIZE:
+            self._wake.set()
+    
+    def _run(self):
+        while True:
+            self._wake.wait(ACTIVITY_FLUSH_INTERVAL)
+            self._wake.clear()
+            self.flush()
+    
+    def flush(self) -> int:
+        """Bekleyen satırları yaz, yazılan satır sayısını döndür."""
+        with self._flush_lock:
+            with self._lock:
+                dropped, self._dropped = self._dropped, 0
+                if not self._rows:
+                    return 0
+                batch = list(self._rows)
+                self._rows.clear()
+            
+            if dropped:
+                logger.warning(f"Activity buffer full, {dropped} oldest rows dropped")
+            
+            try:
+                with get_conn() as conn:
+                    cursor = conn.cursor()
+                    cursor.fast_executemany = True
+                    cursor.executemany(_ACTIVITY_INSERT_SQL, batch)
+                    conn.commit()
+                return len(batch)
+            except Exception as e:
+                logger.error(f"Error logging activity ({len(batch)} rows dropped): {e}")
+                return 0
+
+
+_activity_buffer = _ActivityBuffer()
+atexit.register(_activity_buffer.flush)
+
+
+# Kullanıcı tablolarına ait migration script'leri (init_tables sırasıyla çalıştırır)
+USER_MIGRATIONS = [
+    "app/migrations/add_user_indexes.sql",
+    "app/migrations/add_user_bulk_type.sql",
+]
+
+# Batch ayırıcı: kendi satırında duran GO (büyük/küçük harf, CRLF, sondaki ; dahil)
+_GO_RE = re.compile(r"^\s*GO\s*;?\s*$", re.MULTILINE | re.IGNORECASE)
+
+
+class UserRow(NamedTuple):
+    """Giriş sorgusunun (`_AUTH_SQL`) bir satırı; alan sırası SELECT ile aynıdır."""
+    id: int
+    password_hash: str
+
+
+class LoginRow(NamedTuple):
+    """Başarılı giriş UPDATE'inin (`_LOGIN_OK_SQL`) OUTPUT satırı."""
+    id: int
+    username: str
+    email: str
+    full_name: str
+    role: str
+
+
+class ActivityRow(NamedTuple):
+    """`get_user_activities` sorgusunun bir satırı."""
+    action: str
+    module: str
+    details: str
+    ip_address: str
+    created_at: datetime
+
+
+class RecentActivityRow(NamedTuple):
+    """`get_recent_activities` sorgusunun bir satırı."""
+    created_at: datetime
+    username: str
+    action: str
+    module: str
+    details: str
+
+
+class UserProfileRow(NamedTuple):
+    """Profil sorgularının bir satırı; `_asdict()` DAO'nun döndürdüğü dict'tir."""
+    id: int
+    username: str
+    email: str
+    full_name: str
+    role: str
+    is_active: bool
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    last_login: Optional[datetime]
+
+
+# UserProfileRow alan sırasıyla aynı
+_PROFILE_COLUMNS = """
+        LOGICALREF,
+        KULLANICI_ADI,
+        EMAIL,
+        AD_SOYAD,
+        ROL,
+        AKTIF,
+        OLUSTURMA_TARIHI,
+        GUNCELLEME_TARIHI,
+        SON_GIRIS"""
+
+_USER_BY_ID_SQL = f"SELECT {_PROFILE_COLUMNS} FROM WMS_KULLANICILAR WHERE LOGICALREF = ?"
+_USER_BY_NAME_SQL = f"SELECT {_PROFILE_COLUMNS} FROM WMS_KULLANICILAR WHERE KULLANICI_ADI = ?"
+
+
+# Giriş sorgusu: `KULLANICI_ADI = ? OR EMAIL = ?` yerine iki ayrı index
+# seek (bkz. app/migrations/add_user_indexes.sql). Kullanıcı adı eşleşmesi
+# e-posta eşleşmesinden önce gelir. Kolon sırası UserRow ile aynıdır.
+# Pasif ve kilitli hesaplar sunucuda elenir; satır hiç dönmez. Yalnızca
+# doğrulama için gereken kolonlar seçilir (profil alanları başarılı girişte
+# _LOGIN_OK_SQL'in OUTPUT'undan gelir), hepsi add_user_indexes.sql'deki
+# index'lerde INCLUDE edilidir (key lookup yok). Profil sorguları
+# (_PROFILE_COLUMNS) SIFRE_HASH'i hiç seçmez.
+_AUTH_COLUMNS = """
+        LOGICALREF,
+        SIFRE_HASH"""
+
+_AUTH_FILTER = "AKTIF = 1 AND (KILITLI_TARIH IS NULL OR KILITLI_TARIH <= GETDATE())"
+
+_AUTH_SQL = f"""
+    SELECT TOP 1 {_AUTH_COLUMNS}
+    FROM (
+        SELECT 0 AS ESLESME, {_AUTH_COLUMNS}
+        FROM WMS_KULLANICILAR
+        WHERE KULLANICI_ADI = ? AND {_AUTH_FILTER}
+        UNION ALL
+        SELECT 1 AS ESLESME, {_AUTH_COLUMNS}
+        FROM WMS_KULLANICILAR
+        WHERE EMAIL = ? AND EMAIL <> '' AND {_AUTH_FILTER}
+    ) U
+    ORDER BY ESLESME
+"""
+
+# Başarılı giriş kaydı. İlk parametre yeni şifre hash'i (argon2id'ye taşıma)
+# ya da None; hash değişimi ayrı bir round-trip gerektirmez. Dönüş dict'inin
+# profil alanları OUTPUT ile aynı istekte gelir (kolon sırası LoginRow ile aynı).
+_LOGIN_OK_SQL = """
+    UPDATE WMS_KULLANICILAR 
+    SET SON_GIRIS = GETDATE(), 
+        BASARISIZ_GIRIS = 0, 
+        KILITLI_TARIH = NULL,
+        SIFRE_HASH = COALESCE(?, SIFRE_HASH),
+        GUNCELLEME_TARIHI = GETDATE()
+    OUTPUT INSERTED.LOGICALREF, INSERTED.KULLANICI_ADI, INSERTED.EMAIL,
+           INSERTED.AD_SOYAD, INSERTED.ROL
+    WHERE LOGICALREF = ?
+"""
+
+# Başarısız giriş: sayaç artışı ve kilit kararı tek atomik UPDATE'te (satır
+# kilidi, okuma-yazma yarışı yok). Yeni sayaç OUTPUT ile döner, ayrıca SELECT
+# gerekmez.
+LOGIN_MAX_FAILED_ATTEMPTS = 5
+
+_LOGIN_FAILED_SQL = f"""
+    UPDATE WMS_KULLANICILAR WITH (ROWLOCK)
+    SET BASARISIZ_GIRIS = BASARISIZ_GIRIS + 1,
+        KILITLI_TARIH = CASE 
+            WHEN BASARISIZ_GIRIS >= {LOGIN_MAX_FAILED_ATTEMPTS - 1} 
+            THEN DATEADD(MINUTE, 30, GETDATE())
+            ELSE KILITLI_TARIH
+        END,
+        GUNCELLEME_TARIHI = GETDATE()
+    OUTPUT INSERTED.BASARISIZ_GIRIS
+    WHERE LOGICALREF = ?
+"""
+
+_TABLES_EXIST_SQL = """
+    SELECT CASE WHEN OBJECT_ID('dbo.WMS_KULLANICILAR', 'U') IS NULL
+                THEN 0 ELSE 1 END AS exists_flag
+"""
+
+_ALL_USERS_SQL = f"SELECT {_PROFILE_COLUMNS} FROM WMS_KULLANICILAR ORDER BY KULLANICI_ADI"
+
+# Sayfalı liste: toplam satır sayısı aynı sorguda COUNT(*) OVER() ile gelir
+_USERS_PAGE_SQL = f"""
+    SELECT {_PROFILE_COLUMNS}, COUNT(*) OVER() AS TOPLAM
+    FROM WMS_KULLANICILAR
+    ORDER BY KULLANICI_ADI
+    OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
+"""
+
+# Her metrik ayrı COUNT: dar/filtreli index'lerden (add_user_indexes.sql)
+# sayılır, tabloyu tarayan tek SUM(CASE ...) yerine.
+_LOGIN_STATS_SQL = """
+    SELECT 
+        (SELECT COUNT(*) FROM WMS_KULLANICILAR) as total_users,
+        (SELECT COUNT(*) FROM WMS_KULLANICILAR WHERE AKTIF = 1) as active_users,
+        (SELECT COUNT(*) FROM WMS_KULLANICILAR
+         WHERE SON_GIRIS > DATEADD(DAY, -7, GETDATE())) as weekly_active,
+        (SELECT COUNT(*) FROM WMS_KULLANICILAR
+         WHERE KILITLI_TARIH IS NOT NULL AND KILITLI_TARIH > GETDATE()) as locked_users
+"""
+
+# Yönetim ekranı açılışı: tablo kontrolü, kullanıcı listesi ve istatistikler
+# tek batch'te, üç result set olarak döner. Tablo yoksa yalnızca ilki gelir.
+_ADMIN_BOOTSTRAP_SQL = f"""
+    SET NOCOUNT ON;
+    {_TABLES_EXIST_SQL};
+    IF OBJECT_ID('dbo.WMS_KULLANICILAR', 'U') IS NOT NULL
+    BEGIN
+        {_ALL_USERS_SQL};
+        {_LOGIN_STATS_SQL};
+    END
+"""
+
+
+# create_users: parça başına satır (6 parametre/satır, SQL Server limiti 2100)
+CREATE_USERS_CHUNK = 300
+
+# create_users: tüm satırlar tek TVP (dbo.WMS_KULLANICI_INSERT, bkz.
+# add_user_bulk_type.sql); kullanıcılar ve aktivite kayıtları tek batch'te.
+_CREATE_USERS_TVP_SQL = """
+    SET NOCOUNT ON;
+    DECLARE @yeni TABLE (LOGICALREF INT, KULLANICI_ADI NVARCHAR(100));
+    
+    INSERT INTO WMS_KULLANICILAR (
+        KULLANICI_ADI, EMAIL, SIFRE_HASH, AD_SOYAD, ROL, AKTIF,
+        OLUSTURMA_TARIHI, GUNCELLEME_TARIHI
+    )
+    OUTPUT INSERTED.LOGICALREF, INSERTED.KULLANICI_ADI INTO @yeni
+    SELECT KULLANICI_ADI, EMAIL, SIFRE_HASH, AD_SOYAD, ROL, AKTIF, GETDATE(), GETDATE()
+    FROM ?;
+    
+    INSERT INTO WMS_KULLANICI_AKTIVITELERI (KULLANICI_REF, AKTIVITE, MODUL, DETAY, IP_ADRESI)
+    SELECT LOGICALREF, 'user_created', 'users', CONCAT('User ', KULLANICI_ADI, ' created'), NULL
+    FROM @yeni;
+    
+    SELECT LOGICALREF, KULLANICI_ADI FROM @yeni;
+"""
+
+# update_user ile güncellenebilen alanlar → kolon adları
+_UPDATABLE_FIELDS = {
+    'username': 'KULLANICI_ADI',
+    'email': 'EMAIL',
+    'full_name': 'AD_SOYAD',
+    'role': 'ROL',
+    'is_active': 'AKTIF'
+}
+
+
+@lru_cache(maxsize=32)
+def _build_update_sql(fields: tuple) -> str:
+    """
+    Sıralı alan listesi için UPDATE metni üret.
+    
+    Aynı alan kombinasyonu hep aynı SQL metnini verir; böylece SQL Server
+    plan cache'i ve hazırlanmış cursor'lar tekrar kullanılabilir.
+    """
+    sets = ", ".join(f"{_UPDATABLE_FIELDS[f]} = ?" for f in fields)
+    return f"""
+        UPDATE WMS_KULLANICILAR 
+        SET {sets}, GUNCELLEME_TARIHI = GETDATE()
+        WHERE LOGICALREF = ?
+    """
+
+
+def _check_password(password: str, hashed: str) -> bool:
+    """argon2id/bcrypt-sha256/bcrypt doğrulaması (öneke göre); uyuşmazlık veya bozuk hash'te False."""
+    key = hmac.new(_VERIFY_PEPPER, f"{hashed}\0{password}".encode('utf-8'), hashlib.sha256).digest()
+    if _verify_cache.get(key):
+        return True
+    try:
+        if hashed.startswith('$argon2'):
+            ok = _ARGON2 is not None and _ARGON2.verify(hashed, password)
+        elif hashed.startswith(_BCRYPT_SHA256_PREFIX):
+            ok = bcrypt.checkpw(_prehash(password),
+                                hashed[len(_BCRYPT_SHA256_PREFIX):].encode('utf-8'))
+        else:
+            ok = bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    except Exception:
+        return False
+    if ok:
+        _verify_cache.set(key, True)
+    return ok
+
+
+def _fetch_auth_row(username: str) -> Optional[UserRow]:
+    """Giriş sorgusunu kendi bağlantısında çalıştır."""
+    with get_conn() as conn:
+        cursor = get_cached_cursor(conn, _AUTH_SQL)
+        cursor.execute(_AUTH_SQL, [username, username])
+        row = cursor.fetchone()
+        cursor.nextset()
+        return UserRow._make(row) if row else None
+
+
+def _record_login(user_id: int, new_hash: Optional[str]) -> LoginRow:
+    """`_LOGIN_OK_SQL`'i kendi bağlantısında çalıştır, OUTPUT satırını döndür."""
+    with get_conn() as conn:
+        cursor = get_cached_cursor(conn, _LOGIN_OK_SQL)
+        cursor.execute(_LOGIN_OK_SQL, [new_hash, user_id])
+        login = LoginRow._make(cursor.fetchone())
+        cursor.nextset()
+        conn.commit()
+        return login
+
+
+def _stats_dict(row: Optional[Dict]) -> Dict:
+    """`_LOGIN_STATS_SQL` satırını istatistik sözlüğüne çevir."""
+    row = row or {}
+    return {
+        'total_users': row.get('total_users') or 0,
+        'active_users': row.get('active_users') or 0,
+        'weekly_active_users': row.get('weekly_active') or 0,
+        'locked_users': row.get('locked_users') or 0
+    }
+
+
+def _cache_user(user: UserProfileRow) -> None:
+    """Kullanıcı kaydını id ve kullanıcı adı anahtarlarıyla cache'e yaz."""
+    _user_cache.set(user.id, user)
+    _user_id_by_name.set(user.username, user.id)
+
+
+# Tablolar çalışma sırasında kaybolmaz: varlık bir kez doğrulanınca hatırlanır.
+# Yokken sonuç cache'lenmez, init_tables/ensure_schema sonrası yeniden bakılır.
+_tables_exist = False
+
+
+def _invalidate_schema_cache() -> None:
+    """`check_tables_exist` sonucunu unut (şema DDL'i sonrası)."""
+    global _tables_exist
+    _tables_exist = False
+
+
+def _update_and_log(update_sql: str, params: List, user_id: int, action: str,
+                    module: str, details: str) -> int:
+    """
+    UPDATE ve aktivite INSERT'ini tek batch/tek transaction'da çalıştır.
+    
+    Aktivite yalnızca UPDATE bir satırı etkilediyse yazılır (tampon
+    kullanılmaz, değişiklik ve kaydı birlikte commit edilir).
+    
+    Returns:
+        UPDATE'in etkilediği satır sayısı
+    """
+    batch = f"""
+        SET NOCOUNT ON;
+        SET XACT_ABORT ON;
+        DECLARE @n INT;
+        {update_sql};
+        SET @n = @@ROWCOUNT;
+        IF @n > 0
+            {_ACTIVITY_INSERT_SQL};
+        SELECT @n;
+    """
+    with get_conn() as conn:
+        cursor = get_cached_cursor(conn, batch)
+        cursor.execute(batch, [*params, user_id, action, module, details, None])
+        rows = cursor.fetchone()[0]
+        cursor.nextset()
+        conn.commit()
+    return rows
+
+
+def _invalidate_user(user_id: int) -> None:
+    """Kullanıcı kaydını ve (biliniyorsa) eski ad → id eşlemesini cache'ten düşür."""
+    cached = _user_cache.get(user_id)
+    _user_cache.delete(user_id)
+    if cached is not None:
+        _user_id_by_name.delete(cached.username)
+
 
 class UserDAO:
     """Kullanıcı veritabanı işlemleri."""
@@ -28,105 +538,60 @@ class UserDAO:
             Başarılıysa kullanıcı bilgileri, değilse None
         """
         try:
-            # Kullanıcıyı bul ve şifreyi kontrol et
-            user = fetch_one(
-                """
-                SELECT 
-                    LOGICALREF,
-                    KULLANICI_ADI,
-                    EMAIL,
-                    SIFRE_HASH,
-                    AD_SOYAD,
-                    ROL,
-                    AKTIF,
-                    KILITLI_TARIH,
-                    BASARISIZ_GIRIS
-                FROM WMS_KULLANICILAR 
-                WHERE KULLANICI_ADI = ? OR EMAIL = ?
-                """,
-                [username, username]
-            )
-            
-            if not user:
-                logger.warning(f"User not found: {username}")
-                return None
-            
-            # Hesap kilitli mi kontrol et
-            if user['kilitli_tarih'] and user['kilitli_tarih'] > datetime.now():
-                logger.warning(f"Account locked: {username}")
-                return None
+            # Bağlantı yalnızca sorgular süresince tutulur; hash doğrulaması
+            # sırasında havuza geri verilmiş olur.
+            user = _fetch_auth_row(username)
             
-            # Hesap aktif mi kontrol et
-            if not user['aktif']:
-                logger.warning(f"Account inactive: {username}")
+            if user is None:
+                self._verify_password(password, _DUMMY_HASH)
+                logger.warning(f"User not found, inactive or locked: {username}")
                 return None
             
             # Şifreyi doğrula
-            if not self._verify_password(password, user['sifre_hash']):
+            if not self._verify_password(password, user.password_hash):
                 # Başarısız deneme sayısını artır
-                self._update_failed_attempts(user['logicalref'])
+                self._update_failed_attempts(user.id)
                 return None
             
-            # Başarılı giriş: son giriş tarihini güncelle, başarısız denemeleri sıfırla
-            execute_query(
-                """
-                UPDATE WMS_KULLANICILAR 
-                SET SON_GIRIS = GETDATE(), 
-                    BASARISIZ_GIRIS = 0, 
-                    KILITLI_TARIH = NULL,
-                    GUNCELLEME_TARIHI = GETDATE()
-                WHERE LOGICALREF = ?
-                """,
-                [user['logicalref']]
-            )
+            # bcrypt hash'leri düz şifre elimizdeyken argon2id'ye taşı
+            new_hash = self._hash_password(password) if _needs_rehash(user.password_hash) else None
+            
+            # Başarılı giriş: son giriş tarihini güncelle, başarısız denemeleri
+            # sıfırla; profil alanları OUTPUT'tan okunur
+            login = _record_login(user.id, new_hash)
             
-            # Kullanıcı bilgilerini döndür (şifre hash'i olmadan)
-            return {
-                'id': user['logicalref'],
-                'username': user['kullanici_adi'],
-                'email': user['email'],
-                'full_name': user['ad_soyad'],
-                'role': user['rol'],
-                'is_active': user['aktif']
-            }
+            _invalidate_user(user.id)
+            
+            return self._login_result(login)
             
         except Exception as e:
             logger.error(f"Authentication error: {e}")
             return None
     
+    @staticmethod
+    def _login_result(user: LoginRow) -> Dict:
+        """Başarılı girişte döndürülen kullanıcı bilgileri (şifre hash'i olmadan)."""
+        return {
+            'id': user.id,
+            'username': user.username,
+            'email': user.email,
+            'full_name': user.full_name,
+            'role': user.role,
+            'is_active': True   # pasif hesaplar _AUTH_SQL'de elenir
+        }
+    
     def get_user_by_id(self, user_id: int) -> Optional[Dict]:
         """ID'ye göre kullanıcı getir."""
+        cached = _user_cache.get(user_id)
+        if cached is not None:
+            return cached._asdict()
+        
         try:
-            user = fetch_one(
-                """
-                SELECT 
-                    LOGICALREF,
-                    KULLANICI_ADI,
-                    EMAIL,
-                    AD_SOYAD,
-                    ROL,
-                    AKTIF,
-                    OLUSTURMA_TARIHI,
-                    GUNCELLEME_TARIHI,
-                    SON_GIRIS
-                FROM WMS_KULLANICILAR
-                WHERE LOGICALREF = ?
-                """,
-                [user_id]
-            )
+            user = fetch_one_as(UserProfileRow, _USER_BY_ID_SQL, [user_id])
             
             if user:
-                return {
-                    'id': user['logicalref'],
-                    'username': user['kullanici_adi'],
-                    'email': user['email'],
-                    'full_name': user['ad_soyad'],
-                    'role': user['rol'],
-                    'is_active': user['aktif'],
-                    'created_at': user['olusturma_tarihi'],
-                    'updated_at': user['guncelleme_tarihi'],
-                    'last_login': user['son_giris']
-                }
+                _cache_user(user)
+                return user._asdict()
             return None
             
         except Exception as e:
@@ -135,37 +600,18 @@ class UserDAO:
     
     def get_user_by_username(self, username: str) -> Optional[Dict]:
         """Kullanıcı adına göre kullanıcı getir."""
+        user_id = _user_id_by_name.get(username)
+        if user_id is not None:
+            cached = _user_cache.get(user_id)
+            if cached is not None and cached.username == username:
+                return cached._asdict()
+        
         try:
-            user = fetch_one(
-                """
-                SELECT 
-                    LOGICALREF,
-                    KULLANICI_ADI,
-                    EMAIL,
-                    AD_SOYAD,
-                    ROL,
-                    AKTIF,
-                    OLUSTURMA_TARIHI,
-                    GUNCELLEME_TARIHI,
-                    SON_GIRIS
-                FROM WMS_KULLANICILAR
-                WHERE KULLANICI_ADI = ?
-                """,
-                [username]
-            )
+            user = fetch_one_as(UserProfileRow, _USER_BY_NAME_SQL, [username])
             
             if user:
-                return {
-                    'id': user['logicalref'],
-                    'username': user['kullanici_adi'],
-                    'email': user['email'],
-                    'full_name': user['ad_soyad'],
-                    'role': user['rol'],
-                    'is_active': user['aktif'],
-                    'created_at': user['olusturma_tarihi'],
-                    'updated_at': user['guncelleme_tarihi'],
-                    'last_login': user['son_giris']
-                }
+                _cache_user(user)
+                return user._asdict()
             return None
             
         except Exception as e:
@@ -175,43 +621,48 @@ class UserDAO:
     def get_all_users(self) -> List[Dict]:
         """Tüm kullanıcıları getir."""
         try:
-            users = fetch_all(
-                """
-                SELECT 
-                    LOGICALREF,
-                    KULLANICI_ADI,
-                    EMAIL,
-                    AD_SOYAD,
-                    ROL,
-                    AKTIF,
-                    OLUSTURMA_TARIHI,
-                    GUNCELLEME_TARIHI,
-                    SON_GIRIS
-                FROM WMS_KULLANICILAR
-                ORDER BY KULLANICI_ADI
-                """
-            )
-            
-            result = []
-            for user in users:
-                result.append({
-                    'id': user['logicalref'],
-                    'username': user['kullanici_adi'],
-                    'email': user['email'],
-                    'full_name': user['ad_soyad'],
-                    'role': user['rol'],
-                    'is_active': user['aktif'],
-                    'created_at': user['olusturma_tarihi'],
-                    'updated_at': user['guncelleme_tarihi'],
-                    'last_login': user['son_giris']
-                })
-            
-            return result
+            return list(self.get_all_users_iter())
             
         except Exception as e:
             logger.error(f"Error getting all users: {e}")
             return []
     
+    def get_users_page(self, limit: int = 50, offset: int = 0) -> Tuple[List[Dict], int]:
+        """
+        Kullanıcı listesinin bir sayfası ve toplam kullanıcı sayısı (tek round-trip).
+        
+        Args:
+            limit: Sayfa boyutu
+            offset: Atlanacak satır sayısı
+            
+        Returns:
+            (kullanıcılar, toplam)
+        """
+        try:
+            with get_conn() as conn:
+                cursor = get_cached_cursor(conn, _USERS_PAGE_SQL)
+                cursor.execute(_USERS_PAGE_SQL, [max(0, offset), max(1, limit)])
+                rows = cursor.fetchall()
+            
+            if not rows:
+                # Son sayfanın ötesi: toplamı ayrıca öğren
+                return [], self.get_login_stats()['total_users'] if offset else 0
+            
+            return [UserProfileRow._make(row[:-1])._asdict() for row in rows], rows[0][-1]
+            
+        except Exception as e:
+            logger.error(f"Error getting users page: {e}")
+            return [], 0
+    
+    def get_all_users_iter(self) -> Iterator[Dict]:
+        """
+        Tüm kullanıcıları parça parça üret (bkz. `fetch_iter_as`).
+        
+        Hatalar çağırana iletilir.
+        """
+        for user in fetch_iter_as(UserProfileRow, _ALL_USERS_SQL):
+            yield user._asdict()
+    
     def create_user(self, user_data: Dict) -> Optional[int]:
         """
         Yeni kullanıcı oluştur.
@@ -260,6 +711,9 @@ class UserDAO:
                 user_id = result[0]  # OUTPUT INSERTED.LOGICALREF
                 logger.info(f"User created: {user_data['username']} (ID: {user_id})")
                 
+                # Aynı adla silinmiş bir kullanıcıya ait eşleme kalmış olabilir
+                _user_id_by_name.delete(user_data['username'])
+                
                 # Aynı transaction'da aktiviteyi logla
                 try:
                     cursor.execute(
@@ -282,6 +736,107 @@ class UserDAO:
             logger.error(f"Error creating user: {e}")
             return None
     
+    def create_users(self, users: List[Dict]) -> List[Optional[int]]:
+        """
+        Toplu kullanıcı oluştur (CSV içe aktarma, migration).
+        
+        Satırlar tek table-valued parametreyle, aktivite kayıtlarıyla birlikte
+        tek round-trip'te yazılır; tablo tipi yoksa `CREATE_USERS_CHUNK`
+        büyüklüğünde çok satırlı INSERT'lere düşülür. Düz `password` verilen
+        satırların şifreleri hash havuzunda paralel hash'lenir, yoksa
+        `password_hash` kullanılır. Hepsi tek transaction'dadır.
+        
+        Args:
+            users: `create_user` ile aynı biçimde kullanıcı dict'leri
+            
+        Returns:
+            Girdi sırasıyla yeni kullanıcı ID'leri; hata olursa boş liste
+        """
+        if not users:
+            return []
+        
+        try:
+            plain = [u['password'] for u in users if u.get('password')]
+            hashes = iter(_BCRYPT_POOL.map(hash_password, plain))
+            
+            rows = [
+                (
+                    u['username'],
+                    u.get('email', ''),
+                    next(hashes) if u.get('password') else u.get('password_hash', ''),
+                    u.get('full_name', ''),
+                    u.get('role', 'operator'),
+                    u.get('is_active', True)
+                )
+                for u in users
+            ]
+            
+            with get_conn() as conn:
+                cursor = conn.cursor()
+                try:
+                    ids_by_name = self._insert_users_tvp(cursor, rows)
+                except Exception as e:
+                    # Tablo tipi yok ya da sürücü TVP desteklemiyor
+                    logger.debug(f"TVP insert unavailable, using chunked INSERT: {e}")
+                    conn.rollback()
+                    cursor = conn.cursor()
+                    ids_by_name = self._insert_users_chunked(cursor, rows)
+                conn.commit()
+            
+            for name in ids_by_name:
+                _user_id_by_name.delete(name)
+            
+            logger.info(f"Users created: {len(ids_by_name)}")
+            return [ids_by_name.get(u['username']) for u in users]
+            
+        except Exception as e:
+            logger.error(f"Error creating users: {e}")
+            return []
+    
+    @staticmethod
+    def _insert_users_tvp(cursor, rows: List[tuple]) -> Dict[str, int]:
+        """Kullanıcıları ve aktivite satırlarını tek round-trip'te yaz (`_CREATE_USERS_TVP_SQL`)."""
+        cursor.execute(_CREATE_USERS_TVP_SQL, [["WMS_KULLANICI_INSERT", "dbo", *rows]])
+        # OUTPUT sırası girdi sırasını garanti etmez → kullanıcı adıyla eşle
+        return {name: user_id for user_id, name in cursor.fetchall()}
+    
+    @staticmethod
+    def _insert_users_chunked(cursor, rows: List[tuple]) -> Dict[str, int]:
+        """TVP yoksa: `CREATE_USERS_CHUNK`'lık çok satırlı INSERT'ler + executemany aktivite."""
+        ids_by_name = {}
+        for start in range(0, len(rows), CREATE_USERS_CHUNK):
+            chunk = rows[start:start + CREATE_USERS_CHUNK]
+            values = ", ".join(["(?, ?, ?, ?, ?, ?, GETDATE(), GETDATE())"] * len(chunk))
+            cursor.execute(
+                f"""
+                INSERT INTO WMS_KULLANICILAR (
+                    KULLANICI_ADI, 
+                    EMAIL, 
+                    SIFRE_HASH, 
+                    AD_SOYAD, 
+                    ROL,
+                    AKTIF,
+                    OLUSTURMA_TARIHI,
+                    GUNCELLEME_TARIHI
+                )
+                OUTPUT INSERTED.LOGICALREF, INSERTED.KULLANICI_ADI
+                VALUES {values}
+                """,
+                [value for row in chunk for value in row]
+            )
+            # OUTPUT sırası VALUES sırasını garanti etmez → kullanıcı adıyla eşle
+            ids_by_name.update((name, user_id) for user_id, name in cursor.fetchall())
+        
+        cursor.fast_executemany = True
+        cursor.executemany(
+            _ACTIVITY_INSERT_SQL,
+            [
+                (user_id, 'user_created', 'users', f"User {name} created", None)
+                for name, user_id in ids_by_name.items()
+            ]
+        )
+        return ids_by_name
+    
     def update_user(self, user_id: int, user_data: Dict) -> bool:
         """
         Kullanıcı bilgilerini güncelle.
@@ -294,41 +849,18 @@ class UserDAO:
             Başarılıysa True
         """
         try:
-            allowed_fields = {
-                'username': 'KULLANICI_ADI',
-                'email': 'EMAIL',
-                'full_name': 'AD_SOYAD',
-                'role': 'ROL',
-                'is_active': 'AKTIF'
-            }
-            
-            updates = []
-            values = []
-            
-            for field, value in user_data.items():
-                if field in allowed_fields:
-                    updates.append(f"{allowed_fields[field]} = ?")
-                    values.append(value)
-            
-            if not updates:
+            fields = tuple(sorted(f for f in user_data if f in _UPDATABLE_FIELDS))
+            if not fields:
                 return False
             
-            updates.append("GUNCELLEME_TARIHI = GETDATE()")
+            query = _build_update_sql(fields)
+            values = [user_data[f] for f in fields]
             values.append(user_id)
             
-            query = f"""
-                UPDATE WMS_KULLANICILAR 
-                SET {', '.join(updates)}
-                WHERE LOGICALREF = ?
-            """
-            
-            rows = execute_query(query, values)
-            
-            if rows > 0:
-                self.log_activity(user_id, 'user_updated', 'users', f"User updated: {list(user_data.keys())}")
-                return True
-                
-            return False
+            rows = _update_and_log(query, values, user_id, 'user_updated', 'users',
+                                   f"User updated: {list(user_data.keys())}")
+            _invalidate_user(user_id)
+            return rows > 0
             
         except Exception as e:
             logger.error(f"Error updating user: {e}")
@@ -339,21 +871,18 @@ class UserDAO:
         try:
             password_hash = self._hash_password(new_password)
             
-            rows = execute_query(
+            rows = _update_and_log(
                 """
                 UPDATE WMS_KULLANICILAR 
                 SET SIFRE_HASH = ?, 
                     GUNCELLEME_TARIHI = GETDATE()
                 WHERE LOGICALREF = ?
                 """,
-                [password_hash, user_id]
+                [password_hash, user_id],
+                user_id, 'password_changed', 'users', 'Password changed'
             )
-            
-            if rows > 0:
-                self.log_activity(user_id, 'password_changed', 'users', 'Password changed')
-                return True
-                
-            return False
+            _invalidate_user(user_id)
+            return rows > 0
             
         except Exception as e:
             logger.error(f"Error changing password: {e}")
@@ -361,27 +890,38 @@ class UserDAO:
     
     def log_activity(self, user_id: int, action: str, module: str = None, 
                     details: str = None, ip_address: str = None) -> bool:
-        """Kullanıcı aktivitesini logla."""
-        try:
-            execute_query(
-                """
-                INSERT INTO WMS_KULLANICI_AKTIVITELERI 
-                (KULLANICI_REF, AKTIVITE, MODUL, DETAY, IP_ADRESI)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                [user_id, action, module, details, ip_address]
-            )
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error logging activity: {e}")
-            return False
+        """
+        Kullanıcı aktivitesini logla.
+        
+        Kayıt tampona eklenir ve en geç `ACTIVITY_FLUSH_INTERVAL` saniye
+        içinde toplu INSERT ile yazılır.
+        """
+        _activity_buffer.add((user_id, action, module, details, ip_address))
+        return True
+    
+    def flush_activities(self) -> int:
+        """Tampondaki aktiviteleri hemen yaz."""
+        return _activity_buffer.flush()
     
-    def get_user_activities(self, user_id: int, limit: int = 100) -> List[Dict]:
-        """Kullanıcı aktivitelerini getir."""
+    def get_user_activities(self, user_id: int, limit: int = 100,
+                            before: Optional[datetime] = None) -> List[Dict]:
+        """
+        Kullanıcı aktivitelerini yeniden eskiye getir.
+        
+        Sonraki sayfa için önceki sayfanın son `created_at` değeri `before`
+        olarak verilir (keyset paging); OFFSET taraması yapılmaz.
+        """
+        _activity_buffer.flush()
         try:
-            activities = fetch_all(
-                """
+            params = [limit, user_id]
+            keyset = ""
+            if before is not None:
+                keyset = "AND TARIH < ?"
+                params.append(before)
+            
+            activities = fetch_iter_as(
+                ActivityRow,
+                f"""
                 SELECT TOP (?) 
                     AKTIVITE,
                     MODUL,
@@ -389,104 +929,181 @@ class UserDAO:
                     IP_ADRESI,
                     TARIH
                 FROM WMS_KULLANICI_AKTIVITELERI
-                WHERE KULLANICI_REF = ?
+                WHERE KULLANICI_REF = ? {keyset}
                 ORDER BY TARIH DESC
                 """,
-                [limit, user_id]
+                params,
+                batch_size=max(1, min(limit, 500))
             )
             
-            result = []
-            for activity in activities:
-                result.append({
-                    'action': activity['aktivite'],
-                    'module': activity['modul'],
-                    'details': activity['detay'],
-                    'ip_address': activity['ip_adresi'],
-                    'created_at': activity['tarih']
-                })
-            
-            return result
+            return [activity._asdict() for activity in activities]
             
         except Exception as e:
             logger.error(f"Error getting user activities: {e}")
             return []
     
-    def check_tables_exist(self) -> bool:
-        """Kullanıcı tablolarının var olup olmadığını kontrol et."""
+    def get_recent_activities(self, limit: int = 10) -> List[Dict]:
+        """
+        Tüm kullanıcıların son aktiviteleri (dashboard akışı).
+        
+        TARIH DESC index'i (add_user_indexes.sql) üzerinden ilk `limit` satır
+        okunur, kullanıcı adı nested loop ile PK'dan alınır; sort/hash join yok.
+        """
+        _activity_buffer.flush()
         try:
-            result = fetch_one(
-                """
-                SELECT COUNT(*) as count
-                FROM INFORMATION_SCHEMA.TABLES 
-                WHERE TABLE_NAME = 'WMS_KULLANICILAR'
+            activities = fetch_iter_as(
+                RecentActivityRow,
                 """
+                SELECT TOP (?)
+                    a.TARIH,
+                    k.KULLANICI_ADI,
+                    a.AKTIVITE,
+                    a.MODUL,
+                    a.DETAY
+                FROM WMS_KULLANICI_AKTIVITELERI a
+                JOIN WMS_KULLANICILAR k ON k.LOGICALREF = a.KULLANICI_REF
+                ORDER BY a.TARIH DESC
+                OPTION (LOOP JOIN)
+                """,
+                [limit]
             )
-            return result and result['count'] > 0
+            
+            return [activity._asdict() for activity in activities]
+            
+        except Exception as e:
+            logger.error(f"Error getting recent activities: {e}")
+            return []
+    
+    def check_tables_exist(self) -> bool:
+        """Kullanıcı tablolarının var olup olmadığını kontrol et."""
+        global _tables_exist
+        if _tables_exist:
+            return True
+        try:
+            result = fetch_one(_TABLES_EXIST_SQL)
+            _tables_exist = bool(result and result['exists_flag'])
+            return _tables_exist
         except:
             return False
     
+    def init_tables(self) -> bool:
+        """
+        Kullanıcı tablosu migration'larını (`USER_MIGRATIONS`) uygula.
+        
+        Script'ler `GO` satırlarından batch'lere bölünür ve hepsi tek
+        transaction'da çalışır; commit yalnızca sonda bir kez yapılır.
+        
+        Returns:
+            Başarılı ise True
+        """
+        try:
+            batches = []
+            for migration in USER_MIGRATIONS:
+                with open(get_resource_path(migration), encoding='utf-8') as f:
+                    batches.extend(b for b in _GO_RE.split(f.read()) if b.strip())
+            
+            with get_conn() as conn:
+                cursor = conn.cursor()
+                try:
+                    for batch in batches:
+                        cursor.execute(batch)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+            
+            _invalidate_schema_cache()
+            logger.info(f"User table migrations applied ({len(batches)} batches)")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error initializing user tables: {e}")
+            return False
+    
     def _hash_password(self, password: str) -> str:
-        """Şifreyi bcrypt ile hash'le."""
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+        """Şifreyi hash'le (bkz. `hash_password`)."""
+        return hash_password(password)
     
     def _verify_password(self, password: str, hashed: str) -> bool:
         """Şifreyi hash ile karşılaştır."""
-        try:
-            return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
-        except Exception:
-            return False
+        return _check_password(password, hashed)
     
-    def _update_failed_attempts(self, user_id: int):
-        """Başarısız giriş denemelerini güncelle."""
+    def _update_failed_attempts(self, user_id: int, conn=None) -> Optional[int]:
+        """
+        Başarısız giriş denemelerini güncelle.
+        
+        `conn` verilirse sorgu o bağlantıda çalışır, commit çağırana kalır.
+        
+        Returns:
+            Yeni başarısız deneme sayısı (hata durumunda None)
+        """
         try:
-            execute_query(
-                """
-                UPDATE WMS_KULLANICILAR 
-                SET BASARISIZ_GIRIS = BASARISIZ_GIRIS + 1,
-                    KILITLI_TARIH = CASE 
-                        WHEN BASARISIZ_GIRIS >= 4 
-                        THEN DATEADD(MINUTE, 30, GETDATE())
-                        ELSE KILITLI_TARIH
-                    END,
-                    GUNCELLEME_TARIHI = GETDATE()
-                WHERE LOGICALREF = ?
-                """,
-                [user_id]
-            )
+            if conn is not None:
+                attempts = self._run_failed_sql(conn, user_id)
+            else:
+                with get_conn() as own_conn:
+                    attempts = self._run_failed_sql(own_conn, user_id)
+                    own_conn.commit()
+            _invalidate_user(user_id)
+            
+            if attempts is not None and attempts >= LOGIN_MAX_FAILED_ATTEMPTS:
+                logger.warning(f"User {user_id} locked after {attempts} failed attempts")
+            return attempts
         except Exception as e:
             logger.error(f"Error updating failed attempts: {e}")
+            return None
+    
+    @staticmethod
+    def _run_failed_sql(conn, user_id: int) -> Optional[int]:
+        cursor = get_cached_cursor(conn, _LOGIN_FAILED_SQL)
+        cursor.execute(_LOGIN_FAILED_SQL, [user_id])
+        row = cursor.fetchone()
+        cursor.nextset()
+        return row[0] if row else None
     
     def get_login_stats(self) -> Dict:
         """Giriş istatistiklerini getir."""
         try:
-            stats = fetch_one(
-                """
-                SELECT 
-                    COUNT(*) as total_users,
-                    SUM(CASE WHEN AKTIF = 1 THEN 1 ELSE 0 END) as active_users,
-                    SUM(CASE WHEN SON_GIRIS > DATEADD(DAY, -7, GETDATE()) THEN 1 ELSE 0 END) as weekly_active,
-                    SUM(CASE WHEN KILITLI_TARIH > GETDATE() THEN 1 ELSE 0 END) as locked_users
-                FROM WMS_KULLANICILAR
-                """
-            )
-            
-            return {
-                'total_users': stats['total_users'] or 0,
-                'active_users': stats['active_users'] or 0,
-                'weekly_active_users': stats['weekly_active'] or 0,
-                'locked_users': stats['locked_users'] or 0
-            }
+            return _stats_dict(fetch_one(_LOGIN_STATS_SQL))
             
         except Exception as e:
             logger.error(f"Error getting login stats: {e}")
-            return {
-                'total_users': 0,
-                'active_users': 0,
-                'weekly_active_users': 0,
-                'locked_users': 0
-            }
+            return _stats_dict(None)
+    
+    def get_admin_bootstrap(self) -> Dict:
+        """
+        Yönetim ekranı verilerini tek round-trip'te getir.
+        
+        `check_tables_exist`, `get_all_users` ve `get_login_stats`
+        karşılığını tek batch'in result set'lerinden okur.
+        
+        Returns:
+            {'tables_exist': bool, 'users': [...], 'stats': {...}}
+        """
+        global _tables_exist
+        result = {'tables_exist': False, 'users': [], 'stats': _stats_dict(None)}
+        try:
+            with get_conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute(_ADMIN_BOOTSTRAP_SQL)
+                row = cursor.fetchone()
+                result['tables_exist'] = bool(row and row[0])
+                if result['tables_exist']:
+                    _tables_exist = True
+                if not result['tables_exist'] or not cursor.nextset():
+                    return result
+                
+                result['users'] = [UserProfileRow._make(r)._asdict() for r in cursor.fetchall()]
+                
+                if cursor.nextset():
+                    cols = [c[0].lower() for c in cursor.description]
+                    row = cursor.fetchone()
+                    result['stats'] = _stats_dict(dict(zip(cols, row)) if row else None)
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error getting admin bootstrap: {e}")
+            return result
     
     def update_password(self, user_id: int, password_hash: str) -> bool:
         """
@@ -509,6 +1126,7 @@ class UserDAO:
                 """,
                 [password_hash, user_id]
             )
+            _invalidate_user(user_id)
             
             logger.info(f"Password updated for user ID: {user_id}")
             return True
@@ -539,10 +1157,77 @@ class UserDAO:
                 """,
                 [user_id]
             )
+            _invalidate_user(user_id)
             
             logger.info(f"User deleted (soft): ID {user_id}")
             return True
             
         except Exception as e:
             logger.error(f"Error deleting user: {e}")
-            return False
\ No newline at end of file
+            return False
+
+
+# UserDAO durumsuzdur; tüm uygulama tek örneği paylaşır.
+USER_DAO = UserDAO()
+
+
+def get_user_dao() -> UserDAO:
+    """Paylaşılan UserDAO örneği."""
+    return USER_DAO
+
+
+class AsyncUserDAO:
+    """
+    UserDAO'nun asyncio karşılığı (ör. FastAPI handler'ları için).
+    
+    pyodbc çağrıları varsayılan executor'da, bcrypt `_BCRYPT_POOL`'da
+    çalışır. Girişte bağlantı bcrypt süresince tutulmaz; eşzamanlı
+    girişlerin DB I/O'su başka girişlerin hash doğrulamasıyla örtüşür.
+    """
+    
+    def __init__(self, dao: Optional[UserDAO] = None):
+        self._dao = dao or USER_DAO
+    
+    @staticmethod
+    async def _run(func, *args, executor=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, func, *args)
+    
+    async def authenticate(self, username: str, password: str) -> Optional[Dict]:
+        """`UserDAO.authenticate` ile aynı kurallar, bloklamadan."""
+        try:
+            user = await self._run(_fetch_auth_row, username)
+            
+            if user is None:
+                await self._run(_check_password, password, _DUMMY_HASH,
+                                executor=_BCRYPT_POOL)
+                logger.warning(f"User not found, inactive or locked: {username}")
+                return None
+            
+            ok = await self._run(_check_password, password, user.password_hash,
+                                 executor=_BCRYPT_POOL)
+            if not ok:
+                await self._run(self._dao._update_failed_attempts, user.id)
+                return None
+            
+            new_hash = None
+            if _needs_rehash(user.password_hash):
+                new_hash = await self._run(hash_password, password, executor=_BCRYPT_POOL)
+            login = await self._run(_record_login, user.id, new_hash)
+            _invalidate_user(user.id)
+            return self._dao._login_result(login)
+            
+        except Exception as e:
+            logger.error(f"Authentication error: {e}")
+            return None
+    
+    async def get_user_by_id(self, user_id: int) -> Optional[Dict]:
+        return await self._run(self._dao.get_user_by_id, user_id)
+    
+    async def get_user_by_username(self, username: str) -> Optional[Dict]:
+        return await self._run(self._dao.get_user_by_username, username)
+    
+    async def log_activity(self, user_id: int, action: str, module: str = None,
+                           details: str = None, ip_address: str = None) -> bool:
+        # Tampona ekler, bloklamaz
+        return self._dao.log_activity(user_id, action, module, details, ip_address)
@@ -20,8 +20,40 @@ BEGIN
     END
 END')
 """
-from dao import get_conn  # Use absolute import if db.py is in the same directory
+import logging
+
+from app.dao.logo import get_conn
+
+logger = logging.getLogger(__name__)
 
 def ensure_triggers():
     with get_conn(autocommit=True) as cn:
         cn.execute(_DDL_TRIG)
+
+def ensure_schema() -> bool:
+    """
+    Idempotent DDL: triggers + user table indexes (login covering indexes,
+    see app/migrations/add_user_indexes.sql). Errors are logged, not raised.
+
+    Needs DDL rights; run it once per deploy with `python -m app.ddl`
+    (or DB_AUTO_MIGRATE=true for a background run at app startup).
+    """
+    ok = True
+    try:
+        ensure_triggers()
+    except Exception as e:
+        logger.error(f"Trigger DDL failed: {e}")
+        ok = False
+
+    from app.dao.users_new import get_user_dao, _invalidate_schema_cache
+    _invalidate_schema_cache()
+    dao = get_user_dao()
+    if dao.check_tables_exist() and not dao.init_tables():
+        ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
+    sys.exit(0 if ensure_schema() else 1)
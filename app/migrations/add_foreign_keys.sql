@@ -34,6 +34,11 @@ IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_backorders_order_no')
 IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_backorders_item_code')
     CREATE INDEX IX_backorders_item_code ON dbo.backorders(item_code);
 
+-- backorder_picklist.fetch_fulfilled: half-open daily range on fulfilled_at
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_backorders_fulfilled_at')
+    CREATE INDEX IX_backorders_fulfilled_at ON dbo.backorders(fulfilled, fulfilled_at)
+    INCLUDE (order_no, item_code, qty_missing, warehouse_id);
+
 IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_shipment_header_order_no')
     CREATE INDEX IX_shipment_header_order_no ON dbo.shipment_header(order_no);
 
@@ -0,0 +1,19 @@
+-- Migration: Table type for bulk user creation
+-- UserDAO.create_users sends all rows as one table-valued parameter;
+-- without this type it falls back to chunked multi-row INSERTs.
+-- Applied by UserDAO.init_tables().
+
+IF TYPE_ID('dbo.WMS_KULLANICI_INSERT') IS NULL
+BEGIN
+    CREATE TYPE dbo.WMS_KULLANICI_INSERT AS TABLE (
+        KULLANICI_ADI NVARCHAR(100) NOT NULL,
+        EMAIL         NVARCHAR(255) NULL,
+        SIFRE_HASH    NVARCHAR(255) NULL,
+        AD_SOYAD      NVARCHAR(255) NULL,
+        ROL           NVARCHAR(50)  NULL,
+        AKTIF         BIT           NULL
+    )
+    PRINT 'Created type dbo.WMS_KULLANICI_INSERT'
+END
+
+PRINT 'User bulk type migration completed'
@@ -0,0 +1,85 @@
+-- Migration: Covering indexes for WMS user tables
+-- Login (UserDAO.authenticate) looks users up by KULLANICI_ADI or EMAIL;
+-- both lookups should be a single index seek without key lookups.
+-- Applied by UserDAO.init_tables().
+
+-- 1. Username lookup (authenticate, get_user_by_username). Not unique:
+--    soft-deleted users keep their rows, and a duplicate name must not fail
+--    (and roll back) the whole init_tables transaction.
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID('WMS_KULLANICILAR') AND name = 'IX_WMS_KULLANICILAR_KULLANICI_ADI')
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_WMS_KULLANICILAR_KULLANICI_ADI
+    ON WMS_KULLANICILAR (KULLANICI_ADI)
+    INCLUDE (EMAIL, SIFRE_HASH, AD_SOYAD, ROL, AKTIF, KILITLI_TARIH, BASARISIZ_GIRIS)
+    PRINT 'Created index IX_WMS_KULLANICILAR_KULLANICI_ADI'
+END
+
+-- 2. E-mail lookup (authenticate); not unique, e-mail is optional
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID('WMS_KULLANICILAR') AND name = 'IX_WMS_KULLANICILAR_EMAIL')
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_WMS_KULLANICILAR_EMAIL
+    ON WMS_KULLANICILAR (EMAIL)
+    INCLUDE (KULLANICI_ADI, SIFRE_HASH, AD_SOYAD, ROL, AKTIF, KILITLI_TARIH, BASARISIZ_GIRIS)
+    PRINT 'Created index IX_WMS_KULLANICILAR_EMAIL'
+END
+
+-- 3. Recent activity feed (UserDAO.get_recent_activities): TOP (n) ... ORDER BY TARIH DESC
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID('WMS_KULLANICI_AKTIVITELERI') AND name = 'IX_WMS_KULLANICI_AKTIVITELERI_TARIH')
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_WMS_KULLANICI_AKTIVITELERI_TARIH
+    ON WMS_KULLANICI_AKTIVITELERI (TARIH DESC)
+    INCLUDE (KULLANICI_REF, AKTIVITE, MODUL, DETAY)
+    PRINT 'Created index IX_WMS_KULLANICI_AKTIVITELERI_TARIH'
+END
+
+-- 4. Per-user activity history (UserDAO.get_user_activities): keyset paging on TARIH
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID('WMS_KULLANICI_AKTIVITELERI') AND name = 'IX_WMS_KULLANICI_AKTIVITELERI_KULLANICI_TARIH')
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_WMS_KULLANICI_AKTIVITELERI_KULLANICI_TARIH
+    ON WMS_KULLANICI_AKTIVITELERI (KULLANICI_REF, TARIH DESC)
+    INCLUDE (AKTIVITE, MODUL, DETAY, IP_ADRESI)
+    PRINT 'Created index IX_WMS_KULLANICI_AKTIVITELERI_KULLANICI_TARIH'
+END
+
+-- 5. Unique e-mail among users that have one (authenticate's e-mail branch
+--    filters EMAIL <> '' so it can seek this index). Skipped while duplicate
+--    e-mails exist; index 2 keeps serving the lookup meanwhile.
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID('WMS_KULLANICILAR') AND name = 'UX_WMS_KULLANICILAR_EMAIL')
+BEGIN
+    IF EXISTS (SELECT EMAIL FROM WMS_KULLANICILAR WHERE EMAIL <> '' GROUP BY EMAIL HAVING COUNT(*) > 1)
+        PRINT 'Skipped UX_WMS_KULLANICILAR_EMAIL: duplicate e-mail addresses exist'
+    ELSE
+    BEGIN
+        CREATE UNIQUE NONCLUSTERED INDEX UX_WMS_KULLANICILAR_EMAIL
+        ON WMS_KULLANICILAR (EMAIL)
+        INCLUDE (KULLANICI_ADI, SIFRE_HASH, AD_SOYAD, ROL, AKTIF, KILITLI_TARIH, BASARISIZ_GIRIS)
+        WHERE EMAIL <> ''
+        PRINT 'Created index UX_WMS_KULLANICILAR_EMAIL'
+    END
+END
+
+-- 6-8. Login statistics (UserDAO.get_login_stats): one narrow index per metric
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID('WMS_KULLANICILAR') AND name = 'IX_WMS_KULLANICILAR_AKTIF')
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_WMS_KULLANICILAR_AKTIF
+    ON WMS_KULLANICILAR (LOGICALREF)
+    WHERE AKTIF = 1
+    PRINT 'Created index IX_WMS_KULLANICILAR_AKTIF'
+END
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID('WMS_KULLANICILAR') AND name = 'IX_WMS_KULLANICILAR_SON_GIRIS')
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_WMS_KULLANICILAR_SON_GIRIS
+    ON WMS_KULLANICILAR (SON_GIRIS)
+    PRINT 'Created index IX_WMS_KULLANICILAR_SON_GIRIS'
+END
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE object_id = OBJECT_ID('WMS_KULLANICILAR') AND name = 'IX_WMS_KULLANICILAR_KILITLI')
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_WMS_KULLANICILAR_KILITLI
+    ON WMS_KULLANICILAR (KILITLI_TARIH)
+    WHERE KILITLI_TARIH IS NOT NULL
+    PRINT 'Created index IX_WMS_KULLANICILAR_KILITLI'
+END
+
+PRINT 'User index migration completed'
@@ -9,10 +9,11 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, List
 import hashlib
 import secrets
-import bcrypt
-from jose import jwt, JWTError
+from jose import jwk, jwt, JWTError
 import logging
 
+from app.dao.users_new import UserDAO, get_user_dao, hash_password, _check_password
+
 logger = logging.getLogger(__name__)
 
 
@@ -79,21 +80,27 @@ class User:
 class AuthManager:
     """Authentication manager."""
     
-    def __init__(self, secret_key: str, algorithm: str = "HS256"):
+    def __init__(self, secret_key: str, algorithm: str = "HS256", dao: Optional[UserDAO] = None):
         """
         Initialize auth manager.
         
         Args:
             secret_key: JWT secret key
             algorithm: JWT algorithm
+            dao: User DAO (defaults to the shared instance)
         """
         self.secret_key = secret_key
         self.algorithm = algorithm
+        self._dao = dao or get_user_dao()
+        
+        # jose key object built once; encode/decode reuse it instead of
+        # constructing a new key for every token
+        self._key = jwk.construct(secret_key, algorithm)
         self._current_user: Optional[User] = None
     
     def hash_password(self, password: str) -> str:
         """
-        Hash password using bcrypt.
+        Hash password (argon2id when available, otherwise bcrypt).
         
         Args:
             password: Plain text password
@@ -101,13 +108,11 @@ class AuthManager:
         Returns:
             Hashed password
         """
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+        return hash_password(password)
     
     def verify_password(self, password: str, hashed: str) -> bool:
         """
-        Verify password against hash.
+        Verify password against an argon2id or bcrypt hash.
         
         Args:
             password: Plain text password
@@ -116,11 +121,7 @@ class AuthManager:
         Returns:
             True if password matches
         """
-        try:
-            return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
-        except Exception as e:
-            logger.error(f"Password verification error: {e}")
-            return False
+        return _check_password(password, hashed)
     
     def create_token(self, user: User, expires_delta: Optional[timedelta] = None) -> str:
         """
@@ -146,8 +147,7 @@ class AuthManager:
             'iat': datetime.utcnow()
         }
         
-        token = jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
-        return token
+        return jwt.encode(payload, self._key, algorithm=self.algorithm)
     
     def verify_token(self, token: str) -> Optional[Dict]:
         """
@@ -160,8 +160,9 @@ class AuthManager:
             Token payload if valid, None otherwise
         """
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            return payload
+            if not isinstance(token, (str, bytes)):
+                raise JWTError("token must be a string")
+            return jwt.decode(token, self._key, algorithms=[self.algorithm])
         except JWTError as e:
             logger.error(f"Token verification error: {e}")
             return None
@@ -177,9 +178,7 @@ class AuthManager:
         Returns:
             Tuple of (User, token) if successful, None otherwise
         """
-        from app.dao.users_new import UserDAO
-        
-        dao = UserDAO()
+        dao = self._dao
         user_data = dao.authenticate(username, password)
         
         if user_data:
@@ -201,9 +200,7 @@ class AuthManager:
     def logout(self):
         """Logout current user."""
         if self._current_user:
-            from app.dao.users_new import UserDAO
-            dao = UserDAO()
-            dao.log_activity(self._current_user.id, "logout", "auth", "Logged out")
+            self._dao.log_activity(self._current_user.id, "logout", "auth", "Logged out")
             self._current_user = None
     
     @property
@@ -3,14 +3,26 @@ from __future__ import annotations
 import argparse
 import datetime as dt
 import logging
-from typing import Optional, Set
+import os
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
 
 from app.backorder import list_fulfilled
-from app.dao.logo import fetch_order_header, update_order_header
-from app.services.label_service import make_labels as create_labels
+from app.dao.logo import fetch_order_header, get_conn, update_order_header
+from app.services.label_service import fetch_label_data, render_labels
+from app.utils.process_pool import discard_process_pool, get_process_pool
 
 log = logging.getLogger(__name__)
 
+# Etiket PDF'lerini paralel çizen süreç sayısı (1 → sıralı, süreç açılmaz)
+LABEL_WORKERS = int(os.getenv("LABEL_WORKERS", "4"))
+# Bundan az sipariş süreç havuzuna gönderilmez (çizim süreç yükünden ucuz)
+LABEL_PARALLEL_MIN = 3
+
+# Eksik Gönderilen Sevkiyat dipnotu
+_FOOTER = "EGS"
+
 
 # --------------------------------------------------------------------------- #
 def make_backorder_labels(
@@ -37,7 +49,7 @@ def make_backorder_labels(
         Sadece belirtilen sipariş numarası işlensin. (UI seçimi)
     """
     if only_order:
-        rows = [r for r in list_fulfilled() if r["order_no"] == only_order]
+        rows = list_fulfilled(order_no=only_order)
     else:
         rows = list_fulfilled(the_date.isoformat())
 
@@ -45,68 +57,113 @@ def make_backorder_labels(
         log.info("İşlenecek back-order yok.")
         return
 
-    done: Set[str] = set()
+    # Sipariş başına tek satır (ilk kayıt); etiketler sipariş bazında basılır
+    by_order: Dict[str, Dict] = {}
     for r in rows:
-        ord_no = r["order_no"]
-        if ord_no in done:
-            continue
+        by_order.setdefault(r["order_no"], r)
+
+    # shipment_header güncellemesi için (döngü dışında bir kez)
+    from app.shipment import upsert_header
+    from app.dao.logo import fetch_one
+
+    # DB güncellemeleri ve etiket verisi sıralı (ana süreçte); başarılı
+    # siparişlerin etiketleri sonra, DB'ye dokunmadan çizilir
+    to_render: List[Dict] = []
+
+    # Başlık okumaları tek bağlantıda: aynı SQL metni aynı cursor'dan tekrar
+    # çalışır, sunucu planı sipariş başına yeniden derlenmez
+    with get_conn() as cn:
+        for ord_no, r in by_order.items():
+            pkg_tot = override_pkg_tot or max(int(r.get("qty_missing", 1)), 1)
+
+            hdr = fetch_order_header(ord_no, cn=cn)
+            if not hdr:
+                log.error("Header bulunamadı: %s", ord_no)
+                continue
+            order_id = hdr.get("order_id") or hdr.get("logicalref")
+
+            if not order_id:
+                log.error("Geçersiz order_id, güncelleme atlandı: %s", ord_no)
+                continue
+
+            try:
+                update_order_header(
+                    order_id,
+                    genexp4=f"PAKET SAYISI : {pkg_tot}",
+                    genexp5=ord_no,
+                )
+                log.info("GENEXP4/5 güncellendi -> %s", ord_no)
+            
+                # shipment_header tablosunu da güncelle (eğer varsa)
+                # Mevcut shipment header'ı bul
+                ship_hdr = fetch_one(
+                    "SELECT id, trip_date, customer_code, customer_name, region, address1, invoice_root "
+                    "FROM shipment_header WHERE order_no = ?",
+                    ord_no, cn=cn
+                )
+            
+                if ship_hdr:
+                    # shipment_header'ı güncelle
+                    upsert_header(
+                        order_no=ord_no,
+                        trip_date=ship_hdr["trip_date"],
+                        pkgs_total=pkg_tot,  # Yeni paket sayısı
+                        customer_code=ship_hdr["customer_code"],
+                        customer_name=ship_hdr["customer_name"],
+                        region=ship_hdr["region"],
+                        address1=ship_hdr["address1"],
+                        invoice_root=ship_hdr["invoice_root"]
+                    )
+                    log.info("shipment_header güncellendi: %s paket -> %s", ord_no, pkg_tot)
+
+            except Exception as exc:
+                log.error("Header güncelleme hatası %s: %s", ord_no, exc)
+                continue
+
+            try:
+                to_render.append(fetch_label_data(ord_no, force=force, cn=cn))
+            except Exception as exc:  # LabelError (fatura yok vb.) ya da DB hatası
+                log.error("Etiket üretim hatası %s: %s", ord_no, exc)
+
+    _render_labels(to_render)
 
-        pkg_tot = override_pkg_tot or max(int(r.get("qty_missing", 1)), 1)
 
-        hdr = fetch_order_header(ord_no)
-        if not hdr:
-            log.error("Header bulunamadı: %s", ord_no)
-            continue
-        order_id = hdr.get("order_id") or hdr.get("logicalref")
+def _render_one(data: Dict) -> None:
+    render_labels(data, footer=_FOOTER)
 
-        if not order_id:
-            log.error("Geçersiz order_id, güncelleme atlandı: %s", ord_no)
-            continue
 
+def _render_labels(items: List[Dict]) -> None:
+    """
+    fetch_label_data çıktılarından etiket PDF'lerini üretir. ReportLab çizimi
+    CPU'ya bağlı olduğundan `LABEL_PARALLEL_MIN` ve üzeri sipariş paylaşılan
+    süreç havuzunda (`LABEL_WORKERS`) paralel çizilir; işçilere yalnızca düz
+    veri gider. Havuz kullanılamazsa kalanlar sıralı basılır.
+    """
+    pending = list(items)
+    if LABEL_WORKERS > 1 and len(pending) >= LABEL_PARALLEL_MIN:
         try:
-            update_order_header(
-                order_id,
-                genexp4=f"PAKET SAYISI : {pkg_tot}",
-                genexp5=ord_no,
-            )
-            log.info("GENEXP4/5 güncellendi -> %s", ord_no)
-            
-            # shipment_header tablosunu da güncelle (eğer varsa)
-            from app.shipment import upsert_header
-            from app.dao.logo import fetch_one, exec_sql
-            
-            # Mevcut shipment header'ı bul
-            ship_hdr = fetch_one(
-                "SELECT id, trip_date, customer_code, customer_name, region, address1, invoice_root "
-                "FROM shipment_header WHERE order_no = ?", 
-                ord_no
-            )
-            
-            if ship_hdr:
-                # shipment_header'ı güncelle
-                upsert_header(
-                    order_no=ord_no,
-                    trip_date=ship_hdr["trip_date"],
-                    pkgs_total=pkg_tot,  # Yeni paket sayısı
-                    customer_code=ship_hdr["customer_code"],
-                    customer_name=ship_hdr["customer_name"],
-                    region=ship_hdr["region"],
-                    address1=ship_hdr["address1"],
-                    invoice_root=ship_hdr["invoice_root"]
-                )
-                log.info("shipment_header güncellendi: %s paket -> %s", ord_no, pkg_tot)
-
-            # Yeni etiket üretimi
-            create_labels(
-                ord_no,
-                force=force,
-                footer="EGS"  # Eksik Gönderilen Sevkiyat dipnotu
-            )
-            log.info("Etiketler üretildi -> %s", ord_no)
-            done.add(ord_no)
+            ex = get_process_pool("labels", LABEL_WORKERS)
+            futures = {ex.submit(_render_one, d): d for d in pending}
+            for fut in as_completed(futures):
+                data = futures[fut]
+                try:
+                    fut.result()
+                    log.info("Etiketler üretildi -> %s", data["order_no"])
+                except BrokenProcessPool:
+                    raise  # kalanlar aşağıda sıralı çizilir
+                except Exception as exc:
+                    log.error("Etiket üretim hatası %s: %s", data["order_no"], exc)
+                pending.remove(data)
+        except Exception as exc:
+            discard_process_pool("labels")
+            log.warning("Paralel etiket üretimi kullanılamadı, sıralı devam: %s", exc)
+
+    for data in pending:
+        try:
+            _render_one(data)
+            log.info("Etiketler üretildi -> %s", data["order_no"])
         except Exception as exc:
-            log.error("Header güncelleme veya etiket üretim hatası %s: %s", ord_no, exc)
-            continue
+            log.error("Etiket üretim hatası %s: %s", data["order_no"], exc)
 
 
 
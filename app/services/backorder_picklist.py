@@ -24,7 +24,6 @@ from __future__ import annotations
 import argparse
 import datetime as dt
 import logging
-import os
 import sys
 from pathlib import Path
 from typing import List, Dict
@@ -33,8 +32,6 @@ from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.units import mm
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 
 # Proje dizinine ekle
@@ -42,6 +39,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.append(str(BASE_DIR))
 
 from app.dao import logo as dao
+from app.utils.fonts import get_default_font
 from app.utils.wms_paths import get_wms_folders, get_picklist_path
 
 logger = logging.getLogger(__name__)
@@ -51,64 +49,32 @@ logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
 wms_folders = get_wms_folders()
 OUT_DIR = wms_folders['picklists']
 
-# Font registration - Determine base directory based on execution mode
-if getattr(sys, 'frozen', False):
-    # Running as PyInstaller executable
-    FONT_BASE_DIR = Path(sys._MEIPASS)
-else:
-    # Running in development
-    FONT_BASE_DIR = Path(__file__).resolve().parent.parent
-
-# Try multiple font paths
-font_paths = [
-    str(FONT_BASE_DIR / "app" / "fonts" / "DejaVuSans.ttf"),
-    str(FONT_BASE_DIR / "fonts" / "DejaVuSans.ttf"),
-    os.getenv("BACKORDER_FONT_PATH", ""),
-    str(Path(__file__).resolve().parent.parent / "fonts" / "DejaVuSans.ttf"),
-    str(Path(__file__).resolve().parent.parent / "app" / "fonts" / "DejaVuSans.ttf"),
-]
-
-FONT = "Helvetica"  # Default fallback
-for font_path in font_paths:
-    if font_path and Path(font_path).exists():
-        try:
-            pdfmetrics.registerFont(TTFont("DejaVu", font_path))
-            FONT = "DejaVu"
-            logger.info("Font loaded from: %s", font_path)
-            break
-        except Exception as e:
-            logger.warning("Could not load font from %s: %s", font_path, e)
-            continue
-
-if FONT == "Helvetica":
-    logger.warning("DejaVuSans.ttf not found; using Helvetica (Turkish characters may not display correctly)")
+# DejaVuSans bir kez aranıp kaydedilir (label_service ile ortak kayıt)
+FONT = get_default_font("BACKORDER_FONT_PATH")
 
-def fetch_fulfilled(date: dt.date) -> List[Dict]:
-    # Parameter binding for date may fail on ODBC driver; inline literal.
-    date_str = date.strftime("%Y-%m-%d")
-    sql = f"""
-    SELECT order_no, item_code, qty_missing AS qty, warehouse_id, fulfilled_at
-      FROM backorders
-     WHERE fulfilled = 1
-       AND CAST(fulfilled_at AS DATE) = '{date_str}'
-    """
-    with dao.get_conn() as cn:
-        cur = cn.cursor()
-        cur.execute(sql)
-        cols = [c[0].lower() for c in cur.description]
-        return [dict(zip(cols, row)) for row in cur.fetchall()]
+# PDF stilleri – font belli olduktan sonra bir kez kurulur, her pick-list'te paylaşılır
+_TITLE_STYLE = ParagraphStyle("title", fontName=FONT, fontSize=14, leading=16)
+_TABLE_STYLE = TableStyle([
+    ("FONT", (0,0), (-1,-1), FONT, 9),
+    ("BACKGROUND", (0,0), (-1,0), colors.lightgrey),
+    ("GRID", (0,0), (-1,-1), 0.5, colors.black),
+    ("ALIGN", (3,1), (4,-1), "CENTER"),
+])
+_COL_WIDTHS = [30*mm, 50*mm, 60*mm, 20*mm, 20*mm]
 
-    sql = f"""
+def fetch_fulfilled(date: dt.date) -> List[Dict]:
+    # Gün aralığı datetime olarak bağlanır: eski ODBC sürücüleri `date`
+    # tipini bağlayamıyor, ve yarı açık aralık IX_backorders_fulfilled_at
+    # index'inde seek yapar (CAST(fulfilled_at AS DATE) her satırda
+    # hesaplanmaz; index: app/migrations/add_foreign_keys.sql).
+    day_start = dt.datetime.combine(date, dt.time.min)
+    sql = """
     SELECT order_no, item_code, qty_missing AS qty, warehouse_id, fulfilled_at
       FROM backorders
      WHERE fulfilled = 1
-       AND CAST(fulfilled_at AS DATE) = ?
+       AND fulfilled_at >= ? AND fulfilled_at < ?
     """
-    with dao.get_conn() as cn:
-        cur = cn.cursor()
-        cur.execute(sql, date)
-        cols = [c[0].lower() for c in cur.description]
-        return [dict(zip(cols, row)) for row in cur.fetchall()]
+    return list(dao.fetch_iter(sql, day_start, day_start + dt.timedelta(days=1)))
 
 
 def create_picklist(date: dt.date):
@@ -132,22 +98,18 @@ def create_picklist(date: dt.date):
     # Başlık
     elements = []
     title = f"Eksik Ürün Tamamlamaları - {date.strftime('%d-%m-%Y')}"
-    elements.append(Paragraph(title, ParagraphStyle("title", fontName=FONT, fontSize=14, leading=16)))
+    elements.append(Paragraph(title, _TITLE_STYLE))
     elements.append(Spacer(1, 6*mm))
 
     # Tablo verisi
-    data = [["Saat", "Sipariş No", "Ürün Kodu", "Adet", "Amb"]]
-    for r in records:
-        time_str = r['fulfilled_at'].strftime("%H:%M:%S")
-        data.append([time_str, r['order_no'], r['item_code'], str(r['qty']), str(r['warehouse_id'])])
-
-    tbl = Table(data, colWidths=[30*mm, 50*mm, 60*mm, 20*mm, 20*mm])
-    tbl.setStyle(TableStyle([
-        ("FONT", (0,0), (-1,-1), FONT, 9),
-        ("BACKGROUND", (0,0), (-1,0), colors.lightgrey),
-        ("GRID", (0,0), (-1,-1), 0.5, colors.black),
-        ("ALIGN", (3,1), (4,-1), "CENTER"),
-    ]))
+    data = [["Saat", "Sipariş No", "Ürün Kodu", "Adet", "Amb"]] + [
+        [f"{r['fulfilled_at']:%H:%M:%S}", r['order_no'], r['item_code'],
+         str(r['qty']), str(r['warehouse_id'])]
+        for r in records
+    ]
+
+    tbl = Table(data, colWidths=_COL_WIDTHS)
+    tbl.setStyle(_TABLE_STYLE)
     elements.append(tbl)
 
     # PDF oluştur
@@ -21,6 +21,12 @@ from datetime import datetime, date
 from pathlib import Path
 import pandas as pd
 
+try:
+    import xlsxwriter  # noqa: F401
+    _HAS_XLSXWRITER = True
+except ImportError:  # yoksa openpyxl ile yazılır
+    _HAS_XLSXWRITER = False
+
 # Proje kökü PYTHONPATH'e ekle
 BASE_DIR = Path(__file__).resolve().parent.parent
 if str(BASE_DIR) not in sys.path:
@@ -33,6 +39,17 @@ import app.backorder as bo
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s:%(message)s")
 logger = logging.getLogger(__name__)
 
+# ---------------------------------------------------------------------------
+def _read_frame(sql: str, *params) -> pd.DataFrame:
+    """
+    Sorgu sonucunu DataFrame'e çevirir. pd.read_sql'in bağlantı/dtype
+    inceleme yükü yerine doğrudan cursor satırlarından kurulur.
+    """
+    with dao.get_conn() as cn:
+        cur = cn.execute(sql, *params)
+        cols = [c[0] for c in cur.description]
+        return pd.DataFrame.from_records([tuple(r) for r in cur.fetchall()], columns=cols)
+
 # ---------------------------------------------------------------------------
 def fetch_pending() -> pd.DataFrame:
     """fulfilled=0 olan bekleyen eksik ürünleri getirir"""
@@ -41,8 +58,7 @@ def fetch_pending() -> pd.DataFrame:
       FROM backorders
      WHERE fulfilled = 0
     """
-    with dao.get_conn() as cn:
-        return pd.read_sql(sql, cn)
+    return _read_frame(sql)
 
 # ---------------------------------------------------------------------------
 def fetch_completed(on_date: date) -> pd.DataFrame:
@@ -53,8 +69,7 @@ def fetch_completed(on_date: date) -> pd.DataFrame:
      WHERE fulfilled = 1
        AND CAST(fulfilled_at AS DATE) = ?
     """
-    with dao.get_conn() as cn:
-        return pd.read_sql(sql, cn, params=[on_date.strftime("%Y-%m-%d")])
+    return _read_frame(sql, on_date.strftime("%Y-%m-%d"))
 
 # ---------------------------------------------------------------------------
 def generate_report(report_date: date):
@@ -66,7 +81,12 @@ def generate_report(report_date: date):
     out_dir.mkdir(parents=True, exist_ok=True)
     report_path = out_dir / f"BACKORDER_REPORT_{report_date.strftime('%Y%m%d')}.xlsx"
 
-    with pd.ExcelWriter(report_path, engine='openpyxl') as writer:
+    # xlsxwriter openpyxl'e göre daha hızlı ve hafif yazar. constant_memory
+    # kullanılmaz: pandas hücreleri kolon kolon yazdığı için o modda ilk
+    # kolondan sonrası sessizce kaybolur
+    writer_args = {"engine": "xlsxwriter" if _HAS_XLSXWRITER else "openpyxl"}
+
+    with pd.ExcelWriter(report_path, **writer_args) as writer:
         df_pending.to_excel(writer, sheet_name='Bekleyen', index=False)
         startrow = len(df_pending) + 3
         df_completed.to_excel(writer, sheet_name='Tamamlanan', index=False, startrow=startrow)
@@ -9,8 +9,8 @@ GUI açıksa toast bildirimi gösterir.
 ----------
 Tek sefer:
     python -m app.services.backorder_worker --once
-Sürekli döngü (varsayılan 30 dk):
-    python -m app.services.backorder_worker --interval 1800
+Sürekli döngü (varsayılan 30 dk; bekleyen kayıt yokken 60 dk'ya kadar uzar):
+    python -m app.services.backorder_worker --interval 1800 --max-interval 3600
 """
 from __future__ import annotations
 
@@ -18,7 +18,7 @@ import argparse
 import logging
 import sys
 import time
-from collections import defaultdict
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Dict, List, Tuple
 from app import toast                #  ⇦  satırı ekle
@@ -49,134 +49,206 @@ log = logging.getLogger(__name__)
 #  DB yardımı – depo bazında net stok
 # ---------------------------------------------------------------
 
-def fetch_free_qty(item_code: str, wh_id: int) -> float:
-    """LV_XXX_STINVTOT view'inden *ONHAND* alır (Logo versiyon‑agnostik)."""
-    sql = f"""
+# Firma (_t) açılışta sabit → SQL metinleri modül yüklenirken bir kez kurulur
+_ITEMS_TABLE = dao._t('ITEMS', period_dependent=False)
+
+_FREE_QTY_SQL = f"""
     SELECT TOP 1 S.ONHAND
       FROM LV_025_01_STINVTOT S
-      JOIN {dao._t('ITEMS', period_dependent=False)} I
+      JOIN {_ITEMS_TABLE} I
             ON I.LOGICALREF = S.STOCKREF
      WHERE S.INVENNO = ? AND I.CODE = ?
     """
-    with dao.get_conn() as cn:
-        row = cn.execute(sql, wh_id, item_code).fetchone()
+
+
+def fetch_free_qty(item_code: str, wh_id: int, cn=None) -> float:
+    """
+    LV_XXX_STINVTOT view'inden *ONHAND* alır (Logo versiyon‑agnostik).
+    cn verilirse yeni bağlantı açılmaz.
+    """
+    with (nullcontext(cn) if cn is not None else dao.get_conn()) as cn:
+        row = cn.execute(_FREE_QTY_SQL, wh_id, item_code).fetchone()
         return float(row[0]) if row and row[0] is not None else 0.0
 
+
+# (depo, stok) çifti başına 2 parametre; SQL Server limiti 2100
+FREE_QTY_CHUNK = 1000
+
+def fetch_free_qty_bulk(pairs: List[Tuple[str, int]],
+                        cn=None, min_qty: float | None = None) -> Dict[Tuple[str, int], float]:
+    """
+    Birden çok (stok kodu, depo) çiftinin ONHAND değerini tek bağlantıda,
+    `FREE_QTY_CHUNK` çift başına tek sorguyla alır.
+
+    Çiftler VALUES tablosu olarak JOIN edilir; `(CODE = ? AND INVENNO = ?) OR ...`
+    zinciri yerine her çift için index seek yapılır. Stoku olmayan çiftler
+    sonuçta yer almaz. cn verilirse yeni bağlantı açılmaz.
+
+    min_qty verilirse yalnızca toplam ONHAND'i en az bu kadar olan çiftler
+    döner (sunucuda HAVING ile elenir; ör. en küçük eksik miktar).
+    """
+    pairs = list(dict.fromkeys(pairs))
+    result: Dict[Tuple[str, int], float] = {}
+    if not pairs:
+        return result
+
+    with (nullcontext(cn) if cn is not None else dao.get_conn()) as cn:
+        for start in range(0, len(pairs), FREE_QTY_CHUNK):
+            chunk = pairs[start:start + FREE_QTY_CHUNK]
+            values = ", ".join(["(?, ?)"] * len(chunk))
+            cur = cn.execute(f"""
+                SELECT V.CODE, V.INVENNO, COALESCE(SUM(S.ONHAND), 0)
+                  FROM (VALUES {values}) V(CODE, INVENNO)
+                  JOIN {_ITEMS_TABLE} I
+                        ON I.CODE = V.CODE
+                  JOIN LV_025_01_STINVTOT S
+                        ON S.STOCKREF = I.LOGICALREF AND S.INVENNO = V.INVENNO
+                 GROUP BY V.CODE, V.INVENNO
+                {"HAVING SUM(S.ONHAND) >= ?" if min_qty is not None else ""}
+            """, *[v for pair in chunk for v in pair],
+                *(() if min_qty is None else (min_qty,)))
+            for code, wh_id, free in cur.fetchall():
+                result[(code, wh_id)] = float(free)
+    return result
+
 # ---------------------------------------------------------------
 #  Ana işleyici
 # ---------------------------------------------------------------
 
-def process_backorders() -> None:
+def _is_connection_error(exc: BaseException) -> bool:
+    """Bağlantı kopması mı? (ODBC SQLSTATE 08xxx – ör. 08S01 iletişim hatası)"""
+    return (isinstance(exc, pyodbc.Error) and bool(exc.args)
+            and str(exc.args[0]).startswith("08"))
+
+
+def process_backorders() -> Tuple[int, int]:
     """
     • backorders.fulfilled = 0 kayıtlarını alır
     • depo‐stok bazında gruplayıp serbest stoku (ONHAND) kontrol eder
-    • yeterli stok varsa bo.mark_fulfilled + toast bildirimi
+    • yeterli stok varsa kayıtları bo.mark_fulfilled_bulk ile kapatır + toast
+
+    Turun tüm sorguları tek bağlantıda çalışır. Uzun bekleme sonrası bağlantı
+    kopmuşsa (pyodbc.Error) yeni bağlantıyla bir kez daha denenir.
+
+    Dönüş: (bekleyen kayıt sayısı, kapatılan kayıt sayısı) – watcher_loop
+    bekleme süresini buna göre ayarlar.
     """
-    pending = bo.list_pending()
-    if not pending:
+    for attempt in (1, 2):
+        try:
+            with dao.get_conn() as cn:
+                return _process_backorders(cn)
+        except pyodbc.Error as exc:
+            if attempt == 2:
+                raise
+            log.warning("Back-order kontrolü: bağlantı hatası, yeniden bağlanılıyor: %s", exc)
+
+
+def _process_backorders(cn) -> Tuple[int, int]:
+    # 🔸 Sipariş + stok + depo bazında gruplu (sunucuda) → tek stok sorgusu / işlem
+    groups = bo.list_pending_grouped(cn)
+    if not groups:
         log.info("Back-order kontrolü: tamamlanacak eksik ürün yok")
-        return
-
-    # 🔸 Sipariş + stok bazlı grupla → tek stok sorgusu / işlem
-    groups: Dict[Tuple[str, str, int], Dict] = defaultdict(
-        lambda: {"need": 0.0, "recs": []}
-    )
-    for rec in pending:
-        key = (rec["order_no"], rec["item_code"], rec["warehouse_id"])
-        groups[key]["need"] += rec["qty_missing"]
-        groups[key]["recs"].append(rec)
+        return 0, 0
+    pending = sum(len(g["ids"]) for g in groups)
 
     log.info("Back-order kontrolü başlıyor (%d grup)…", len(groups))
 
-    # Batch fetch all stock quantities in one query - FIX N+1 PROBLEM
-    item_warehouse_pairs = [(item_code, wh_id) for (_, item_code, wh_id) in groups.keys()]
-    
-    # Build batch query for all items
-    stock_quantities = {}
-    if item_warehouse_pairs:
-        try:
-            # Create placeholders for batch query
-            placeholders = ','.join(['(?, ?)'] * len(item_warehouse_pairs))
-            params = []
-            for item_code, wh_id in item_warehouse_pairs:
-                params.extend([item_code, wh_id])
-            
-            # Batch query to get all stock quantities at once
-            # Build proper query with item codes and warehouse IDs
-            with dao.get_conn() as conn:
-                # Need to join with ITEMS table to get stock code
-                query_parts = []
-                query_params = []
-                for item_code, wh_id in item_warehouse_pairs:
-                    query_parts.append("(I.CODE = ? AND S.INVENNO = ?)")
-                    query_params.extend([item_code, wh_id])
-                
-                where_clause = " OR ".join(query_parts)
-                
-                cur = conn.execute(f"""
-                    SELECT I.CODE as item_code, S.INVENNO as warehouse_id, 
-                           COALESCE(SUM(S.ONHAND), 0) as free_qty
-                    FROM LV_025_01_STINVTOT S
-                    JOIN {dao._t('ITEMS', period_dependent=False)} I ON I.LOGICALREF = S.STOCKREF
-                    WHERE {where_clause}
-                    GROUP BY I.CODE, S.INVENNO
-                """, *query_params)
-                
-                for row in cur.fetchall():
-                    stock_quantities[(row.item_code, row.warehouse_id)] = row.free_qty
-                    
-        except Exception as exc:
-            log.error("Batch stok sorgu hatası: %s", exc)
-            # Fallback to individual queries if batch fails
-            for item_code, wh_id in item_warehouse_pairs:
-                try:
-                    free = fetch_free_qty(item_code, wh_id)
-                    stock_quantities[(item_code, wh_id)] = free
-                except:
-                    stock_quantities[(item_code, wh_id)] = 0
+    # Tüm (stok, depo) çiftlerinin stoku tek seferde
+    item_warehouse_pairs = [(g["item_code"], g["warehouse_id"]) for g in groups]
+    # En küçük eksik bile karşılanamıyorsa çift sonuca girmez (sunucuda elenir)
+    min_need = min(g["need"] for g in groups)
+    try:
+        stock_quantities = fetch_free_qty_bulk(item_warehouse_pairs, cn, min_qty=min_need)
+        if not stock_quantities:
+            log.info("Back-order kontrolü: hiçbir grup için yeterli stok yok")
+            return pending, 0
+    except Exception as exc:
+        if _is_connection_error(exc):
+            raise  # process_backorders yeni bağlantıyla yeniden dener
+        log.error("Batch stok sorgu hatası: %s", exc)
+        # Fallback to individual queries if batch fails
+        stock_quantities = {}
+        for item_code, wh_id in dict.fromkeys(item_warehouse_pairs):
+            try:
+                stock_quantities[(item_code, wh_id)] = fetch_free_qty(item_code, wh_id, cn)
+            except Exception as exc:
+                if _is_connection_error(exc):
+                    raise
+                stock_quantities[(item_code, wh_id)] = 0
 
     # Process groups with fetched quantities
-    for (ord_no, item_code, wh_id), g in groups.items():
+    satisfied: list[int] = []
+    messages: list[str] = []
+    for g in groups:
+        ord_no, item_code, wh_id = g["order_no"], g["item_code"], g["warehouse_id"]
         need = g["need"]
         free = stock_quantities.get((item_code, wh_id), 0)
 
         if free >= need:
-            # ► tüm alt kayıtları kapat
-            for rec in g["recs"]:
-                bo.mark_fulfilled(rec["id"])
-
-            msg = f"{ord_no}  {item_code}  +{need:.0f} (AMB {wh_id})"
-            log.info("TAMAMLANDI ▸ %s", msg)
-            toast("Eksik Ürün Tamamlandı", msg)
+            # ► alt kayıtlar döngü sonunda tek seferde kapatılır
+            satisfied.extend(g["ids"])
+            messages.append(f"{ord_no}  {item_code}  +{need:.0f} (AMB {wh_id})")
         else:
             log.debug(
                 "Yetersiz ▸ %s %s – free %.0f / need %.0f",
                 ord_no, item_code, free, need
             )
 
+    if not satisfied:
+        return pending, 0
+
+    n = bo.mark_fulfilled_bulk(satisfied, cn=cn)
+    log.info("Back-order kontrolü: %d kayıt kapatıldı", n)
+
+    # Bildirimler yalnızca commit sonrası (yeniden denemede tekrar etmesin)
+    for msg in messages:
+        log.info("TAMAMLANDI ▸ %s", msg)
+        toast("Eksik Ürün Tamamlandı", msg)
+    return pending, n
+
 # ---------------------------------------------------------------
 #  Döngü / CLI
 # ---------------------------------------------------------------
 
-def watcher_loop(sec: int):
-    log.info("Backorder worker %d sn aralıkla çalışıyor…", sec)
+# Bekleyen kayıt yokken bekleme süresi her turda ikiye katlanır (üst sınır)
+MAX_INTERVAL = 3600
+
+def watcher_loop(sec: int, max_sec: int = MAX_INTERVAL):
+    """
+    Uyarlanır bekleme:
+      • kayıt kapatıldıysa      → sec (temel süre)
+      • bekleyen kayıt yoksa    → süre 2 katına, en fazla max_sec
+      • bekleyen var, stok yok  → sec
+    """
+    log.info("Backorder worker %d sn aralıkla çalışıyor (boşta en fazla %d sn)…",
+             sec, max_sec)
+    sleep = sec
     while True:
         try:
-            process_backorders()
+            pending, fulfilled = process_backorders()
         except Exception as exc:
             log.exception("Worker hatası: %s", exc)
-        time.sleep(sec)
+            pending, fulfilled = -1, 0
+
+        if fulfilled > 0 or pending != 0:
+            sleep = sec
+        else:
+            sleep = min(sleep * 2, max(sec, max_sec))
+        log.debug("Sonraki kontrol %d sn sonra", sleep)
+        time.sleep(sleep)
 
 def main():
     ap = argparse.ArgumentParser(description="Back‑order tamamlama servisi")
     ap.add_argument("--once", action="store_true", help="Tek sefer çalış ve çık")
     ap.add_argument("--interval", type=int, default=1800, help="Döngü süresi (sn)")
+    ap.add_argument("--max-interval", type=int, default=MAX_INTERVAL,
+                    help="Bekleyen kayıt yokken en uzun bekleme (sn)")
     args = ap.parse_args()
 
     if args.once:
         process_backorders()
     else:
-        watcher_loop(args.interval)
+        watcher_loop(args.interval, args.max_interval)
 
 if __name__ == "__main__":
     main()
@@ -3,13 +3,16 @@ Centralized Barcode Service
 Handles all barcode lookup and validation operations
 """
 import logging
-from typing import Tuple, Optional
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple, Optional
 from app.dao.logo import fetch_one, resolve_barcode_prefix
+from app.utils.thread_safe_cache import get_cache
 
 logger = logging.getLogger(__name__)
 
 
-def barcode_xref_lookup(barcode: str, warehouse_id: str | None = None) -> Tuple[Optional[str], Optional[float]]:
+def _barcode_xref_lookup_uncached(barcode: str, warehouse_id: str | None = None) -> Tuple[Optional[str], Optional[float]]:
     """
     Looks up a barcode in the barcode_xref table.
     
@@ -52,102 +55,251 @@ def barcode_xref_lookup(barcode: str, warehouse_id: str | None = None) -> Tuple[
         raise
 
 
-def find_item_by_barcode(barcode: str, lines: list, warehouse_set: set | None = None) -> Tuple[dict | None, float]:
+# Process-wide memo of xref lookups (hits and misses). Cleared whenever
+# barcode_xref is written (import_barcodes.load_file, barcode page CRUD).
+BARCODE_XREF_CACHE_SIZE = 4096
+
+_barcode_xref_lookup_cached = lru_cache(maxsize=BARCODE_XREF_CACHE_SIZE)(_barcode_xref_lookup_uncached)
+
+
+def barcode_xref_lookup(barcode: str, warehouse_id: str | None = None) -> Tuple[Optional[str], Optional[float]]:
     """
-    Find matching line item for a barcode using multiple strategies.
+    Cached barcode_xref lookup; see _barcode_xref_lookup_uncached.
     
-    Args:
-        barcode: The barcode to find
-        lines: List of order lines to search
-        warehouse_set: Set of valid warehouse IDs (optional)
-        
-    Returns:
-        Tuple of (matched_line, quantity_multiplier) or (None, 1.0) if not found
+    The key is normalised at the boundary (barcode upper-cased, as the SQL
+    compares it; warehouse_id as str) so 1 and "1" share one entry.
+    Database errors are not cached.
     """
-    # 1) Direct stock code match
-    matched_line = next(
-        (ln for ln in lines if ln["item_code"].lower() == barcode.lower()),
-        None
+    return _barcode_xref_lookup_cached(
+        barcode.upper(),
+        str(warehouse_id) if warehouse_id is not None else None,
     )
-    if matched_line:
-        return matched_line, 1.0
+
+
+barcode_xref_lookup.cache_clear = _barcode_xref_lookup_cached.cache_clear
+barcode_xref_lookup.cache_info = _barcode_xref_lookup_cached.cache_info
+
+
+# Prefix resolution results per (barcode, warehouse_id); TTL-bound because the
+# Logo item/unit-barcode tables change outside this process. After a change
+# to those tables call _PREFIX_CACHE.clear() (or wait for the TTL).
+_PREFIX_CACHE = get_cache("barcode_prefix", max_size=2048, ttl_seconds=300)
+_NOT_CACHED = object()
+_NO_MATCH = ""
+
+
+def _resolve_barcode_prefix_cached(barcode: str, warehouse_id) -> Optional[str]:
+    """resolve_barcode_prefix with misses and hits both cached for the TTL."""
+    key = (barcode, warehouse_id)
+    code = _PREFIX_CACHE.get(key, _NOT_CACHED)
+    if code is _NOT_CACHED:
+        code = resolve_barcode_prefix(barcode, warehouse_id) or _NO_MATCH
+        _PREFIX_CACHE.set(key, code)
+    return code or None
+
+
+# 3 parameters per VALUES row; SQL Server allows at most 2100 per statement
+XREF_JOIN_CHUNK = 600
+
+
+def find_item_by_barcode_sql(barcode: str, lines: list,
+                             warehouse_set: set | None = None) -> Tuple[dict | None, float]:
+    """
+    Resolve a barcode through barcode_xref with the join done on the server.
     
-    # 2) Warehouse prefix resolution
-    for ln in lines:
-        code = resolve_barcode_prefix(barcode, ln["warehouse_id"])
-        if code and code == ln["item_code"]:
-            return ln, 1.0
+    The (item_code, warehouse_id) pairs of `lines` are sent as a VALUES table
+    together with their line position; the database returns the first line
+    that has an xref row for this barcode, so no candidate rows are shipped
+    back for matching in Python.
     
-    # 3) Barcode xref lookup with warehouse filtering
+    Returns:
+        Tuple of (matched_line, multiplier) or (None, 1.0) if not found
+    """
+    candidates = [
+        (pos, ln["item_code"], str(ln["warehouse_id"]))
+        for pos, ln in enumerate(lines)
+        if warehouse_set is None or ln["warehouse_id"] in warehouse_set
+    ]
+    for start in range(0, len(candidates), XREF_JOIN_CHUNK):
+        chunk = candidates[start:start + XREF_JOIN_CHUNK]
+        values = ", ".join(["(?, ?, ?)"] * len(chunk))
+        row = fetch_one(
+            f"""
+            SELECT TOP 1 V.POS, X.multiplier
+              FROM (VALUES {values}) V(POS, ITEM_CODE, WAREHOUSE_ID)
+              JOIN barcode_xref X
+                    ON X.item_code = V.ITEM_CODE AND X.warehouse_id = V.WAREHOUSE_ID
+             WHERE UPPER(X.barcode) = UPPER(?)
+             ORDER BY V.POS
+            """,
+            *[v for c in chunk for v in c], barcode
+        )
+        if row:
+            multiplier = row.get("multiplier")
+            return lines[row["pos"]], float(multiplier) if multiplier else 1.0
+    return None, 1.0
+
+
+def build_line_index(lines: list) -> Dict[str, List[dict]]:
+    """
+    Build a lookup of order lines keyed by lower-cased item code.
+
+    Built once per loaded order so barcode matching does not scan every line
+    on each scan. Lines sharing a code keep their original order.
+    """
+    index: Dict[str, List[dict]] = {}
+    for ln in lines:
+        index.setdefault(ln["item_code"].lower(), []).append(ln)
+    return index
+
+
+def _indexed_line(index: Dict[str, List[dict]], item_code: str, warehouse_id=None) -> dict | None:
+    """First line with exactly `item_code` (and `warehouse_id`, if given)."""
+    for ln in index.get(item_code.lower(), ()):
+        if ln["item_code"] == item_code and (warehouse_id is None or ln["warehouse_id"] == warehouse_id):
+            return ln
+    return None
+
+
+def _match_stock_code(barcode, lines, line_index, warehouse_set):
+    """1) Direct stock code match"""
+    candidates = line_index.get(barcode.lower())
+    if candidates:
+        return candidates[0], 1.0
+    return None
+
+
+def _match_prefix(barcode, lines, line_index, warehouse_set):
+    """2) Warehouse prefix resolution - one lookup per distinct warehouse"""
+    # (the caller's precomputed warehouse_set avoids a pass over the lines)
+    warehouses = warehouse_set or dict.fromkeys(ln["warehouse_id"] for ln in lines)
+    for wh_id in warehouses:
+        code = _resolve_barcode_prefix_cached(barcode, wh_id)
+        if code:
+            matched_line = _indexed_line(line_index, code, wh_id)
+            if matched_line:
+                return matched_line, 1.0
+    return None
+
+
+def _match_xref(barcode, lines, line_index, warehouse_set):
+    """3) Barcode xref lookup with warehouse filtering - joined with the lines on the server"""
     if warehouse_set:
-        for wh_id in warehouse_set:
-            try:
-                # Convert warehouse_id to string if it's int
-                wh_id_str = str(wh_id) if isinstance(wh_id, int) else wh_id
-                item_code, multiplier = barcode_xref_lookup(barcode, wh_id_str)
-                if item_code:
-                    matched_line = next(
-                        (ln for ln in lines
-                         if ln["item_code"] == item_code
-                         and ln["warehouse_id"] == wh_id),
-                        None
-                    )
-                    if matched_line:
-                        return matched_line, multiplier or 1.0
-            except Exception as e:
-                logger.warning(f"Error looking up barcode in warehouse {wh_id}: {e}")
-                continue
+        try:
+            matched_line, multiplier = find_item_by_barcode_sql(barcode, lines, warehouse_set)
+            if matched_line:
+                return matched_line, multiplier
+        except Exception as e:
+            logger.warning(f"Error looking up barcode in warehouses {sorted(map(str, warehouse_set))}: {e}")
     else:
         # No warehouse filter - try general lookup
         try:
             item_code, multiplier = barcode_xref_lookup(barcode)
             if item_code:
-                matched_line = next(
-                    (ln for ln in lines if ln["item_code"] == item_code),
-                    None
-                )
+                matched_line = _indexed_line(line_index, item_code)
                 if matched_line:
                     return matched_line, multiplier or 1.0
         except Exception as e:
             logger.warning(f"Error in general barcode lookup: {e}")
+    return None
+
+
+# Package labels printed by label_service: "<invoice or order no>-K<package no>".
+# Supplier box labels ("44-1800/A-T10009-24-K10-1") carry a "/" and a
+# quantity tail, so they do not match and stay in the standard family.
+_PACKAGE_LABEL_RE = re.compile(r"[^/\s]+-K\d+")
+
+
+def _classify_barcode(barcode: str) -> str:
+    """Format family of a scanned barcode: "package" (our own -K<n> labels) or "standard"."""
+    if _PACKAGE_LABEL_RE.fullmatch(barcode):
+        return "package"
+    return "standard"
+
+
+# Strategies tried per format family, in order. Package labels are generated
+# by this application and are never Logo unit barcodes, so the per-warehouse
+# UNITBARCODE prefix queries are skipped for them; barcode_xref (and its
+# multiplier) stays authoritative for every family.
+_STRATEGIES = {
+    "package": (_match_stock_code, _match_xref),
+    "standard": (_match_stock_code, _match_prefix, _match_xref),
+}
+
+
+def find_item_by_barcode(barcode: str, lines: list, warehouse_set: set | None = None,
+                         line_index: Dict[str, List[dict]] | None = None) -> Tuple[dict | None, float]:
+    """
+    Find matching line item for a barcode using multiple strategies.
+    
+    The barcode is classified once (_classify_barcode) and only the
+    strategies that can match its format family are run.
+    
+    Args:
+        barcode: The barcode to find
+        lines: List of order lines to search
+        warehouse_set: Set of valid warehouse IDs (optional)
+        line_index: Prebuilt build_line_index(lines) result (optional)
+        
+    Returns:
+        Tuple of (matched_line, quantity_multiplier) or (None, 1.0) if not found
+    """
+    if line_index is None:
+        line_index = build_line_index(lines)
+
+    for strategy in _STRATEGIES[_classify_barcode(barcode)]:
+        match = strategy(barcode, lines, line_index, warehouse_set)
+        if match:
+            return match
     
     return None, 1.0
 
 
-def parse_complex_barcode(barcode: str, lines: list) -> Tuple[dict | None, float]:
+# PREFIX-CODE-Kxx[-...-QTY]: `code` is everything before the first "-K",
+# `qty` the last dash-separated segment after it (if any)
+_K_BARCODE_RE = re.compile(r"^(?P<code>.*?)-K(?P<tail>(?:.*-(?P<qty>[^-]*))?[^-]*)$", re.DOTALL)
+
+
+def _split_complex_barcode(barcode: str) -> Tuple[str, float] | None:
+    """(code_part, qty) of a PREFIX-CODE-Kxx-QTY barcode, or None for other formats."""
+    # Format: PREFIX-CODE-Kxx-QTY (exactly one "-K" marker)
+    m = _K_BARCODE_RE.match(barcode)
+    if not m or "-K" in m.group("tail"):
+        return None
+    try:
+        qty = float(m.group("qty")) if m.group("qty") is not None else 1.0
+    except ValueError:
+        qty = 1.0
+    return m.group("code"), qty
+
+
+def parse_complex_barcode(barcode: str, lines: list,
+                          line_index: Dict[str, List[dict]] | None = None) -> Tuple[dict | None, float]:
     """
     Parse complex barcode formats like "44-1800/A-T10009-24-K10-1"
     
     Args:
         barcode: Complex barcode string
         lines: List of order lines
+        line_index: Prebuilt build_line_index(lines) result (optional)
         
     Returns:
         Tuple of (matched_line, quantity) or (None, 1.0)
     """
-    # Example implementation for specific format
-    # This should be customized based on actual barcode format requirements
+    parts = _split_complex_barcode(barcode)
+    if parts is None:
+        return None, 1.0
+    code_part, qty = parts
     
-    if "-K" in barcode:
-        # Format: PREFIX-CODE-Kxx-QTY
-        parts = barcode.split("-K")
-        if len(parts) == 2:
-            code_part = parts[0]
-            qty_part = parts[1]
-            
-            # Extract quantity if present
-            try:
-                if "-" in qty_part:
-                    qty_str = qty_part.split("-")[-1]
-                    qty = float(qty_str)
-                else:
-                    qty = 1.0
-            except (ValueError, IndexError):
-                qty = 1.0
-            
-            # Try to match the code part
-            for ln in lines:
-                if code_part in ln["item_code"]:
-                    return ln, qty
+    # Exact code first (dict lookup), then a single substring scan
+    if code_part:
+        if line_index is None:
+            line_index = build_line_index(lines)
+        ln = _indexed_line(line_index, code_part)
+        if ln is not None:
+            return ln, qty
+    for ln in lines:
+        if code_part in ln["item_code"]:
+            return ln, qty
     
-    return None, 1.0
\ No newline at end of file
+    return None, 1.0
@@ -13,27 +13,16 @@ import argparse
 import logging
 import os
 import sys
+import threading
 import time
 from datetime import datetime, timedelta, date
 from pathlib import Path
 from typing import List, Dict, Tuple
-from collections import defaultdict
-
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.lib.units import mm
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.platypus import (
-    SimpleDocTemplate,
-    Table,
-    TableStyle,
-    Paragraph,
-    Spacer,
-    PageBreak,
-    KeepTogether,
-)
+from collections import Counter
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from itertools import groupby
 
 # Package paths
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -42,89 +31,123 @@ if str(BASE_DIR) not in sys.path:
 
 from app.dao.logo import (
     fetch_draft_orders,
+    fetch_draft_signature,
     fetch_order_lines,
+    fetch_order_lines_bulk,
     update_order_status,
+    update_orders_status_bulk,
     fetch_all,
+    get_conn,
     _t,
 )
 from app.dao.logo_tables import LogoTables
 from app.settings_manager import get_manager
+from app.utils.fonts import get_default_font
+from app.utils.process_pool import discard_process_pool, get_process_pool
 from app.utils.wms_paths import get_wms_folders, get_picklist_path
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
 
-# Font registration - Determine base directory based on execution mode
-if getattr(sys, 'frozen', False):
-    # Running as PyInstaller executable
-    FONT_BASE_DIR = Path(sys._MEIPASS)
-else:
-    # Running in development
-    FONT_BASE_DIR = Path(__file__).resolve().parent.parent
-
-# Try multiple font paths
-font_paths = [
-    str(FONT_BASE_DIR / "app" / "fonts" / "DejaVuSans.ttf"),
-    str(FONT_BASE_DIR / "fonts" / "DejaVuSans.ttf"),
-    os.getenv("PICKLIST_FONT_PATH", ""),
-    str(Path(__file__).resolve().parent.parent / "fonts" / "DejaVuSans.ttf"),
-    str(Path(__file__).resolve().parent.parent / "app" / "fonts" / "DejaVuSans.ttf"),
-]
+# PDF'leri paralel çizen süreç sayısı (1 → sıralı, süreç açılmaz)
+PICKLIST_WORKERS = int(os.getenv("PICKLIST_WORKERS", "4"))
+# Bundan az sipariş süreç havuzuna gönderilmez (çizim süreç yükünden ucuz)
+PICKLIST_PARALLEL_MIN = 3
+
+# Watcher: taslak imzası değişmese de tam liste en geç bu kadar saniyede bir çekilir
+WATCHER_FULL_EVERY = int(os.getenv("PICKLIST_FULL_POLL_SECONDS", "300"))
 
 DEFAULT_FONT = "Helvetica"  # Default fallback
-for font_path in font_paths:
-    if font_path and Path(font_path).exists():
-        try:
-            pdfmetrics.registerFont(TTFont("DejaVuSans", font_path))
-            DEFAULT_FONT = "DejaVuSans"
-            logger.info("Font loaded from: %s", font_path)
-            break
-        except Exception as e:
-            logger.warning("Could not load font from %s: %s", font_path, e)
-            continue
+_font_ready = False
+_font_lock = threading.Lock()
+
+
+def _ensure_font() -> str:
+    """
+    DejaVuSans'ı ilk PDF çiziminde kaydeder ve paragraf stillerini kurar.
+    Import sırasında ne disk taraması ne de ReportLab yüklemesi yapılır
+    (boş kuyrukta --once ucuz kalır); PDF süreç havuzundaki işçiler de
+    bunu başlangıçta bir kez çağırır. Bayrak ancak tüm stiller kurulunca
+    kalkar; kurulum hata verirse bir sonraki çağrı yeniden dener.
+    """
+    if _font_ready:
+        return DEFAULT_FONT
+    with _font_lock:
+        if not _font_ready:
+            _setup_font_styles()
+    return DEFAULT_FONT
+
 
-if DEFAULT_FONT == "Helvetica":
-    logger.warning("DejaVuSans.ttf not found; using Helvetica (Turkish characters may not display correctly)")
+def _setup_font_styles() -> None:
+    """_ensure_font'un kilit altında çalışan asıl kurulumu."""
+    global DEFAULT_FONT, _font_ready, TITLE_STYLE, HEADER_STYLE, PARA_STYLE, FOOTER_STYLE
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle
+
+    font = get_default_font("PICKLIST_FONT_PATH")
+    TITLE_STYLE = ParagraphStyle(
+        name="Title",
+        fontName=font,
+        fontSize=14,
+        leading=16,
+        alignment=1,  # Center
+        spaceAfter=12,
+    )
+    HEADER_STYLE = ParagraphStyle(
+        name="Header",
+        fontName=font,
+        fontSize=10,
+        leading=12,
+        textColor=colors.HexColor("#333333"),
+    )
+    PARA_STYLE = ParagraphStyle(
+        name="tbl",
+        fontName=font,
+        fontSize=8,
+        leading=9,
+        wordWrap="CJK",
+    )
+    FOOTER_STYLE = ParagraphStyle(
+        name="Footer",
+        fontName=font,
+        fontSize=7,
+        leading=8,
+        textColor=colors.HexColor("#666666"),
+        alignment=1,
+    )
+    DEFAULT_FONT = font
+    _font_ready = True
 
 # Use centralized WMS path management
 wms_folders = get_wms_folders()
 OUT_DIR = wms_folders['picklists']
 
-# Styles
-styles = getSampleStyleSheet()
-TITLE_STYLE = ParagraphStyle(
-    name="Title",
-    fontName=DEFAULT_FONT,
-    fontSize=14,
-    leading=16,
-    alignment=1,  # Center
-    spaceAfter=12,
-)
+# Styles – ReportLab ilk PDF'te yüklendiğinden _ensure_font içinde kurulur
+TITLE_STYLE = HEADER_STYLE = PARA_STYLE = FOOTER_STYLE = None
 
-HEADER_STYLE = ParagraphStyle(
-    name="Header",
-    fontName=DEFAULT_FONT,
-    fontSize=10,
-    leading=12,
-    textColor=colors.HexColor("#333333"),
-)
 
-PARA_STYLE = ParagraphStyle(
-    name="tbl",
-    fontName=DEFAULT_FONT,
-    fontSize=8,
-    leading=9,
-    wordWrap="CJK",
-)
+# Bu uzunluğun altındaki hücreler sütuna sığar → Paragraph (markup ayrıştırma) yok
+CODE_WRAP_CHARS = 18
+NAME_WRAP_CHARS = 45
 
-FOOTER_STYLE = ParagraphStyle(
-    name="Footer",
-    fontName=DEFAULT_FONT,
-    fontSize=7,
-    leading=8,
-    textColor=colors.HexColor("#666666"),
-    alignment=1,
-)
+
+def _cell(text, wrap_chars: int):
+    """Kısa metni düz str, sütuna sığmayacak metni sarmalı Paragraph olarak döndürür."""
+    text = "" if text is None else str(text)
+    if len(text) <= wrap_chars:
+        return text
+    from reportlab.platypus import Paragraph
+    return Paragraph(text, PARA_STYLE)
+
+
+@lru_cache(maxsize=8)
+def _user_display_name(username: str) -> str:
+    """users tablosundaki adı döndürür; sonuç kullanıcı adı başına önbelleklenir."""
+    from app.dao.logo import fetch_one
+    user = fetch_one("SELECT name FROM users WHERE username = ?", username)
+    if user and user.get("name"):
+        return user["name"]
+    return username.upper()
 
 
 def get_current_user() -> str:
@@ -132,17 +155,20 @@ def get_current_user() -> str:
     try:
         manager = get_manager()
         username = manager.get("login.last_username", "sistem")
-        
-        # Try to get full name from database
-        from app.dao.logo import fetch_one
-        user = fetch_one("SELECT name FROM users WHERE username = ?", username)
-        if user and user.get("name"):
-            return user["name"]
-        return username.upper()
+        # Kullanıcı adı anahtar olduğundan giriş değişince yeni sorgu atılır
+        return _user_display_name(username)
     except:
         return "SİSTEM"
 
 
+get_current_user.cache_clear = _user_display_name.cache_clear
+
+
+def _order_no_pattern() -> str:
+    """Satış siparişi FICHENO deseni; LIKE'a parametre olarak verilir (plan yeniden kullanılır)."""
+    return f"S%{LogoTables.ORDER_YEAR}%"
+
+
 def get_daily_statistics() -> Dict[str, any]:
     """Get daily order statistics."""
     try:
@@ -156,8 +182,8 @@ def get_daily_statistics() -> Dict[str, any]:
                    SUM(CASE WHEN STATUS = 4 THEN 1 ELSE 0 END) as completed
             FROM {_t('ORFICHE')}
             WHERE CAST(DATE_ AS DATE) = ?
-            AND FICHENO LIKE 'S%{LogoTables.ORDER_YEAR}%'
-        """, today)
+            AND FICHENO LIKE ?
+        """, today, _order_no_pattern())
         
         if today_orders:
             stats = today_orders[0]
@@ -180,8 +206,35 @@ def get_daily_statistics() -> Dict[str, any]:
     }
 
 
-def create_enhanced_picklist_pdf(order: dict, lines: List[dict]) -> Path:
-    """Create enhanced picklist PDF with user info and statistics."""
+def _stats_from_orders(orders: List[dict], day) -> Dict[str, any]:
+    """get_daily_statistics ile aynı sözlük, zaten çekilmiş sipariş satırlarından."""
+    by_status = Counter(o.get("status") for o in orders)
+    return {
+        "total": len(orders),
+        "draft": by_status[1],
+        "picking": by_status[2],
+        "completed": by_status[4],
+        "date": day.strftime("%d.%m.%Y"),
+    }
+
+
+def create_enhanced_picklist_pdf(order: dict, lines: List[dict],
+                                 prepared_by: str | None = None,
+                                 stats: Dict[str, any] | None = None) -> Path:
+    """
+    Create enhanced picklist PDF with user info and statistics.
+
+    prepared_by / stats verilmezse burada sorgulanır; parti işleyicisi
+    bunları bir kez çözüp geçirir (PDF çiziminde DB erişimi olmaz).
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.platypus import (
+        SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, KeepTogether,
+    )
+
+    _ensure_font()
     
     ts = datetime.now()
     ts_str = ts.strftime("%Y%m%d_%H%M%S")
@@ -196,13 +249,15 @@ def create_enhanced_picklist_pdf(order: dict, lines: List[dict]) -> Path:
     # Ensure directory exists
     pdf_path.parent.mkdir(parents=True, exist_ok=True)
     
+    if prepared_by is None:
+        prepared_by = get_current_user()
     doc = SimpleDocTemplate(
         str(pdf_path).replace('\\', '/'), 
         pagesize=A4,
         topMargin=20*mm, 
         bottomMargin=25*mm,
         title=f"Picklist - {order_no}",
-        author=get_current_user(),
+        author=prepared_by,
     )
     
     elements = []
@@ -226,7 +281,7 @@ def create_enhanced_picklist_pdf(order: dict, lines: List[dict]) -> Path:
     
     order_info += f"""
     <b>Tarih:</b> {order.get('order_date', ts).strftime('%d.%m.%Y') if hasattr(order.get('order_date', ts), 'strftime') else order.get('order_date', '')}<br/>
-    <b>Hazırlayan:</b> {get_current_user()}<br/>
+    <b>Hazırlayan:</b> {prepared_by}<br/>
     <b>Hazırlanma:</b> {ts.strftime('%d.%m.%Y %H:%M')}
     """
     elements.append(Paragraph(order_info, HEADER_STYLE))
@@ -235,15 +290,25 @@ def create_enhanced_picklist_pdf(order: dict, lines: List[dict]) -> Path:
     # Product table
     data = [["Sıra", "Stok Kodu", "Ürün Adı", "Adet", "Lokasyon", "Toplanan"]]
     
+    # Tek geçişte tablo satırları (tuple) + özet (benzersiz ürün, toplam adet)
+    seen_codes = set()
+    total_qty = 0
+    add_code = seen_codes.add
+    append_row = data.append
     for idx, line in enumerate(lines, 1):
-        data.append([
+        item_code = line.get("item_code", "")
+        qty = line.get("qty_ordered", 0)
+        if item_code:
+            add_code(item_code)
+        total_qty += qty
+        append_row((
             str(idx),
-            Paragraph(line.get("item_code", ""), PARA_STYLE),
-            Paragraph(line.get("item_name", ""), PARA_STYLE),
-            Paragraph(str(line.get("qty_ordered", 0)), PARA_STYLE),
+            _cell(item_code, CODE_WRAP_CHARS),
+            _cell(line.get("item_name", ""), NAME_WRAP_CHARS),
+            str(qty),
             "",  # Lokasyon - ileride eklenebilir
             "☐",  # Checkbox for picking
-        ])
+        ))
     
     tbl = Table(data, colWidths=[15*mm, 35*mm, 75*mm, 20*mm, 25*mm, 15*mm])
     tbl.setStyle(TableStyle([
@@ -269,12 +334,9 @@ def create_enhanced_picklist_pdf(order: dict, lines: List[dict]) -> Path:
     # Summary section
     elements.append(Spacer(1, 10*mm))
     
-    # Benzersiz ürün sayısını hesapla
-    unique_products = len(set(line.get("item_code") for line in lines if line.get("item_code")))
-    
     summary_data = [
-        ["Toplam Kalem:", str(unique_products)],  # Artık benzersiz ürün sayısı
-        ["Toplam Adet:", str(sum(line.get("qty_ordered", 0) for line in lines))],
+        ["Toplam Kalem:", str(len(seen_codes))],  # Artık benzersiz ürün sayısı
+        ["Toplam Adet:", str(total_qty)],
     ]
     
     summary_table = Table(summary_data, colWidths=[40*mm, 30*mm])
@@ -298,7 +360,8 @@ def create_enhanced_picklist_pdf(order: dict, lines: List[dict]) -> Path:
         elements.append(Spacer(1, 5*mm))
     
     # Footer with daily statistics
-    stats = get_daily_statistics()
+    if stats is None:
+        stats = get_daily_statistics()
     footer_text = f"""
     <i>Günlük Özet ({stats['date']}): 
     Toplam {stats['total']} sipariş | 
@@ -317,6 +380,14 @@ def create_enhanced_picklist_pdf(order: dict, lines: List[dict]) -> Path:
 
 def create_daily_summary_pdf() -> Path:
     """Create daily summary PDF with all orders."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.platypus import (
+        SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak,
+    )
+
+    _ensure_font()
     
     ts = datetime.now()
     ts_str = ts.strftime("%Y%m%d")
@@ -328,13 +399,14 @@ def create_daily_summary_pdf() -> Path:
     # Ensure directory exists
     pdf_path.parent.mkdir(parents=True, exist_ok=True)
     
+    prepared_by = get_current_user()
     doc = SimpleDocTemplate(
         str(pdf_path).replace('\\', '/'),
         pagesize=A4,
         topMargin=20*mm,
         bottomMargin=20*mm,
         title=f"Günlük Sipariş Özeti - {ts_str}",
-        author=get_current_user(),
+        author=prepared_by,
     )
     
     elements = []
@@ -345,6 +417,7 @@ def create_daily_summary_pdf() -> Path:
     elements.append(Spacer(1, 10*mm))
     
     # Get all orders for today
+    stats = None
     try:
         today_orders = fetch_all(f"""
             SELECT O.FICHENO as order_no,
@@ -356,10 +429,12 @@ def create_daily_summary_pdf() -> Path:
                    O.GENEXP2 as genexp2,
                    O.GENEXP3 as genexp3
             FROM {_t('ORFICHE')} O
-            WHERE CAST(O.DATE_ AS DATE) = CAST(GETDATE() AS DATE)
-            AND O.FICHENO LIKE 'S%{LogoTables.ORDER_YEAR}%'
+            WHERE CAST(O.DATE_ AS DATE) = ?
+            AND O.FICHENO LIKE ?
             ORDER BY O.STATUS, O.FICHENO
-        """)
+        """, ts.date(), _order_no_pattern())
+        # İstatistikler aynı satırlardan – ikinci ORFICHE sorgusu yok
+        stats = _stats_from_orders(today_orders, ts)
     except:
         # Fallback - sadece siparişleri al
         today_orders = fetch_all(f"""
@@ -372,19 +447,13 @@ def create_daily_summary_pdf() -> Path:
                    GENEXP2 as genexp2,
                    GENEXP3 as genexp3
             FROM {_t('ORFICHE')}
-            WHERE FICHENO LIKE 'S%{LogoTables.ORDER_YEAR}%'
+            WHERE FICHENO LIKE ?
             ORDER BY STATUS, FICHENO
-        """)
+        """, _order_no_pattern())
     
     if not today_orders:
         elements.append(Paragraph("Bugün için sipariş bulunmamaktadır.", HEADER_STYLE))
     else:
-        # Group by status
-        status_groups = defaultdict(list)
-        for order in today_orders:
-            status = order.get("status", 0)
-            status_groups[status].append(order)
-        
         # Status names
         status_names = {
             1: "📝 TASLAK SİPARİŞLER",
@@ -393,8 +462,10 @@ def create_daily_summary_pdf() -> Path:
             4: "🚚 TAMAMLANDI",
         }
         
-        for status_code, status_name in status_names.items():
-            if status_code not in status_groups:
+        # Sorgu ORDER BY STATUS → gruplar doğrudan ardışık satırlardan
+        for status_code, group in groupby(today_orders, key=lambda o: o.get("status", 0)):
+            status_name = status_names.get(status_code)
+            if not status_name:
                 continue
             
             elements.append(Paragraph(f"<b>{status_name}</b>", HEADER_STYLE))
@@ -402,14 +473,15 @@ def create_daily_summary_pdf() -> Path:
             
             # Create table for this status
             data = [["Sipariş No", "Müşteri", "Tutar", "Not"]]
-            
-            for order in status_groups[status_code]:
-                data.append([
+            data += [
+                [
                     order.get("order_no", ""),
                     order.get("customer_code", "")[:30] if order.get("customer_code") else "",
                     f"{order.get('total_amount', 0):,.2f} TL" if order.get('total_amount') else "0.00 TL",
                     order.get("notes", "")[:20] if order.get("notes") else "",
-                ])
+                ]
+                for order in group
+            ]
             
             tbl = Table(data, colWidths=[35*mm, 70*mm, 35*mm, 40*mm])
             tbl.setStyle(TableStyle([
@@ -422,8 +494,9 @@ def create_daily_summary_pdf() -> Path:
             elements.append(tbl)
             elements.append(Spacer(1, 10*mm))
     
-    # Statistics
-    stats = get_daily_statistics()
+    # Statistics (fallback listesi günle sınırlı değil → ayrı sorgu)
+    if stats is None:
+        stats = get_daily_statistics()
     stats_para = Paragraph(f"""
     <b>GÜNLÜK İSTATİSTİKLER</b><br/>
     Toplam Sipariş: {stats['total']}<br/>
@@ -431,7 +504,7 @@ def create_daily_summary_pdf() -> Path:
     Toplanıyor: {stats['picking']}<br/>
     Tamamlandı: {stats['completed']}<br/>
     <br/>
-    <i>Rapor Hazırlayan: {get_current_user()}<br/>
+    <i>Rapor Hazırlayan: {prepared_by}<br/>
     Tarih/Saat: {ts.strftime('%d.%m.%Y %H:%M')}</i>
     """, HEADER_STYLE)
     
@@ -444,25 +517,155 @@ def create_daily_summary_pdf() -> Path:
     return pdf_path
 
 
-def process_order_enhanced(order: dict):
-    """Process order with enhanced features."""
-    lines = fetch_order_lines(order["order_id"])
-    pdf_path = create_enhanced_picklist_pdf(order, lines)
-    logger.info("Enhanced PDF oluşturuldu: %s", pdf_path.name)
-    
-    # Update status to picking
-    update_order_status(order["order_id"], 2)
-    logger.info("Sipariş %s STATUS=2 yapıldı", order["order_no"])
-    
-    # Add to queue if needed
+def _render_order_pdf(order: dict, cn=None) -> Path:
+    """Tek sipariş: satırları çeker ve PDF'i çizer (DB yazımı yok)."""
+    lines = fetch_order_lines(order["order_id"], cn=cn)
+    return create_enhanced_picklist_pdf(order, lines)
+
+
+def _queue_order(order: dict, cn=None) -> None:
+    """Add to queue if needed"""
     try:
         from app.dao.logo import queue_insert
-        queue_insert(order["order_id"])
+        queue_insert(order["order_id"], cn=cn)
         logger.info("Sipariş kuyruğa eklendi: %s", order["order_no"])
     except:
         pass
 
 
+def _finalize_order(order: dict, pdf_path: Path, cn=None) -> None:
+    """STATUS=2 ve kuyruk kaydı (tek sipariş)."""
+    logger.info("Enhanced PDF oluşturuldu: %s", pdf_path.name)
+
+    # Update status to picking
+    update_order_status(order["order_id"], 2, cn=cn)
+    logger.info("Sipariş %s STATUS=2 yapıldı", order["order_no"])
+
+    _queue_order(order, cn)
+
+
+def process_order_enhanced(order: dict, cn=None):
+    """Process order with enhanced features."""
+    _finalize_order(order, _render_order_pdf(order, cn), cn)
+
+
+def process_orders_enhanced(orders: List[dict]) -> None:
+    """
+    Siparişleri parti halinde işler:
+    • tüm satırlar tek sorguda (fetch_order_lines_bulk)
+    • PDF'ler `PICKLIST_WORKERS` süreçte paralel (ReportLab CPU'ya bağlı);
+      çizim sırasında DB bağlantısı tutulmaz
+    • PDF'i üretilenlerin STATUS=2'si tek UPDATE, ardından kuyruk kayıtları
+    Toplu adım hata verirse sipariş sipariş denenir; hatalı sipariş loglanır,
+    partinin geri kalanı işlenir (taslakta kalan bir sonraki turda tekrar denenir).
+    """
+    pending = list(orders)
+    if not pending:
+        return
+    try:
+        lines_map = _fetch_lines(pending)
+    except Exception as e:
+        logger.error("Sipariş satırları alınamadı: %s", e)
+        return
+    pending = [o for o in pending if o["order_id"] in lines_map]
+
+    rendered = _render_pdfs(pending, lines_map)
+    if not rendered:
+        return
+
+    try:
+        with get_conn(autocommit=True) as cn:
+            for order in _mark_picking(rendered, cn):
+                _queue_order(order, cn)
+    except Exception as e:
+        logger.error("Sipariş durumları güncellenemedi: %s", e)
+
+
+def _fetch_lines(orders: List[dict]) -> Dict[int, List[dict]]:
+    """Satırlar tek sorguda; o başarısızsa sipariş başına (hatalılar atlanır)."""
+    with get_conn(autocommit=True) as cn:
+        try:
+            return fetch_order_lines_bulk([o["order_id"] for o in orders], cn=cn)
+        except Exception as e:
+            logger.warning("Toplu satır sorgusu başarısız, sipariş bazında devam: %s", e)
+        lines_map: Dict[int, List[dict]] = {}
+        for order in orders:
+            try:
+                lines_map[order["order_id"]] = fetch_order_lines(order["order_id"], cn=cn)
+            except Exception as e:
+                logger.error("Sipariş işlenemedi %s: %s", order.get("order_no"), e)
+        return lines_map
+
+
+def _mark_picking(orders: List[dict], cn) -> List[dict]:
+    """STATUS=2 tek UPDATE ile; o başarısızsa sipariş başına. Güncellenenleri döndürür."""
+    try:
+        update_orders_status_bulk([o["order_id"] for o in orders], 2, cn=cn)
+        logger.info("%d sipariş STATUS=2 yapıldı: %s", len(orders),
+                    ", ".join(o["order_no"] for o in orders))
+        return orders
+    except Exception as e:
+        logger.warning("Toplu STATUS güncellemesi başarısız, sipariş bazında devam: %s", e)
+    updated = []
+    for order in orders:
+        try:
+            update_order_status(order["order_id"], 2, cn=cn)
+            logger.info("Sipariş %s STATUS=2 yapıldı", order["order_no"])
+            updated.append(order)
+        except Exception as e:
+            logger.error("Sipariş işlenemedi %s: %s", order.get("order_no"), e)
+    return updated
+
+
+def _render_one(order: dict, lines: List[dict], prepared_by: str,
+                stats: Dict[str, any]) -> Path:
+    """Havuz işçisinin çizdiği tek PDF; tüm veri argümanla gelir (DB yok)."""
+    return create_enhanced_picklist_pdf(order, lines, prepared_by, stats)
+
+
+def _render_pdfs(pending: List[dict], lines_map: Dict[int, List[dict]]) -> List[dict]:
+    """
+    PDF'leri üretir, başarılı siparişleri döndürür. Hazırlayan ve günlük
+    istatistik partide bir kez (ana süreçte) çözülür. `PICKLIST_PARALLEL_MIN`
+    ve üzeri sipariş paylaşılan süreç havuzunda çizilir; havuz kullanılamazsa
+    kalanlar sıralı çizilir.
+    """
+    pending = list(pending)
+    rendered: List[dict] = []
+    prepared_by = get_current_user()
+    stats = get_daily_statistics()
+    if PICKLIST_WORKERS > 1 and len(pending) >= PICKLIST_PARALLEL_MIN:
+        try:
+            # Font her işçide başlangıçta bir kez kaydedilir, ilk PDF'i beklemez
+            ex = get_process_pool("picklists", PICKLIST_WORKERS, initializer=_ensure_font)
+            futures = {
+                ex.submit(_render_one, o, lines_map[o["order_id"]], prepared_by, stats): o
+                for o in pending
+            }
+            for fut in as_completed(futures):
+                order = futures[fut]
+                try:
+                    logger.info("Enhanced PDF oluşturuldu: %s", fut.result().name)
+                    rendered.append(order)
+                except BrokenProcessPool:
+                    raise  # kalanlar aşağıda sıralı çizilir
+                except Exception as e:
+                    logger.error("Sipariş işlenemedi %s: %s", order.get("order_no"), e)
+                pending.remove(order)
+        except Exception as e:
+            discard_process_pool("picklists")
+            logger.warning("Paralel PDF üretimi kullanılamadı, sıralı devam: %s", e)
+
+    for order in pending:
+        try:
+            pdf_path = _render_one(order, lines_map[order["order_id"]], prepared_by, stats)
+            logger.info("Enhanced PDF oluşturuldu: %s", pdf_path.name)
+            rendered.append(order)
+        except Exception as e:
+            logger.error("Sipariş işlenemedi %s: %s", order.get("order_no"), e)
+    return rendered
+
+
 def main():
     parser = argparse.ArgumentParser(description="Enhanced Picklist Service")
     parser.add_argument("--once", action="store_true", help="Run once and exit")
@@ -480,29 +683,33 @@ def main():
         orders = fetch_draft_orders(limit=50)
         logger.info("%d taslak sipariş bulundu", len(orders))
         
-        for order in orders:
-            try:
-                process_order_enhanced(order)
-            except Exception as e:
-                logger.error("Sipariş işlenemedi %s: %s", order.get("order_no"), e)
-                
+        process_orders_enhanced(orders)
+
     else:
         # Watcher mode
         logger.info("Enhanced Picklist watcher başlatıldı (%d sn aralıkla)", args.interval)
         
+        # Boş dönen listenin imzası: değişmedikçe ağır sorgu atlanır. Sipariş
+        # dönen (başarısız olanlar dahil) turlarda imza tutulmaz → tekrar denenir
+        idle_signature = None
+        last_full = 0.0
         while True:
             try:
+                signature = fetch_draft_signature()
+                if (signature == idle_signature
+                        and time.monotonic() - last_full < WATCHER_FULL_EVERY):
+                    time.sleep(args.interval)
+                    continue
+
                 orders = fetch_draft_orders(limit=50)
+                last_full = time.monotonic()
+                idle_signature = None if orders else signature
                 
                 if orders:
                     logger.info("%d yeni taslak sipariş bulundu", len(orders))
                     
-                    for order in orders:
-                        try:
-                            process_order_enhanced(order)
-                        except Exception as e:
-                            logger.error("Sipariş işlenemedi %s: %s", order.get("order_no"), e)
-                            
+                    process_orders_enhanced(orders)
+
             except Exception as e:
                 logger.error("Watcher hatası: %s", e)
                 
@@ -3,7 +3,7 @@ CSV / Excel → barcode_xref toplu içe aktarma
 -------------------------------------------
 Kullanım:
     from app.services.import_barcodes import load_file
-    ok, sec, err = load_file("dosya.csv")
+    res = load_file("dosya.csv")   # res.done, res.elapsed, res.err_count, res.fmt_err
 
 Beklenen sütunlar (büyük / küçük harf duyarsız, boşluklar önemsiz):
     • barcode       (veya barkod)
@@ -22,21 +22,44 @@ Beklenen sütunlar (büyük / küçük harf duyarsız, boşluklar önemsiz):
 
 """
 
+from dataclasses import dataclass
 from pathlib import Path
+import logging
 import time
 import csv
-from typing import List, Tuple, Dict
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 import pandas as pd  # openpyxl + xlrd kurulu olmalı
 from app.dao.logo import get_conn  # DAO'daki ortak bağlantı context manager
 
+logger = logging.getLogger(__name__)
+
 # ────────────────────────────────────────────────────────────────────────────
-# MERGE  →  varsa UPDATE  |  yoksa INSERT
+# Toplu yükleme: satırlar #stage'e düz INSERT (fast_executemany), sonra
+# tek set-tabanlı MERGE  →  varsa UPDATE  |  yoksa INSERT
 # ────────────────────────────────────────────────────────────────────────────
-SQL = (
+# Kolon tipleri hedef tablodan kopyalanır; seq dosyadaki sırayı tutar
+STAGE_CREATE_SQL = (
+    "IF OBJECT_ID('tempdb..#barcode_stage') IS NOT NULL DROP TABLE #barcode_stage; "
+    "SELECT TOP 0 barcode, warehouse_id AS wh, item_code, multiplier AS mul, "
+    "       CAST(0 AS INT) AS seq "
+    "  INTO #barcode_stage FROM dbo.barcode_xref;"
+)
+
+STAGE_INSERT_SQL = (
+    "INSERT INTO #barcode_stage (barcode, wh, item_code, mul, seq) VALUES (?, ?, ?, ?, ?)"
+)
+
+# Dosyada aynı (barkod, depo) birden çok kez varsa satır satır MERGE'deki
+# gibi son satır geçerli olur
+STAGE_MERGE_SQL = (
     "MERGE dbo.barcode_xref AS tgt "
-    "USING (VALUES (?, ?, ?, ?)) "
-    "     AS src(barcode, wh, item_code, mul) "
+    "USING (SELECT barcode, wh, item_code, mul "
+    "         FROM (SELECT *, ROW_NUMBER() OVER "
+    "                        (PARTITION BY barcode, wh ORDER BY seq DESC) AS rn "
+    "                 FROM #barcode_stage) s "
+    "        WHERE rn = 1) AS src "
     "ON (tgt.barcode = src.barcode AND tgt.warehouse_id = src.wh) "
     "WHEN MATCHED THEN "
     "     UPDATE SET tgt.item_code   = src.item_code, "
@@ -47,6 +70,18 @@ SQL = (
     "     VALUES (src.barcode, src.wh, src.item_code, src.mul, GETDATE());"
 )
 
+STAGE_DROP_SQL = "IF OBJECT_ID('tempdb..#barcode_stage') IS NOT NULL DROP TABLE #barcode_stage;"
+
+# #stage'e parça başına gönderilen satır sayısı (sürücü tamponu / bellek sınırı)
+IMPORT_CHUNK = 5000
+
+
+def _chunks(rows: Iterable[Tuple], n: int = IMPORT_CHUNK) -> Iterator[List[Tuple]]:
+    """Satırları n'lik listeler halinde üretir (girdi liste ya da iterator olabilir)."""
+    it = iter(rows)
+    while chunk := list(islice(it, n)):
+        yield chunk
+
 # ────────────────────────────────────────────────────────────────────────────
 # Başlık normalizasyonu ve doğrulama
 # ────────────────────────────────────────────────────────────────────────────
@@ -85,29 +120,50 @@ def _validate_columns(cols) -> None:
 # Dosya okuma yardımcıları
 # ────────────────────────────────────────────────────────────────────────────
 
-def _read_csv(path: Path) -> List[Tuple]:
-    with open(path, newline="", encoding="utf-8") as f:
-        rdr = csv.DictReader(f)
-        if rdr.fieldnames is None:
+def _read_csv(path: Path) -> Iterator[Tuple]:
+    """
+    Başlığı hemen okuyup doğrular, satırları ise tembel üretir.
+    Kolon eşlemesi (_norm_key) satır başına değil, başlıkta bir kez yapılır.
+    """
+    f = open(path, newline="", encoding="utf-8")
+    try:
+        rdr = csv.reader(f)
+        header = next(rdr, None)
+        if header is None:
             raise ValueError("CSV dosyası boş veya başlık satırı eksik.")
-        norm_fieldnames = [_norm_key(h) for h in rdr.fieldnames]
+        norm_fieldnames = [_norm_key(h) for h in header]
         _validate_columns(norm_fieldnames)
+    except Exception:
+        f.close()
+        raise
+
+    idx = norm_fieldnames.index
+    i_mul = idx("multiplier") if "multiplier" in norm_fieldnames else None
+    return _iter_csv_rows(f, rdr, idx("barcode"), idx("warehouse_id"),
+                          idx("item_code"), i_mul)
 
-        rows = []
-        for raw in rdr:
-            r = {_norm_key(k): v for k, v in raw.items()}
-            rows.append(
-                (
-                    r["barcode"].strip(),
-                    int(r["warehouse_id"]),
-                    r["item_code"].strip(),
-                    float(r.get("multiplier") or 1),
+
+def _iter_csv_rows(f, rdr, i_bc: int, i_wh: int, i_ic: int,
+                   i_mul: int | None) -> Iterator[Tuple]:
+    with f:
+        for row in rdr:
+            if not row:  # boş satır (DictReader gibi atla)
+                continue
+            # Eksik kolon / geçersiz değer → ValueError: load_file bunu
+            # DB hatası değil biçim hatası (fmt_err) olarak raporlar
+            try:
+                item = (
+                    row[i_bc].strip(),
+                    int(row[i_wh]),
+                    row[i_ic].strip(),
+                    float(row[i_mul] or 1) if i_mul is not None and i_mul < len(row) else 1.0,
                 )
-            )
-        return rows
+            except (IndexError, ValueError) as exc:
+                raise ValueError(f"CSV {rdr.line_num}. satır hatalı: {exc}") from exc
+            yield item
 
 
-def _read_xlsx(path: Path) -> List[Tuple]:
+def _read_xlsx(path: Path) -> Iterator[Tuple]:
     df = pd.read_excel(path, dtype=str)
     df.columns = [_norm_key(c) for c in df.columns]  # başlıkları normalize et
     _validate_columns(df.columns)
@@ -118,50 +174,85 @@ def _read_xlsx(path: Path) -> List[Tuple]:
     else:
         df["multiplier"] = 1.0
 
-    return list(
-        zip(
-            df["barcode"].str.strip(),
-            df["warehouse_id"].astype(int),
-            df["item_code"].str.strip(),
-            df["multiplier"],
+    # Temizlik kolon bazında (pandas/NumPy içinde) bir kez yapılır
+    df["barcode"] = df["barcode"].str.strip()
+    df["item_code"] = df["item_code"].str.strip()
+    # Excel depo no'yu "2.0" olarak verebilir: önce sayıya çevir, sonra tamsayı
+    # olmayan (boş / 2.5) değerleri biçim hatası say
+    wh = pd.to_numeric(df["warehouse_id"].str.strip(), errors="raise")
+    bad = wh.isna() | (wh % 1 != 0)
+    if bad.any():
+        raise ValueError(
+            f"Excel {int(bad.idxmax()) + 2}. satır hatalı: depo tamsayı olmalı"
         )
+    df["warehouse_id"] = wh.astype(int)
+
+    # Satırlar parça parça tüketilir; DataFrame'in ikinci bir liste kopyası kurulmaz
+    return df[["barcode", "warehouse_id", "item_code", "multiplier"]].itertuples(
+        index=False, name=None
     )
 
 # ────────────────────────────────────────────────────────────────────────────
 # Ana fonksiyon
 # ────────────────────────────────────────────────────────────────────────────
 
-def load_file(path: str) -> Tuple[int, float, int]:
+@dataclass
+class ImportResult:
+    """load_file sonucu"""
+    done: int           # DB'ye yazılan satır
+    elapsed: float      # geçen süre (sn)
+    err_count: int = 0  # DB hatası nedeniyle yazılamayan (geri alınan) satır
+    fmt_err: int = 0    # biçim/başlık hatası (1 → dosya okunamadı)
+
+
+def load_file(path: str) -> ImportResult:
     """CSV / XLSX dosyayı içeri alıp DB’ye yazar.
 
-    Döner ⇒ (işlenen satır sayısı, geçen süre sn, hata adedi)
+    Döner ⇒ ImportResult(işlenen satır, geçen süre sn, DB hatalı satır, biçim hatası)
     """
     path_obj = Path(path)
     if not path_obj.exists():
         raise FileNotFoundError(f"Dosya bulunamadı: {path_obj}")
 
-    rows = _read_csv(path_obj) if path_obj.suffix.lower() == ".csv" else _read_xlsx(path_obj)
-
     t0 = time.time()
-    err = 0
     done = 0
+    seq = 0
     
     # Use context manager to ensure proper resource cleanup
     try:
+        rows = _read_csv(path_obj) if path_obj.suffix.lower() == ".csv" else _read_xlsx(path_obj)
+
         with get_conn(autocommit=False) as conn:
             cur = conn.cursor()
             cur.fast_executemany = True
             
-            if rows:  # boş dosya kontrolü
-                cur.executemany(SQL, rows)  # tek seferde bütün satırlar
-                conn.commit()
-                done = len(rows)
-    except ValueError as exc:  # biçim hatası
-        err = 1
-        print(f"[import_barcodes] Biçim/başlık hatası → {exc}")
-    except Exception as exc:  # DB veya diğer hatalar
-        err = 1
-        print(f"[import_barcodes] DB hatası → {exc}")
+            chunks = _chunks(rows)
+            first = next(chunks, None)
+            if first:  # boş dosya kontrolü
+                # #stage aynı transaction'da açılıp silinir; hata olursa
+                # rollback onu da geri alır (havuzdaki oturumda kalmaz)
+                try:
+                    cur.execute(STAGE_CREATE_SQL)
+                    for chunk in chain([first], chunks):
+                        cur.executemany(STAGE_INSERT_SQL,
+                                        [(*r, seq + i) for i, r in enumerate(chunk)])
+                        seq += len(chunk)
+                    cur.execute(STAGE_MERGE_SQL)  # tek set-tabanlı MERGE
+                    cur.execute(STAGE_DROP_SQL)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                done = seq
+                # Tarama tarafındaki xref önbelleği yeni eşlemeleri görsün
+                from app.services.barcode_service import barcode_xref_lookup
+                barcode_xref_lookup.cache_clear()
+    except ValueError as exc:  # biçim hatası (başlık ya da satır değeri)
+        logger.error("Biçim/başlık hatası (%s): %s", path_obj.name, exc)
+        return ImportResult(0, time.time() - t0, fmt_err=1)
+    except Exception:  # DB veya diğer hatalar → tüm transaction geri alındı
+        logger.exception("barcode_xref içe aktarma başarısız: %s", path_obj.name)
+        return ImportResult(0, time.time() - t0, err_count=max(seq, 1))
     # Connection automatically closed by context manager
 
-    return done, time.time() - t0, err
+    return ImportResult(done, time.time() - t0)
@@ -26,23 +26,23 @@ LABEL_OUT_DIR (default: ./labels)
 """
 from __future__ import annotations
 
-__all__ = ['make_labels', 'LabelError']
+__all__ = ['make_labels', 'fetch_label_data', 'render_labels', 'LabelError']
 
-import os
 import sys
 import re
 import logging
 import argparse
 import datetime as dt
-from typing import Dict, Optional
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Optional
 from pathlib import Path
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import mm
-from reportlab.graphics.barcode import code128
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.lib.units import mm   # sabit; canvas/barkod modülleri ilk etikette yüklenir
 import pyodbc
 
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+
 try:
     from app.dao import logo as dao
     from app import settings as st
@@ -61,14 +61,6 @@ except (ModuleNotFoundError, ImportError):
 logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(message)s")
 
 # ---------------------------------------------------------------------------
-# Determine base directory based on execution mode
-if getattr(sys, 'frozen', False):
-    # Running as PyInstaller executable
-    BASE_DIR = Path(sys._MEIPASS)
-else:
-    # Running in development
-    BASE_DIR = Path(__file__).resolve().parent.parent
-
 COMPANY_TEXT = "CAN OTOMOTIV"
 PAGE_SIZE    = (100*mm, 100*mm)
 
@@ -84,32 +76,16 @@ except ImportError:
     LABEL_DIR.mkdir(parents=True, exist_ok=True)
     OUT_DIR = LABEL_DIR
 
-# Try multiple font paths
-font_paths = [
-    str(BASE_DIR / "app" / "fonts" / "DejaVuSans.ttf"),
-    str(BASE_DIR / "fonts" / "DejaVuSans.ttf"),
-    os.getenv("FONT_PATH", ""),
-    str(Path(__file__).resolve().parent.parent / "fonts" / "DejaVuSans.ttf"),
-    str(Path(__file__).resolve().parent.parent / "app" / "fonts" / "DejaVuSans.ttf"),
-]
-
-FONT_NAME = "Helvetica"  # Default fallback
-for font_path in font_paths:
-    if font_path and Path(font_path).exists():
-        try:
-            pdfmetrics.registerFont(TTFont("DejaVu", font_path))
-            FONT_NAME = "DejaVu"
-            logging.info(f"Font loaded from: {font_path}")
-            break
-        except Exception as e:
-            logging.warning(f"Could not load font from {font_path}: {e}")
-            continue
-
-if FONT_NAME == "Helvetica":
-    logging.warning("DejaVuSans.ttf not found; using Helvetica (Turkish characters may not display correctly)")
+from app.utils.fonts import get_default_font
+
+
+@lru_cache(maxsize=1)
+def _font_name() -> str:
+    """DejaVuSans ilk etikette bir kez aranıp kaydedilir (diğer PDF servisleriyle ortak)."""
+    return get_default_font("FONT_PATH")
 
 # ---------------------------------------------------------------------------
-def get_current_user_first_name() -> str:
+def get_current_user_first_name(cn=None) -> str:
     """Get the first name of the current user from settings."""
     try:
         from app.settings_manager import get_manager
@@ -117,7 +93,7 @@ def get_current_user_first_name() -> str:
         username = manager.get("login.last_username", "")
         
         # Get user's full name from database
-        with dao.get_conn() as cn:
+        with (nullcontext(cn) if cn is not None else dao.get_conn()) as cn:
             cursor = cn.cursor()
             cursor.execute("SELECT name FROM users WHERE username = ?", username)
             row = cursor.fetchone()
@@ -131,14 +107,25 @@ def get_current_user_first_name() -> str:
         logging.debug(f"Could not get user first name: {e}")
         return ""
 
+# ---------------------------------------------------------------------------
+# Türkçe büyük harf: str.upper() "i"yi "I" yapar, etikette "İ" olmalı
+_TR_UPPER = str.maketrans("iıçğöşü", "İIÇĞÖŞÜ")
+
+
+@lru_cache(maxsize=256)
+def _address_lines(adres: str) -> tuple:
+    """Adresi büyük harfe çevirip 6'şar kelimelik en fazla 2 satıra böler (müşteri başına önbellekli)."""
+    adres_raw = adres.translate(_TR_UPPER).upper().split()
+    return tuple(" ".join(adres_raw[i:i + 6]) for i in range(0, min(len(adres_raw), 12), 6))
+
 # ---------------------------------------------------------------------------
 def parse_int(text: str, default:int=1) -> int:
     m = re.search(r"(\d+)", text or "")
     return int(m.group(1)) if m else default
 
 # ---------------------------------------------------------------------------
-def fetch_invoice_no(order_no: str) -> Optional[str]:
-    """Fatura no al (CAN*/ARV* öncelikli)"""
+def fetch_invoice_no(order_no: str, cn=None) -> Optional[str]:
+    """Fatura no al (CAN*/ARV* öncelikli); cn verilirse o bağlantı kullanılır."""
     sqls = [
         f"""
         SELECT TOP 1 I.FICHENO
@@ -155,10 +142,12 @@ def fetch_invoice_no(order_no: str) -> Optional[str]:
         WHERE SPECODE = ? AND CANCELLED=0
         """,
     ]
-    with dao.get_conn() as cn:
+    with (nullcontext(cn) if cn is not None else dao.get_conn()) as cn:
         for sql in sqls:
             try:
-                row = cn.execute(sql, order_no).fetchone()
+                cur = dao.get_cached_cursor(cn, sql)
+                row = cur.execute(sql, order_no).fetchone()
+                cur.nextset()
                 if row:
                     return row[0]
             except pyodbc.ProgrammingError:
@@ -166,38 +155,52 @@ def fetch_invoice_no(order_no: str) -> Optional[str]:
     return None
 
 # ---------------------------------------------------------------------------
-def draw_page(c: canvas.Canvas, p: Dict[str, str]):
+def draw_page(c: Canvas, p: Dict[str, str]):
     """Tek koli etiketi (100×100 mm) çizer"""
+    from reportlab.graphics.barcode import code128
+
+    # setFont yalnızca punto değişiyorsa (aynı Tf komutu tekrar yazılmaz).
+    # Geçerli punto burada izlenir; her çağrı tek sayfa çizer (showPage ile
+    # biter), sayfa başında henüz font seçilmemiş sayılır.
+    font_name = _font_name()
+    font_size = None
+
+    def _set_font(size: int) -> None:
+        nonlocal font_size
+        if size != font_size:
+            c.setFont(font_name, size)
+            font_size = size
+
     x = 6*mm
     y = 93*mm
 
     # Başlık & bölge
-    c.setFont(FONT_NAME, 14)
+    _set_font(14)
     c.drawString(x, y, COMPANY_TEXT)
-    c.setFont(FONT_NAME, 10)
+    _set_font(10)
     c.drawRightString(PAGE_SIZE[0]-x, y, "GEREDE")
 
     y -= 6*mm
-    c.setFont(FONT_NAME, 8)
+    _set_font(8)
     c.drawRightString(PAGE_SIZE[0]-x, y, p["region"])
 
     # Cari kodu & adı
     y -= 10*mm
-    c.setFont(FONT_NAME, 8)
+    _set_font(8)
     c.drawString(x, y, p["cari_kodu"])
     y -= 5*mm
-    c.setFont(FONT_NAME, 10)
+    _set_font(10)
     c.drawString(x, y, p["cari_adi"])
 
     # Adres
-    c.setFont(FONT_NAME, 8)
+    _set_font(8)
     for line in p["adres_lines"]:
         y -= 4*mm
         c.drawString(x, y, line)
 
     # Sipariş No & Koli
     y -= 6*mm
-    c.setFont(FONT_NAME, 10)
+    _set_font(10)
     c.drawString(x, y, f"Sipariş No: {p['order_no']}")
     c.drawRightString(PAGE_SIZE[0]-x, y, f"Koli: {p['pkg_no']}/{p['pkg_tot']}")
 
@@ -209,12 +212,12 @@ def draw_page(c: canvas.Canvas, p: Dict[str, str]):
 
     # Barkod altı fatura no
     y -= 7*mm
-    c.setFont(FONT_NAME, 8)
+    _set_font(8)
     c.drawCentredString(PAGE_SIZE[0]/2, y, p["barkod"])
 
     # Sipariş tarihi & transfer
     y -= 6*mm
-    c.setFont(FONT_NAME, 7)
+    _set_font(7)
     c.drawString(x, y, f"Sipariş Tarihi: {p['sip_tarih']}")
     if p.get("transfer"):
         c.drawRightString(PAGE_SIZE[0]-x, y, f"Transfer: {p['transfer']}")
@@ -222,22 +225,22 @@ def draw_page(c: canvas.Canvas, p: Dict[str, str]):
     # İlk sayfa için fatura hatırlatma metni
     if p.get("inv_line"):
         y -= 8*mm
-        c.setFont(FONT_NAME, 9)
+        _set_font(9)
         c.drawCentredString(PAGE_SIZE[0]/2, y, p["inv_line"])
 
     # Footer (ör: "EKSİK GÖNDERİLEN SEVKİYAT")
     if p.get("footer"):
-        c.setFont(FONT_NAME, 8)
+        _set_font(8)
         c.drawCentredString(PAGE_SIZE[0]/2, 5*mm, p["footer"])
     
     # User name in bottom right
     if p.get("user_name"):
-        c.setFont(FONT_NAME, 7)
+        _set_font(7)
         c.drawRightString(PAGE_SIZE[0]-6*mm, 3*mm, p["user_name"])
     
     # Print date/time in bottom left
     if p.get("print_datetime"):
-        c.setFont(FONT_NAME, 6)
+        _set_font(6)
         c.drawString(6*mm, 3*mm, p["print_datetime"])
 
     c.showPage()
@@ -254,17 +257,40 @@ def make_labels(order_no: str, *, force: bool = False, footer: str = ""):
     • Her paket için barkod  →  FaturaNo-K1 , FaturaNo-K2 …
     • force=True  → fatura yoksa da sipariş no kullanılır.
     """
-    hdr = dao.fetch_order_header(order_no)
+    render_labels(fetch_label_data(order_no, force=force), footer=footer)
+
+
+def fetch_label_data(order_no: str, *, force: bool = False, cn=None) -> dict:
+    """
+    Etiket için gereken DB verisi (başlık, fatura no, kullanıcı adı).
+    Dönen dict yalnızca düz veri içerir; render_labels'e (başka süreçte de)
+    verilebilir. cn verilirse yeni bağlantı açılmaz.
+    """
+    # Başlık, fatura no ve kullanıcı adı tek bağlantıdan okunur;
+    # kontroller bağlantı bırakıldıktan sonra yapılır
+    with (nullcontext(cn) if cn is not None else dao.get_conn()) as cn:
+        hdr = dao.fetch_order_header(order_no, cn=cn)
+        if hdr:
+            invoice_no = fetch_invoice_no(order_no, cn=cn)
+            user_name = get_current_user_first_name(cn)
+
     if not hdr:
         logging.error("Sipariş bulunamadı: %s", order_no)
         raise LabelError(f"Sipariş bulunamadı: {order_no}")
 
-    invoice_no = fetch_invoice_no(order_no)
     if not invoice_no and not force:
         logging.warning("Fatura yok – basılmadı")
         raise LabelError("Fatura yok – etiket basılamadı")
 
-    barkod_root = invoice_no or order_no           # ← temel kısım
+    return {"order_no": order_no, "hdr": dict(hdr),
+            "invoice_no": invoice_no, "user_name": user_name}
+
+
+def render_labels(data: dict, *, footer: str = "") -> Path:
+    """fetch_label_data çıktısından etiket PDF'ini çizer (DB erişimi yok)."""
+    order_no, hdr = data["order_no"], data["hdr"]
+    user_name = data["user_name"]
+    barkod_root = data["invoice_no"] or order_no   # ← temel kısım
     pkg_tot     = parse_int(hdr.get("genexp4", "1"))
 
     # Ensure safe filename (remove any path separators)
@@ -277,41 +303,40 @@ def make_labels(order_no: str, *, force: bool = False, footer: str = ""):
     
     # Convert to string with forward slashes
     pdf_path_str = str(pdf_path).replace('\\', '/')
+    from reportlab.pdfgen import canvas
     c = canvas.Canvas(pdf_path_str, pagesize=PAGE_SIZE)
 
     # — adres satırlarını kır —
-    adres_raw   = (hdr.get("adres", "").upper()).split()
-    adres_lines = [" ".join(adres_raw[i:i + 6]) for i in range(0, len(adres_raw), 6)][:2]
-    
-    # Get current user's first name
-    user_name = get_current_user_first_name()
+    adres_lines = list(_address_lines(hdr.get("adres", "") or ""))
     
     # Get current datetime for print timestamp
     print_datetime = dt.datetime.now().strftime("%d.%m.%Y %H:%M")
 
+    # Paketler arasında sabit alanlar bir kez kurulur; döngüde yalnızca
+    # paket no, barkod ve fatura satırı değişir
+    payload = {
+        "order_no":   order_no,
+        "pkg_tot":    pkg_tot,
+        "cari_kodu":  hdr.get("cari_kodu", ""),
+        "cari_adi":   hdr.get("cari_adi", "")[:30],
+        "adres_lines": adres_lines,
+        "region":     f"{hdr.get('genexp2','')} - {hdr.get('genexp3','')}".strip(" -"),
+        "sip_tarih":  dt.datetime.now().strftime("%d-%m-%Y"),
+        "transfer":   hdr.get("genexp1", "").strip(";"),
+        "footer":     footer,
+        "user_name":  user_name,
+        "print_datetime": print_datetime,
+    }
+
     for i in range(1, pkg_tot + 1):
-        barkod = f"{barkod_root}-K{i}"             # ← 🔸 YENİ: paket no ekle
-
-        payload = {
-            "order_no":   order_no,
-            "pkg_no":     i,
-            "pkg_tot":    pkg_tot,
-            "barkod":     barkod,                  # ← güncel barkod
-            "cari_kodu":  hdr.get("cari_kodu", ""),
-            "cari_adi":   hdr.get("cari_adi", "")[:30],
-            "adres_lines": adres_lines,
-            "region":     f"{hdr.get('genexp2','')} - {hdr.get('genexp3','')}".strip(" -"),
-            "sip_tarih":  dt.datetime.now().strftime("%d-%m-%Y"),
-            "transfer":   hdr.get("genexp1", "").strip(";"),
-            "inv_line":   "FATURA BU PAKETİN İÇİNDEDİR" if i == 1 else "",
-            "footer":     footer,
-            "user_name":  user_name,
-            "print_datetime": print_datetime,
-        }
+        payload["pkg_no"]   = i
+        payload["barkod"]   = f"{barkod_root}-K{i}"    # ← 🔸 YENİ: paket no ekle
+        payload["inv_line"] = "FATURA BU PAKETİN İÇİNDEDİR" if i == 1 else ""
         draw_page(c, payload)
 
     c.save()
     logging.info("PDF etiketi oluşturuldu: %s", pdf_path)
+    return pdf_path
 
 
 # ---------------------------------------------------------------------------
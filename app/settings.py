@@ -4,8 +4,9 @@
 # ──────────────────────────────────────────────────────────────
 from __future__ import annotations
 import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
 import json  # ileride gerekirse kullanırsın
 
 # ───────────── PyInstaller uyumlu kök dizin ─────────────
@@ -111,9 +112,17 @@ def reload() -> Dict[str, Any]:
 load = reload
 
 
+@lru_cache(maxsize=None)
+def _path_parts(path: str) -> Tuple[str, ...]:
+    """"ui.sounds.enabled" → ("ui", "sounds", "enabled"); yol başına bir kez bölünür."""
+    return tuple(path.split("."))
+
+
+# _cfg settings_manager'ın sözlüğüyle aynı nesnedir (ayar sayfası oraya
+# yazar); değerler bu yüzden düzleştirilip kopyalanmaz, canlı okunur
 def get(path: str, default: Any = None) -> Any:
     cur = _cfg
-    for part in path.split("."):
+    for part in _path_parts(path):
         if isinstance(cur, dict) and part in cur:
             cur = cur[part]
         else:
@@ -122,7 +131,7 @@ def get(path: str, default: Any = None) -> Any:
 
 
 def set(path: str, value: Any) -> None:
-    parts = path.split(".")
+    parts = _path_parts(path)
     cur = _cfg
     for p in parts[:-1]:
         cur = cur.setdefault(p, {})
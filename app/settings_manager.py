@@ -67,6 +67,7 @@ DEFAULTS: Dict[str, Any] = {
         "pool_enabled": True,
         "pool_min": 2,
         "pool_max": 10,
+        "pool_ping_interval": 300,  # keep-alive ping for idle pool connections (s)
         "cache_enabled": True,
         "cache_ttl": 300
     },
@@ -31,6 +31,17 @@ try:
 except ImportError:
     _dao_fetch_all = _dao_exec_sql = None
 
+try:
+    from app.services.barcode_service import barcode_xref_lookup as _xref_lookup
+except ImportError:
+    _xref_lookup = None
+
+
+def _invalidate_xref_cache():
+    """Barkod eşlemesi değişti → tarama önbelleğini boşalt."""
+    if _xref_lookup is not None:
+        _xref_lookup.cache_clear()
+
 
 # ---------- DAO yardımcıları ------------------------------------------------
 def fetch_barcodes(wh: str | None = None, text: str = "") -> List[Dict[str, Any]]:
@@ -71,6 +82,7 @@ def upsert_barcode(barcode: str, wh: str, item_code: str, mul: float | Decimal =
         """,
         barcode, wh, item_code, mul, item_code, mul
     )
+    _invalidate_xref_cache()
 
 
 def delete_barcodes(keys: list[tuple[str, str]]):
@@ -78,6 +90,7 @@ def delete_barcodes(keys: list[tuple[str, str]]):
         return
     for bc, wh in keys:
         _dao_exec_sql("DELETE FROM dbo.barcode_xref WHERE barcode=? AND warehouse_id=?", bc, wh)
+    _invalidate_xref_cache()
 
 
 # ───────────────────────────────────────────────────────────────────────────
@@ -245,12 +258,12 @@ class BarcodePage(QWidget):
 
         # ► Ayrı servis → temiz kod
         from app.services.import_barcodes import load_file
-        ok, sec, err = load_file(path)
+        res = load_file(path)
 
-        QMessageBox.information(
-            self, "İçe Aktar",
-            f"✔ {ok:,} satır ({sec:0.1f} sn)\n❌ Hata: {err}"
-        )
+        msg = f"✔ {res.done:,} satır ({res.elapsed:0.1f} sn)\n❌ Hata: {res.err_count}"
+        if res.fmt_err:
+            msg += "\n⚠ Dosya biçimi/başlıkları hatalı (ayrıntı logda)"
+        QMessageBox.information(self, "İçe Aktar", msg)
         self.refresh()
         self.data_changed.emit()
 
@@ -520,18 +520,9 @@ class DashboardPage(QWidget):
     def _update_activities(self):
         """Son aktiviteleri güncelle"""
         try:
-            from app.dao.logo import fetch_all
+            from app.dao.users_new import get_user_dao
             
-            activities = fetch_all("""
-                SELECT TOP 10
-                    a.TARIH,
-                    k.KULLANICI_ADI,
-                    a.AKTIVITE,
-                    a.DETAY
-                FROM WMS_KULLANICI_AKTIVITELERI a
-                JOIN WMS_KULLANICILAR k ON a.KULLANICI_REF = k.LOGICALREF
-                ORDER BY a.TARIH DESC
-            """)
+            activities = get_user_dao().get_recent_activities(10)
             
             # Tabloyu temizle
             self.activities_table.setRowCount(0)
@@ -541,17 +532,17 @@ class DashboardPage(QWidget):
                 self.activities_table.insertRow(i)
                 
                 # Zaman
-                time_str = activity['tarih'].strftime('%H:%M:%S') if activity.get('tarih') else '-'
+                time_str = activity['created_at'].strftime('%H:%M:%S') if activity.get('created_at') else '-'
                 self.activities_table.setItem(i, 0, QTableWidgetItem(time_str))
                 
                 # Kullanıcı
-                self.activities_table.setItem(i, 1, QTableWidgetItem(activity.get('kullanici_adi', '-')))
+                self.activities_table.setItem(i, 1, QTableWidgetItem(activity.get('username') or '-'))
                 
                 # Aktivite
-                self.activities_table.setItem(i, 2, QTableWidgetItem(activity.get('aktivite', '-')))
+                self.activities_table.setItem(i, 2, QTableWidgetItem(activity.get('action') or '-'))
                 
                 # Detay
-                detail = activity.get('detay', '-')
+                detail = activity.get('details') or '-'
                 if len(detail) > 50:
                     detail = detail[:47] + "..."
                 self.activities_table.setItem(i, 3, QTableWidgetItem(detail))
@@ -982,7 +982,7 @@ Son Güncelleme: {datetime.now().strftime('%H:%M:%S')}
             layout = QVBoxLayout(dialog)
             
             # Order info with actual unique product count
-            unique_products = len(set(line.get("item_code") for line in lines if line.get("item_code")))
+            unique_products = len({code for line in lines if (code := line.get("item_code"))})
             status_names = {1: "Taslak", 2: "Toplanıyor", 3: "Hazır", 4: "Tamamlandı"}
             status_text = status_names.get(order.get('status', 0), "Bilinmiyor")
             
@@ -11,6 +11,7 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 from PyQt5.QtGui import QFont, QPixmap, QPalette, QColor
 from app.models.user import get_auth_manager, User
+from app.ui.workers.login_worker import LoginWorker
 import logging
 import json
 import base64
@@ -28,6 +29,7 @@ class LoginPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.auth_manager = get_auth_manager()
+        self._login_worker = None
         self._setup_ui()
         self._failed_attempts = 0
         self._load_saved_credentials()
@@ -210,41 +212,48 @@ class LoginPage(QWidget):
         # Disable form during login
         self.set_form_enabled(False)
         
-        # Attempt login
-        try:
-            result = self.auth_manager.login(username, password)
+        # Attempt login in background (password hashing would freeze the UI)
+        self._login_worker = LoginWorker(self.auth_manager, username, password)
+        self._login_worker.completed.connect(self._on_login_finished)
+        self._login_worker.failed.connect(self._on_login_error)
+        self._login_worker.start()
+    
+    def _on_login_finished(self, result):
+        """Handle login worker result."""
+        worker = self._login_worker
+        
+        if result:
+            user, token = result
+            self.show_success(f"Hoş geldiniz, {user.full_name}!")
             
-            if result:
-                user, token = result
-                self.show_success(f"Hoş geldiniz, {user.full_name}!")
-                
-                # Store credentials if remember me is checked
-                if self.remember_checkbox.isChecked():
-                    self._save_credentials(username, password)
-                else:
-                    self._clear_saved_credentials()
-                
-                # Emit success signal after short delay
-                QTimer.singleShot(1000, lambda: self.login_successful.emit(user))
-                
+            # Store credentials if remember me is checked
+            if self.remember_checkbox.isChecked():
+                self._save_credentials(worker.username, worker.password)
             else:
-                self._failed_attempts += 1
-                
-                if self._failed_attempts >= 3:
-                    self.show_error("Çok fazla başarısız deneme! 30 saniye bekleyin.")
-                    QTimer.singleShot(30000, self.reset_failed_attempts)
-                else:
-                    self.show_error("Kullanıcı adı veya şifre hatalı")
-                    self.password_input.clear()
-                    self.password_input.setFocus()
-                
-                self.set_form_enabled(True)
-                
-        except Exception as e:
-            logger.error(f"Login error: {e}")
-            self.show_error("Giriş sırasında bir hata oluştu")
+                self._clear_saved_credentials()
+            
+            # Emit success signal after short delay
+            QTimer.singleShot(1000, lambda: self.login_successful.emit(user))
+            
+        else:
+            self._failed_attempts += 1
+            
+            if self._failed_attempts >= 3:
+                self.show_error("Çok fazla başarısız deneme! 30 saniye bekleyin.")
+                QTimer.singleShot(30000, self.reset_failed_attempts)
+            else:
+                self.show_error("Kullanıcı adı veya şifre hatalı")
+                self.password_input.clear()
+                self.password_input.setFocus()
+            
             self.set_form_enabled(True)
     
+    def _on_login_error(self, message: str):
+        """Handle unexpected login worker error."""
+        logger.error(f"Login error: {message}")
+        self.show_error("Giriş sırasında bir hata oluştu")
+        self.set_form_enabled(True)
+    
     def show_error(self, message: str):
         """Show error message."""
         self.error_label.setText(message)
@@ -29,7 +29,7 @@ from PyQt5.QtWidgets import (
     QTableWidget, QTableWidgetItem, QHeaderView, QLineEdit, QMessageBox,
     QInputDialog, QProgressBar, QMenu, QAction, QTabWidget, QProgressDialog, QApplication
 )
-from PyQt5.QtGui import QColor
+from PyQt5.QtGui import QColor, QBrush
 
 # ---------------------------------------------------------------------------
 BASE_DIR = Path(__file__).resolve().parents[3]
@@ -45,7 +45,7 @@ if str(BASE_DIR) not in sys.path:
 
 # ---- DAO & servisler -------------------------------------------------------
 from app.dao.logo import (  # noqa: E402
-    fetch_picking_orders,
+    iter_picking_orders,
     fetch_order_lines,
     update_order_status,
     update_order_header,
@@ -65,7 +65,7 @@ from app import toast  # noqa: E402
 from app.ui.workers.order_completion_worker import OrderCompletionWorker
 
 # Barcode lookup moved to centralized service
-from app.services.barcode_service import barcode_xref_lookup, find_item_by_barcode
+from app.services.barcode_service import barcode_xref_lookup, find_item_by_barcode, build_line_index
 
 
 
@@ -76,6 +76,22 @@ except Exception:
 
 logger = logging.getLogger(__name__)
 
+# Satır durum stilleri – fırçalar bir kez kurulur, her taramada yeniden
+# QColor/QBrush üretilmez:  durum → (arka plan, kenar rengi, ikon)
+_ROW_STYLES = {
+    "completed": (QBrush(QColor("#E8F5E8")), "#4CAF50", "✅"),   # açık yeşil
+    "pending":   (QBrush(QColor("#FFEBEE")), "#F44336", "❌"),   # açık kırmızı
+    "progress":  (QBrush(QColor("#FFF3E0")), "#FF9800", "🔄"),   # açık turuncu
+}
+
+
+def _row_status(sent: float, ordered: float) -> str:
+    if sent >= ordered and ordered > 0:      # tam + fazla
+        return "completed"
+    if sent == 0:
+        return "pending"
+    return "progress"                        # eksik (kısmi)
+
 
 
 
@@ -105,6 +121,8 @@ class ScannerPage(QWidget):
             self.current_order: Dict | None = None
             self.lines: List[Dict] = []
             self.sent:  Dict[str, float] = {}
+            self._row_by_code: Dict[str, int] = {}   # item_code → tablo satırı
+            self._line_index: Dict[str, List[Dict]] = {}  # item_code (küçük harf) → satırlar
             self._order_map: Dict[str, Dict] = {}
             
             # Thread-safe cache implementation
@@ -1277,11 +1295,13 @@ class ScannerPage(QWidget):
         """
 
         self.tbl.setRowCount(0)
+        self._row_by_code.clear()
         for ln in self.lines:
             row = self.tbl.rowCount()
             self.tbl.insertRow(row)
 
             code     = ln["item_code"]
+            self._row_by_code.setdefault(code, row)
             ordered  = ln["qty_ordered"]
             sent     = self.sent.get(code, 0)
 
@@ -1304,21 +1324,8 @@ class ScannerPage(QWidget):
             # Durum belirteci ekle (ilk sütuna)
             code_item = self.tbl.item(row, 0)
             
-            if sent >= ordered and ordered > 0:          # tam + fazla
-                color = QColor("#E8F5E8")                # açık yeşil
-                border_color = "#4CAF50"
-                icon = "✅"
-                status = "completed"
-            elif sent == 0:
-                color = QColor("#FFEBEE")                # açık kırmızı  
-                border_color = "#F44336"
-                icon = "❌"
-                status = "pending"
-            else:                                        # eksik (kısmi)
-                color = QColor("#FFF3E0")                # açık turuncu
-                border_color = "#FF9800"
-                icon = "🔄"
-                status = "progress"
+            status = _row_status(sent, ordered)
+            color, border_color, icon = _ROW_STYLES[status]
             
             # Tüm satırı renklendir ve border ekle
             for c in range(6):
@@ -1348,11 +1355,13 @@ class ScannerPage(QWidget):
     # ---- STATUS 2 başlıklarını getir ----
     def refresh_orders(self):
         try:
-            orders = fetch_picking_orders(limit=200)
+            # Satırlar parça parça okunup doğrudan haritaya yazılır (ara liste yok)
+            order_map = {f"{o['order_no']} – {o['customer_code']}": o
+                         for o in iter_picking_orders(limit=200)}
         except Exception as exc:
             QMessageBox.critical(self, "DB Hatası", str(exc))
             return
-        self._order_map = {f"{o['order_no']} – {o['customer_code']}": o for o in orders}
+        self._order_map = order_map
         self.cmb_orders.clear()
         self.cmb_orders.addItems(self._order_map.keys())
 
@@ -1375,6 +1384,7 @@ class ScannerPage(QWidget):
             # Thread-safe cache temizle ve depo setini hazırla
             self._barcode_cache.clear()
             self._warehouse_set = {ln["warehouse_id"] for ln in self.lines}
+            self._line_index = build_line_index(self.lines)
             
         except Exception as exc:
             QMessageBox.critical(self, "Satır Hatası", str(exc))
@@ -1546,7 +1556,8 @@ class ScannerPage(QWidget):
         """Barkod eşleştirme optimized version"""
         try:
             # Use centralized barcode service
-            matched_line, qty_inc = find_item_by_barcode(raw, self.lines, self._warehouse_set)
+            matched_line, qty_inc = find_item_by_barcode(raw, self.lines, self._warehouse_set,
+                                                          self._line_index)
             return matched_line, qty_inc
         except Exception as e:
             # Database error - show actual error to user
@@ -1558,52 +1569,39 @@ class ScannerPage(QWidget):
 
     def _update_single_row(self, item_code: str, new_sent: float):
         """Tek satırı güncelle - tüm tabloyu yeniden çizmek yerine"""
-        
-        for row in range(self.tbl.rowCount()):
-            code_item = self.tbl.item(row, 0)
-            if code_item:
-                # İkon içeren text'ten sadece kodu al (ikonu kaldır)
-                item_text = code_item.text()
-                # "✅ D4-AFT" -> "D4-AFT" 
-                actual_code = item_text.split(" ", 1)[-1] if " " in item_text else item_text
-                
-                if actual_code == item_code:
-                    # Gönderilen kolonunu güncelle ve modern renklendirme uygula
-                    ordered = float(self.tbl.item(row, 2).text())
-                    completion_percent = (new_sent / ordered * 100) if ordered > 0 else 0
-                    
-                    # Modern renklendirme sistemi
-                    if new_sent >= ordered and ordered > 0:
-                        color = QColor("#E8F5E8")  # açık yeşil
-                        icon = "✅"
-                        status = "completed"
-                    elif new_sent == 0:
-                        color = QColor("#FFEBEE")  # açık kırmızı
-                        icon = "❌"
-                        status = "pending"
-                    else:
-                        color = QColor("#FFF3E0")  # açık turuncu
-                        icon = "🔄"
-                        status = "progress"
-                    
-                    # İlk kolonun textini güncelle (ikon + kod)
-                    code_item.setText(f"{icon} {item_code}")
-                    code_item.setToolTip(f"Durum: {status}\nTamamlanma: %{completion_percent:.1f}")
-                    
-                    # Gönderilen kolonunu güncelle
-                    sent_item = self.tbl.item(row, 3)
-                    if sent_item:
-                        if completion_percent > 0:
-                            sent_item.setText(f"{new_sent} (%{completion_percent:.0f})")
-                            sent_item.setToolTip(f"Tamamlanan: {new_sent}/{ordered} adet\nYüzde: %{completion_percent:.1f}")
-                        else:
-                            sent_item.setText(str(new_sent))
-                            sent_item.setToolTip(f"Tamamlanan: {new_sent}/{ordered} adet")
-                    
-                    # Tüm satırı renklendir
-                    for c in range(6):
-                        self.tbl.item(row, c).setBackground(color)
-                    break
+        # Satır, _populate_table'da kurulan haritadan O(1) bulunur
+        row = self._row_by_code.get(item_code)
+        if row is None:
+            return
+        code_item = self.tbl.item(row, 0)
+        if code_item is None:
+            return
+
+        # Gönderilen kolonunu güncelle ve modern renklendirme uygula
+        ordered = float(self.tbl.item(row, 2).text())
+        completion_percent = (new_sent / ordered * 100) if ordered > 0 else 0
+
+        # Modern renklendirme sistemi
+        status = _row_status(new_sent, ordered)
+        color, _, icon = _ROW_STYLES[status]
+
+        # İlk kolonun textini güncelle (ikon + kod)
+        code_item.setText(f"{icon} {item_code}")
+        code_item.setToolTip(f"Durum: {status}\nTamamlanma: %{completion_percent:.1f}")
+
+        # Gönderilen kolonunu güncelle
+        sent_item = self.tbl.item(row, 3)
+        if sent_item:
+            if completion_percent > 0:
+                sent_item.setText(f"{new_sent} (%{completion_percent:.0f})")
+                sent_item.setToolTip(f"Tamamlanan: {new_sent}/{ordered} adet\nYüzde: %{completion_percent:.1f}")
+            else:
+                sent_item.setText(str(new_sent))
+                sent_item.setToolTip(f"Tamamlanan: {new_sent}/{ordered} adet")
+
+        # Tüm satırı renklendir
+        for c in range(6):
+            self.tbl.item(row, c).setBackground(color)
 
 
       
@@ -1644,8 +1642,11 @@ class ScannerPage(QWidget):
             # İlk defa kapatılıyor
             if has_missing:
                 # Eksikli sipariş için tahmini yap
-                total_requested = sum(ln["qty_ordered"] for ln in self.lines)
-                total_sent = sum(self.sent.get(ln["item_code"], 0) for ln in self.lines)
+                # İstenen ve gönderilen toplamlar tek geçişte
+                total_requested = total_sent = 0
+                for ln in self.lines:
+                    total_requested += ln["qty_ordered"]
+                    total_sent += self.sent.get(ln["item_code"], 0)
                 completion_rate = total_sent / total_requested if total_requested > 0 else 0
                 default_pkg = max(1, round(3 * completion_rate))  # 3 paket varsayımı
                 
@@ -1726,7 +1727,9 @@ class ScannerPage(QWidget):
                 self.current_order = None
                 self._barcode_cache.clear()
                 self._warehouse_set.clear()
+                self._line_index.clear()
                 self.tbl.setRowCount(0)
+                self._row_by_code.clear()
                 self.refresh_orders()
                 
                 # Add toast notification
@@ -1845,8 +1848,8 @@ class ScannerPage(QWidget):
                 try:
                     # DB'yi güncelle
                     queue_inc(self.current_order["order_id"], code, qty - current_sent)
-                    # UI'yi güncelle
-                    self._populate_table()
+                    # UI'yi güncelle (yalnızca değişen satır)
+                    self._update_single_row(code, qty)
                     self.update_progress()
                     # Log
                     try:
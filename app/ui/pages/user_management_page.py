@@ -15,9 +15,8 @@ from PyQt5.QtGui import QIcon, QColor, QFont
 from typing import Optional, Dict, List
 from datetime import datetime
 import logging
-import bcrypt
 
-from app.dao.users_new import UserDAO
+from app.dao.users_new import get_user_dao, hash_password
 from app.models.user import User, get_auth_manager
 
 logger = logging.getLogger(__name__)
@@ -31,7 +30,7 @@ class UserManagementPage(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.dao = UserDAO()
+        self.dao = get_user_dao()
         self.auth_manager = get_auth_manager()
         self.current_user = self.auth_manager.get_current_user()
         self._setup_ui()
@@ -119,9 +118,11 @@ class UserManagementPage(QWidget):
     def _load_users(self):
         """Load users from database."""
         try:
-            users = self.dao.get_all_users()
+            # Liste + istatistikler tek round-trip'te
+            bootstrap = self.dao.get_admin_bootstrap()
+            users = bootstrap['users']
             self._populate_table(users)
-            self._update_stats(users)
+            self._update_stats(users, bootstrap['stats'])
         except Exception as e:
             logger.error(f"Failed to load users: {e}")
             QMessageBox.critical(self, "Hata", f"Kullanıcılar yüklenemedi:\n{str(e)}")
@@ -223,7 +224,7 @@ class UserManagementPage(QWidget):
             
             self.table.setCellWidget(row, 8, actions_widget)
     
-    def _update_stats(self, users: List[Dict]):
+    def _update_stats(self, users: List[Dict], stats: Optional[Dict] = None):
         """Update statistics label."""
         total = len(users)
         active = sum(1 for u in users if u.get('is_active'))
@@ -234,6 +235,11 @@ class UserManagementPage(QWidget):
             f"✅ Aktif: {active} | "
             f"👑 Admin: {admins}"
         )
+        if stats:
+            stats_text += (
+                f" | 📅 Son 7 gün: {stats['weekly_active_users']} | "
+                f"🔒 Kilitli: {stats['locked_users']}"
+            )
         self.stats_label.setText(stats_text)
     
     def _get_role_display(self, role: str) -> str:
@@ -301,7 +307,7 @@ class UserManagementPage(QWidget):
             new_password = dialog.get_password()
             try:
                 # Hash password
-                password_hash = bcrypt.hashpw(new_password.encode(), bcrypt.gensalt()).decode()
+                password_hash = hash_password(new_password)
                 self.dao.update_password(user['id'], password_hash)
                 QMessageBox.information(self, "Başarılı", 
                     f"Şifre sıfırlandı!\n\nKullanıcı: {user['username']}\nYeni şifre: {new_password}")
@@ -417,7 +423,7 @@ class UserEditDialog(QDialog):
         
         if not self.is_edit:
             password = self.password_input.text()
-            data['password_hash'] = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+            data['password_hash'] = hash_password(password)
         
         return data
 
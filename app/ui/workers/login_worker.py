@@ -0,0 +1,43 @@
+"""
+Login Worker - Runs authentication off the UI thread
+Password hashing (argon2id/bcrypt) plus the login round-trip would otherwise
+freeze the login form for the duration of the check.
+"""
+
+from PyQt5.QtCore import QThread, pyqtSignal
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LoginWorker(QThread):
+    """
+    Background worker thread for a single login attempt.
+    Emits `completed` with AuthManager.login()'s result ((user, token) or None).
+    """
+
+    # Signals
+    completed = pyqtSignal(object)  # (User, token) tuple or None
+    failed = pyqtSignal(str)  # Error message
+
+    def __init__(self, auth_manager, username: str, password: str):
+        """
+        Initialize the worker with credentials.
+
+        Args:
+            auth_manager: AuthManager instance performing the login
+            username: Username or email
+            password: Plain text password
+        """
+        super().__init__()
+        self.auth_manager = auth_manager
+        self.username = username
+        self.password = password
+
+    def run(self):
+        """Main worker thread execution."""
+        try:
+            self.completed.emit(self.auth_manager.login(self.username, self.password))
+        except Exception as e:
+            logger.error(f"Login worker error: {e}")
+            self.failed.emit(str(e))
@@ -227,16 +227,8 @@ class OrderCompletionWorker(QThread):
                         table_exists = cursor.fetchone()[0]
                         
                         if table_exists:
-                            # Use batch insert for performance
-                            for batch_item in backorder_data:
-                                bo.insert_backorder(
-                                    batch_item[0],  # order_no
-                                    batch_item[1],  # line_id
-                                    batch_item[2],  # warehouse
-                                    batch_item[3],  # code
-                                    batch_item[4]   # missing
-                                    # conn parametresi kaldırıldı
-                                )
+                            # Tüm eksik satırlar tek toplu gönderimde
+                            bo.insert_backorders_bulk(backorder_data, conn=conn)
                         else:
                             logger.warning("backorders table not found, skipping backorder creation")
                 
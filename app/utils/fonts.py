@@ -1,10 +1,27 @@
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from app import settings
+import logging
+import os
+import sys
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
+
+from app import settings
+
+logger = logging.getLogger(__name__)
+
+# Servislerin PDF fontu (etiket, pick-list, back-order listesi) bu adla bir
+# kez kaydedilir; ReportLab kaydı süreç genelinde paylaşır
+DEFAULT_FONT_NAME = "DejaVu"
+FALLBACK_FONT = "Helvetica"
+
+# Yollar bir kez çözülür (frozen modda PyInstaller çıkarma dizini)
+_APP_DIR = Path(__file__).resolve().parent.parent
+_BASE_DIR = Path(sys._MEIPASS) if getattr(sys, "frozen", False) else _APP_DIR
 
 def register_pdf_font(name: str = "DejaVuSans", filename: str = "DejaVuSans.ttf") -> str:
     """TTF fontu ReportLab'a kaydeder ve adını döner"""
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
     font_path = Path(settings.get("paths.font_dir", "fonts")) / filename
     try:
         if not pdfmetrics.getFont(name):
@@ -12,3 +29,46 @@ def register_pdf_font(name: str = "DejaVuSans", filename: str = "DejaVuSans.ttf"
     except Exception:
         return "Helvetica"
     return name
+
+
+@lru_cache(maxsize=None)
+def _find_font_file(env_path: str = "") -> Optional[str]:
+    """DejaVuSans.ttf için aday yolları bir kez tarar (env_path: servisin env değeri)."""
+    candidates = [
+        str(_BASE_DIR / "app" / "fonts" / "DejaVuSans.ttf"),
+        str(_BASE_DIR / "fonts" / "DejaVuSans.ttf"),
+        env_path,
+        str(_APP_DIR / "fonts" / "DejaVuSans.ttf"),
+        str(_APP_DIR / "app" / "fonts" / "DejaVuSans.ttf"),
+    ]
+    for font_path in dict.fromkeys(candidates):
+        if font_path and Path(font_path).exists():
+            return font_path
+    return None
+
+
+def get_default_font(env_var: str = "") -> str:
+    """
+    Servis PDF'lerinin fontunu döndürür; DejaVuSans ilk çağrıda bulunup
+    kaydedilir, sonraki çağrılar (diğer servisler dahil) dosya taramaz.
+    env_var: ek font yolu veren ortam değişkeni (ör. "FONT_PATH").
+    Font bulunamaz/yüklenemezse Helvetica.
+    """
+    # ReportLab ilk PDF'te yüklenir; modülü içe aktarmak ucuz kalır
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    if DEFAULT_FONT_NAME in pdfmetrics.getRegisteredFontNames():
+        return DEFAULT_FONT_NAME
+
+    font_path = _find_font_file(os.getenv(env_var, "") if env_var else "")
+    if font_path:
+        try:
+            pdfmetrics.registerFont(TTFont(DEFAULT_FONT_NAME, font_path))
+            logger.info("Font loaded from: %s", font_path)
+            return DEFAULT_FONT_NAME
+        except Exception as e:
+            logger.warning("Could not load font from %s: %s", font_path, e)
+
+    logger.warning("DejaVuSans.ttf not found; using Helvetica (Turkish characters may not display correctly)")
+    return FALLBACK_FONT
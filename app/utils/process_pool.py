@@ -0,0 +1,34 @@
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# PDF servislerinin süreç havuzları ada göre bir kez kurulur ve sonraki
+# partilerde yeniden kullanılır (her partide süreç açma/import maliyeti yok).
+# İşçilere yalnızca düz veri gönderilir; işçi süreçleri DB'ye bağlanmaz.
+_pools: Dict[str, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def get_process_pool(name: str, max_workers: int,
+                     initializer: Optional[Callable[[], object]] = None) -> ProcessPoolExecutor:
+    """`name` adlı paylaşılan havuzu döner; yoksa (ilk çağrıda) kurar."""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=max_workers, initializer=initializer)
+            _pools[name] = pool
+        return pool
+
+
+def discard_process_pool(name: str) -> None:
+    """Bozulan havuzu bırakır; bir sonraki get_process_pool yenisini kurar."""
+    with _pools_lock:
+        pool = _pools.pop(name, None)
+    if pool is not None:
+        try:
+            pool.shutdown(wait=False, cancel_futures=True)
+        except Exception as exc:
+            logger.debug("Süreç havuzu kapatılamadı (%s): %s", name, exc)
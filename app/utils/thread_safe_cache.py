@@ -35,7 +35,8 @@ class ThreadSafeCache:
         self.name = name
         
         self._cache: OrderedDict = OrderedDict()
-        self._timestamps: Dict[Any, float] = {}
+        # key -> time.monotonic() deadline (only when ttl_seconds is set)
+        self._expires_at: Dict[Any, float] = {}
         self._lock = threading.RLock()
         self._hits = 0
         self._misses = 0
@@ -61,11 +62,10 @@ class ThreadSafeCache:
             
             # Check TTL if enabled
             if self.ttl_seconds is not None:
-                timestamp = self._timestamps.get(key, 0)
-                if time.time() - timestamp > self.ttl_seconds:
+                if time.monotonic() > self._expires_at.get(key, 0.0):
                     # Expired, remove it
                     del self._cache[key]
-                    del self._timestamps[key]
+                    del self._expires_at[key]
                     self._misses += 1
                     return default
             
@@ -88,16 +88,16 @@ class ThreadSafeCache:
                 # Remove oldest (first) item
                 oldest_key = next(iter(self._cache))
                 del self._cache[oldest_key]
-                if oldest_key in self._timestamps:
-                    del self._timestamps[oldest_key]
+                if oldest_key in self._expires_at:
+                    del self._expires_at[oldest_key]
             
             # Add or update
             self._cache[key] = value
             self._cache.move_to_end(key)
             
-            # Update timestamp
+            # Update expiry deadline
             if self.ttl_seconds is not None:
-                self._timestamps[key] = time.time()
+                self._expires_at[key] = time.monotonic() + self.ttl_seconds
     
     def delete(self, key: Any) -> bool:
         """
@@ -112,8 +112,8 @@ class ThreadSafeCache:
         with self._lock:
             if key in self._cache:
                 del self._cache[key]
-                if key in self._timestamps:
-                    del self._timestamps[key]
+                if key in self._expires_at:
+                    del self._expires_at[key]
                 return True
             return False
     
@@ -121,7 +121,7 @@ class ThreadSafeCache:
         """Clear all items from cache."""
         with self._lock:
             self._cache.clear()
-            self._timestamps.clear()
+            self._expires_at.clear()
             logger.debug(f"Cache '{self.name}' cleared")
     
     def size(self) -> int:
@@ -166,16 +166,16 @@ class ThreadSafeCache:
             return 0
         
         with self._lock:
-            current_time = time.time()
+            now = time.monotonic()
             expired_keys = [
-                key for key, timestamp in self._timestamps.items()
-                if current_time - timestamp > self.ttl_seconds
+                key for key, deadline in self._expires_at.items()
+                if now > deadline
             ]
             
             for key in expired_keys:
                 if key in self._cache:
                     del self._cache[key]
-                del self._timestamps[key]
+                del self._expires_at[key]
             
             if expired_keys:
                 logger.debug(f"Cache '{self.name}' cleaned up {len(expired_keys)} expired items")
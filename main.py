@@ -3,12 +3,17 @@
 #  Uygulama giriş noktası
 # ──────────────────────────────────────────────────────────
 import sys, traceback, logging
+import multiprocessing
 from pathlib import Path
 
 from PyQt5.QtCore    import Qt, QCoreApplication
 from PyQt5.QtGui     import QFont
 from PyQt5.QtWidgets import QApplication, QMessageBox
 
+# PyInstaller exe'de alt süreçler (ör. etiket çizim havuzu) GUI'yi
+# yeniden başlatmasın
+multiprocessing.freeze_support()
+
 from app.ui.main_window import MainWindow
 import app.settings as settings            # ‹ settings.py içindeki fonksiyonlara erişim
 
@@ -109,7 +114,26 @@ login_window.show()
 # Global referans
 main_window = None
 
+# Şema DDL'i (trigger, login index) normalde kurulumda bir kez çalıştırılır:
+#   python -m app.ddl
+# DB_AUTO_MIGRATE=true ise pencere açıldıktan sonra arka planda uygulanır.
+import os
+if os.getenv("DB_AUTO_MIGRATE", "false").lower() in ("true", "1", "yes", "on"):
+    import threading
+
+    def _auto_migrate():
+        try:
+            from app.ddl import ensure_schema
+            if not ensure_schema():
+                logging.warning("Some schema updates could not be applied (see log)")
+        except Exception as e:
+            logging.warning(f"Could not apply schema updates: {e}")
+
+    threading.Thread(target=_auto_migrate, name="auto-migrate", daemon=True).start()
+
 # ──────────────────────────────────────────────────────────
 # 6) Çıkış
 # ──────────────────────────────────────────────────────────
+from app.dao.logo import close_connection_pool
+app.aboutToQuit.connect(close_connection_pool)
 sys.exit(app.exec_())
@@ -122,6 +122,7 @@ a = Analysis(
         'pandas',
         'numpy',
         'openpyxl',
+        'xlsxwriter',
         'xlrd',
         
         # QR Code generation
@@ -144,6 +145,7 @@ a = Analysis(
         'jose',
         'jose.jwt',
         'bcrypt',
+        'argon2',
         'cryptography',
         'cryptography.fernet',
         'hashlib',